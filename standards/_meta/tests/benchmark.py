@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+import sys
+import gc
+import time
+import random
+import bisect
+import math
+import statistics
+import asyncio
+import argparse
+import tracemalloc
+from typing import Dict, List, Any, Callable, Tuple
+from validators.base_validator import ErrorSeverity, ValidationResult, ResultBatch
+from performance.histogram import LatencyHistogram
+from performance.tdigest import TDigest
+from performance.samples import SampleBuffer, np
+from performance.loops import LOOP_MODES, available_loop_modes, loop_factory, new_runner
+from performance.trials import OUTLIER_METHODS, summarize_trials
+from performance.load import ARRIVAL_PROCESSES, LOAD_PROFILES, LoadProfile
+
+def _finding(i: int) -> Tuple[str, str, ErrorSeverity]:
+    """ベンチマーク用の検証結果（ファイル500件 × 定型メッセージを想定）"""
+    if i % 3 == 0:
+        return ("ERROR", f"必須フィールド欠落 in ctx_{i % 500}.yaml: field_{i % 7}", ErrorSeverity.CRITICAL)
+    return ("WARNING", f"メトリクス閾値が未定義 in ctx_{i % 500}.yaml: m{i % 11}", ErrorSeverity.NON_CRITICAL)
+
+class _DictResult:
+    """従来の検証結果（インスタンス辞書を持つオブジェクト）"""
+    def __init__(self, level: str, message: str, severity: ErrorSeverity = ErrorSeverity.NON_CRITICAL):
+        self.level = level
+        self.message = message
+        self.severity = severity
+        self.response_time = 15 if severity == ErrorSeverity.CRITICAL else 60
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "severity": self.severity.value,
+            "message": self.message,
+            "response_time": self.response_time
+        }
+
+def _measure(build: Callable[[int], Any], count: int) -> Tuple[int, float]:
+    """構築した結果が保持するメモリ（バイト）と構築時間（秒）を計測"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    retained = build(count)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return size, elapsed
+
+def _build_legacy(count: int) -> Any:
+    results = [_DictResult(*_finding(i)) for i in range(count)]
+    # 従来のマージ処理では結果ごとに辞書へ複製していた
+    return results, [result.to_dict() for result in results]
+
+def _build_slotted(count: int) -> Any:
+    return [ValidationResult(*_finding(i)) for i in range(count)]
+
+def _build_batch(count: int) -> Any:
+    batch = ResultBatch()
+    for i in range(count):
+        batch.append(*_finding(i))
+    return batch
+
+def bench_results(args: argparse.Namespace) -> None:
+    """検証結果の保持形式ごとのメモリ使用量"""
+    cases = [
+        ("オブジェクト + 辞書（従来）", _build_legacy),
+        ("ValidationResult（__slots__）", _build_slotted),
+        ("ResultBatch（列指向）", _build_batch)
+    ]
+    print(f"検証結果 {args.count}件あたりのメモリ使用量")
+    baseline = None
+    for name, build in cases:
+        size, elapsed = _measure(build, args.count)
+        if baseline is None:
+            baseline = size
+        saved = (1 - size / baseline) * 100 if baseline else 0.0
+        print(
+            f"- {name}: {size / 1024 / 1024:.2f} MiB "
+            f"({size / args.count:.1f} B/件, 削減率 {saved:.1f}%, 構築 {elapsed * 1000:.1f} ms)"
+        )
+
+class _LinearRegistry:
+    """従来の線形探索によるエラーコード割り当て（割り当てたコードを登録する版）"""
+    def __init__(self, minimum: int = -32599, maximum: int = -32000):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.used_error_codes = set()
+
+    def allocate_code(self, message: str) -> int:
+        for code in range(self.minimum, self.maximum + 1):
+            if code not in self.used_error_codes:
+                self.used_error_codes.add(code)
+                return code
+        raise ValueError("利用可能なエラーコードがありません")
+
+def bench_error_codes(args: argparse.Namespace) -> None:
+    """エラーコード割り当ての所要時間"""
+    from test_security import ErrorCodeRegistry
+    messages = [f"潜在的なsensitive_data脆弱性: ctx_{i}.yaml:{i % 97}" for i in range(args.count)]
+
+    # 従来方式はサーバーエラー範囲（600件）を使い切るたびに初期化して計測
+    legacy = _LinearRegistry()
+    start = time.perf_counter()
+    for message in messages:
+        try:
+            legacy.allocate_code(message)
+        except ValueError:
+            legacy.used_error_codes.clear()
+            legacy.allocate_code(message)
+    legacy_elapsed = time.perf_counter() - start
+
+    registry = ErrorCodeRegistry(overflow_policy='hash')
+    start = time.perf_counter()
+    codes = [registry.allocate_code(message, 'vulnerability') for message in messages]
+    allocate_elapsed = time.perf_counter() - start
+
+    registry = ErrorCodeRegistry()
+    start = time.perf_counter()
+    for message in messages:
+        registry.release_error_code(registry.allocate_code(message, 'general'))
+    cycle_elapsed = time.perf_counter() - start
+
+    print(f"エラーコード {args.count}件の割り当て")
+    print(f"- 線形探索（従来）: {legacy_elapsed * 1000:.1f} ms ({legacy_elapsed / args.count * 1e6:.2f} µs/件)")
+    print(
+        f"- ビットマップ（ハッシュによる再利用あり）: {allocate_elapsed * 1000:.1f} ms "
+        f"({allocate_elapsed / args.count * 1e6:.2f} µs/件, 異なるコード {len(set(codes))}件)"
+    )
+    print(f"- ビットマップ（割り当て・解放）: {cycle_elapsed * 1000:.1f} ms ({cycle_elapsed / args.count * 1e6:.2f} µs/件)")
+
+SKETCH_DISTRIBUTIONS: Dict[str, Callable[[random.Random], float]] = {
+    # レイテンシー（ミリ秒）を想定した右に裾の長い分布
+    "lognormal": lambda rng: rng.lognormvariate(3.0, 1.0),
+    "pareto": lambda rng: rng.paretovariate(1.5)
+}
+SKETCH_QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+def bench_sketch(args: argparse.Namespace) -> int:
+    """分位点スケッチの精度（歪んだ分布での厳密な分位点との比較）"""
+    failed = False
+    for name, generate in SKETCH_DISTRIBUTIONS.items():
+        rng = random.Random(args.seed)
+        values = [generate(rng) for _ in range(args.count)]
+        exact = sorted(values)
+
+        # ワーカーごとに記録し、スナップショット経由で結合
+        workers = [TDigest(args.compression) for _ in range(args.workers)]
+        histogram = LatencyHistogram()
+        for i, value in enumerate(values):
+            workers[i % args.workers].record(value)
+            histogram.record(value)
+        sketch = TDigest(args.compression)
+        for worker in workers:
+            sketch.merge_dict(worker.to_dict())
+
+        print(f"{name}分布 {args.count}件（t-digest: ワーカー{args.workers}件を結合, "
+              f"セントロイド {len(sketch.centroids())}件）")
+        for q in SKETCH_QUANTILES:
+            expected = exact[min(int(q * len(exact)), len(exact) - 1)]
+            estimated = sketch.quantile(q)
+            rank_error = abs(bisect.bisect_left(exact, estimated) / len(exact) - q)
+            relative_error = abs(estimated - expected) / expected
+            histogram_error = abs(histogram.quantile(q) - expected) / expected
+            if rank_error > args.rank_tolerance or relative_error > args.relative_tolerance:
+                failed = True
+            print(
+                f"- p{q * 100:g}: 厳密値 {expected:.4f} / t-digest {estimated:.4f} "
+                f"(順位誤差 {rank_error:.5f}, 相対誤差 {relative_error:.4%}) / "
+                f"ヒストグラム相対誤差 {histogram_error:.4%}"
+            )
+    print(
+        f"判定: {'不合格' if failed else '合格'}"
+        f"（許容順位誤差 {args.rank_tolerance}, 許容相対誤差 {args.relative_tolerance:.1%}）"
+    )
+    return 1 if failed else 0
+
+REMOTE_CATEGORIES = ("discovery", "authentication", "stateless")
+
+def _analyze_lists(samples: Dict[str, List[float]]) -> None:
+    """従来の解析（リストの整列による閾値判定と statistics.quantiles による統計）"""
+    for response_times in samples.values():
+        ordered = sorted(response_times)
+        ordered[int(len(ordered) * 0.95)]
+        statistics.quantiles(response_times, n=1000)
+        statistics.fmean(response_times)
+        statistics.pstdev(response_times)
+
+def _analyze_buffers(buffers: Dict[str, SampleBuffer]) -> None:
+    """サンプルバッファによる解析（閾値判定の分位点と統計値）"""
+    for buffer in buffers.values():
+        buffer.quantiles([0.50, 0.95, 0.99])
+        buffer.stats()
+
+def bench_stats(args: argparse.Namespace) -> None:
+    """リモートMCP接続テストの解析フェーズの所要時間"""
+    rng = random.Random(args.seed)
+    samples = {
+        category: [rng.lognormvariate(1.5, 0.5) for _ in range(args.count)]
+        for category in REMOTE_CATEGORIES
+    }
+    cases = [("リスト + statistics（従来）", _analyze_lists, samples)]
+    for use_numpy, name in ((False, "SampleBuffer（純Python）"), (True, "SampleBuffer（NumPy）")):
+        if use_numpy and np is None:
+            continue
+        buffers = {category: SampleBuffer(use_numpy=use_numpy) for category in REMOTE_CATEGORIES}
+        for category, response_times in samples.items():
+            for response_time in response_times:
+                buffers[category].record(response_time)
+        cases.append((name, _analyze_buffers, buffers))
+
+    print(f"リモートMCP接続テストの解析（{len(REMOTE_CATEGORIES)}カテゴリ × {args.count}件）")
+    baseline = None
+    for name, analyze, data in cases:
+        start = time.perf_counter()
+        analyze(data)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        print(f"- {name}: {elapsed * 1000:.1f} ms（従来比 {baseline / elapsed:.1f}倍）")
+    if np is None:
+        print("- SampleBuffer（NumPy）: NumPyがインストールされていないためスキップ")
+
+# process_sampling_mode（3モード）と run_category_tests（3カテゴリ）の既定の遅延（秒）
+LOOP_WORKLOADS = {
+    "sampling": [[0.001], [0.001], [0.001]],
+    "category": [[0.005, 0.008, 0.001], [0.01, 0.005], [0.001]]
+}
+# 各リクエストの後に挿入される待機（秒）
+YIELD_SLEEP = 0.0001
+
+async def _task_cost(count: int) -> float:
+    """タスク1件の生成から完了待ちまでの所要時間（マイクロ秒）"""
+    async def noop() -> None:
+        pass
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await asyncio.create_task(noop())
+    return (time.perf_counter() - start) / count * 1e6
+
+async def _sleep_overhead(count: int) -> List[float]:
+    """asyncio.sleep(YIELD_SLEEP) の要求時間を超えた分（マイクロ秒）"""
+    overheads = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await asyncio.sleep(YIELD_SLEEP)
+        overheads.append((time.perf_counter() - start - YIELD_SLEEP) * 1e6)
+    return overheads
+
+async def _wakeup_jitter(delays: List[List[float]], duration: float) -> List[float]:
+    """テストのループを並行に再現し、各sleepの予定時刻からの起床遅れ（マイクロ秒）を収集"""
+    lateness: List[float] = []
+
+    async def worker(worker_delays: List[float]) -> None:
+        end_time = time.perf_counter() + duration
+        while time.perf_counter() < end_time:
+            for delay in worker_delays + [YIELD_SLEEP]:
+                start = time.perf_counter()
+                await asyncio.sleep(delay)
+                lateness.append((time.perf_counter() - start - delay) * 1e6)
+
+    await asyncio.gather(*(worker(worker_delays) for worker_delays in delays))
+    return lateness
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+def bench_loop(args: argparse.Namespace) -> None:
+    """イベントループの方式ごとのスケジューリングコスト"""
+    modes = available_loop_modes()
+    print(f"イベントループのオーバーヘッド（タスク {args.tasks}件、sleep {args.sleeps}回、各ループ {args.duration}秒）")
+    for mode in modes:
+        with new_runner(loop_factory(mode)) as runner:
+            task_cost = runner.run(_task_cost(args.tasks))
+            overheads = sorted(runner.run(_sleep_overhead(args.sleeps)))
+            jitter = {
+                name: sorted(runner.run(_wakeup_jitter(delays, args.duration)))
+                for name, delays in LOOP_WORKLOADS.items()
+            }
+        print(f"### {mode}")
+        print(f"- タスク生成と完了待ち: {task_cost:.2f} µs/タスク")
+        print(
+            f"- sleep({YIELD_SLEEP}) の超過: 平均 {statistics.fmean(overheads):.1f} µs, "
+            f"P50 {_percentile(overheads, 0.50):.1f} µs, P99 {_percentile(overheads, 0.99):.1f} µs"
+        )
+        for name, lateness in jitter.items():
+            print(
+                f"- 起床遅れ（{name}）: P50 {_percentile(lateness, 0.50):.1f} µs, "
+                f"P99 {_percentile(lateness, 0.99):.1f} µs, 最大 {lateness[-1]:.1f} µs（{len(lateness)}回）"
+            )
+    for mode in LOOP_MODES:
+        if mode not in modes:
+            print(f"### {mode}: この環境では利用できないためスキップ")
+
+# 反復ごとの値を想定した分布（生成関数、真の平均、真の中央値）
+TRIAL_DISTRIBUTIONS: Dict[str, Tuple[Callable[[random.Random], float], float, float]] = {
+    "normal": (lambda rng: rng.gauss(100.0, 10.0), 100.0, 100.0),
+    "lognormal": (lambda rng: rng.lognormvariate(3.0, 0.5), math.exp(3.125), math.exp(3.0))
+}
+
+def bench_trials(args: argparse.Namespace) -> int:
+    """反復計測の信頼区間の被覆率（真の平均・中央値を区間が含む割合）
+
+    中央値の区間は分布によらず信頼水準以上、平均の区間は正規分布で信頼水準程度となることを確認する。
+    右に裾の長い分布では平均の区間の被覆率は信頼水準を下回りうるため参考値とする。
+    """
+    failed = False
+    minimum = args.confidence - args.tolerance
+    for name, (generate, true_mean, true_median) in TRIAL_DISTRIBUTIONS.items():
+        rng = random.Random(args.seed)
+        mean_hits = median_hits = rejected = 0
+        for _ in range(args.repeats):
+            values = [generate(rng) for _ in range(args.iterations)]
+            summary = summarize_trials(values, args.confidence, args.outliers)
+            mean_hits += summary['mean_ci'][0] <= true_mean <= summary['mean_ci'][1]
+            median_hits += summary['median_ci'][0] <= true_median <= summary['median_ci'][1]
+            rejected += len(summary['rejected'])
+        mean_coverage = mean_hits / args.repeats
+        median_coverage = median_hits / args.repeats
+        if median_coverage < minimum or (name == "normal" and mean_coverage < minimum):
+            failed = True
+        print(
+            f"{name}分布 {args.iterations}回 × {args.repeats}試行（外れ値の除外: {args.outliers}）: "
+            f"平均の被覆率 {mean_coverage:.3f} / 中央値の被覆率 {median_coverage:.3f} / "
+            f"除外 {rejected / args.repeats:.2f}件/試行"
+        )
+    print(f"判定: {'不合格' if failed else '合格'}（信頼水準 {args.confidence}, 許容差 {args.tolerance}）")
+    return 1 if failed else 0
+
+def bench_arrivals(args: argparse.Namespace) -> int:
+    """負荷プロファイル・到着過程ごとの予定数（平均レート × 時間との差）
+
+    constant は予定数の差が1件以内、poisson は標準偏差（√期待値）の4倍以内であることを確認する。
+    """
+    failed = False
+    for profile_name in LOAD_PROFILES:
+        profile = LoadProfile.create(profile_name, args.rate, args.duration, args.ramp_up, args.steps)
+        expected = profile.mean_rate * profile.duration
+        for arrival in ARRIVAL_PROCESSES:
+            rng = random.Random(args.seed)
+            start = time.perf_counter()
+            count = sum(1 for _ in profile.iter_arrivals(arrival, rng))
+            elapsed = time.perf_counter() - start
+            tolerance = 1 if arrival == 'constant' else 4 * math.sqrt(expected) + 1
+            passed = abs(count - expected) <= tolerance
+            failed = failed or not passed
+            print(
+                f"{profile_name} / {arrival}: 予定数 {count}（期待値 {expected:.1f}, 許容差 {tolerance:.1f}）"
+                f" {'合格' if passed else '不合格'} / 生成 {elapsed * 1000:.1f} ms"
+            )
+    print(f"判定: {'不合格' if failed else '合格'}（目標 {args.rate} req/s, {args.duration}秒）")
+    return 1 if failed else 0
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(
+        prog="benchmark.py",
+        description="検証・テスト基盤のマイクロベンチマーク"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    results = subparsers.add_parser("results", help="検証結果の保持形式ごとのメモリ使用量")
+    results.add_argument("--count", type=int, default=100000, help="生成する検証結果の件数")
+    results.set_defaults(func=bench_results)
+
+    error_codes = subparsers.add_parser("error_codes", help="エラーコード割り当ての所要時間")
+    error_codes.add_argument("--count", type=int, default=100000, help="割り当てるエラーコードの件数")
+    error_codes.set_defaults(func=bench_error_codes)
+
+    sketch = subparsers.add_parser("sketch", help="分位点スケッチの精度")
+    sketch.add_argument("--count", type=int, default=200000, help="生成する値の件数")
+    sketch.add_argument("--workers", type=int, default=8, help="値を振り分けるワーカー数")
+    sketch.add_argument("--compression", type=float, default=200.0, help="t-digestの圧縮率")
+    sketch.add_argument("--rank-tolerance", type=float, default=0.005, help="許容する順位誤差")
+    sketch.add_argument("--relative-tolerance", type=float, default=0.02, help="許容する相対誤差")
+    sketch.add_argument("--seed", type=int, default=1, help="乱数シード")
+    sketch.set_defaults(func=bench_sketch)
+
+    stats = subparsers.add_parser("stats", help="レイテンシー解析の所要時間")
+    stats.add_argument("--count", type=int, default=200000, help="カテゴリごとのサンプル数")
+    stats.add_argument("--seed", type=int, default=1, help="乱数シード")
+    stats.set_defaults(func=bench_stats)
+
+    loop = subparsers.add_parser("loop", help="イベントループの方式ごとのスケジューリングコスト")
+    loop.add_argument("--tasks", type=int, default=100000, help="生成するタスクの件数")
+    loop.add_argument("--sleeps", type=int, default=2000, help="sleepの計測回数")
+    loop.add_argument("--duration", type=float, default=2.0, help="テストのループを再現する時間（秒）")
+    loop.set_defaults(func=bench_loop)
+
+    trials = subparsers.add_parser("trials", help="反復計測の信頼区間の被覆率")
+    trials.add_argument("--iterations", type=int, default=10, help="1試行の反復回数")
+    trials.add_argument("--repeats", type=int, default=2000, help="試行回数")
+    trials.add_argument("--confidence", type=float, default=0.95, help="信頼水準")
+    trials.add_argument("--tolerance", type=float, default=0.02, help="被覆率の許容差")
+    trials.add_argument("--outliers", choices=tuple(OUTLIER_METHODS), default="iqr", help="外れ値の除外方式")
+    trials.add_argument("--seed", type=int, default=1, help="乱数シード")
+    trials.set_defaults(func=bench_trials)
+
+    arrivals = subparsers.add_parser("arrivals", help="負荷プロファイルごとの予定数")
+    arrivals.add_argument("--rate", type=float, default=1200.0, help="目標レート（req/s）")
+    arrivals.add_argument("--duration", type=float, default=10.0, help="負荷の時間（秒）")
+    arrivals.add_argument("--ramp-up", type=float, default=0.0, help="rampで目標レートに達するまでの秒数（既定: 時間の半分）")
+    arrivals.add_argument("--steps", type=int, default=4, help="stepの段階数")
+    arrivals.add_argument("--seed", type=int, default=1, help="乱数シード")
+    arrivals.set_defaults(func=bench_arrivals)
+
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv[1:])
+    sys.exit(args.func(args) or 0)
+
+if __name__ == "__main__":
+    main()
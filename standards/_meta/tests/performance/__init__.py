@@ -0,0 +1,121 @@
+"""
+MCPフレームワーク標準v1.2.0準拠のパフォーマンス計測モジュール
+
+このモジュールは、以下の計測機能を提供します：
+
+1. レイテンシーヒストグラム
+   - 対数線形（HDR形式）のバケットによる固定メモリの記録
+   - 有効桁数による精度の指定
+   - p50/p95/p99/p99.9・平均・標準偏差の算出
+   - スナップショットの取得とマージ
+
+2. 分位点スケッチ
+   - マージ型t-digestによるストリーミングの分位点推定
+   - 裾の分位点ほど細かく保つスケール関数
+   - ワーカー・カテゴリごとの記録の結合
+   - LatencyHistogramと共通のインターフェース
+
+3. サンプルバッファ
+   - 事前確保したarray('d')への生のサンプルの記録
+   - NumPyによるベクトル化された分位点・平均・標準偏差の計算
+   - NumPyがない環境での純Pythonによる同一の計算
+
+4. 開ループ負荷生成
+   - 等間隔・ポアソン到着による予定開始時刻の生成
+   - 一定・ランプアップ・ステップの負荷プロファイル
+   - 予定開始時刻からのレイテンシー計測と送信できなかった予定の集計
+   - 閾値を満たす飽和スループットの探索
+
+5. ワークロードバックエンド
+   - プロセス内・stdio・HTTP/SSEの負荷対象を共通のインターフェースで呼び出し
+   - initializeによるハンドシェイクと永続接続上のJSON-RPC要求のパイプライン化
+   - 負荷試験用の最小限のMCPサーバー（mcp_standin）
+
+6. マルチプロセス負荷生成
+   - ワーカープロセスごとのイベントループと負荷対象への接続
+   - メトリクスの差分スナップショットのキューによる逐次送信
+   - コーディネーターによる全体のスループット・分位点の集計
+
+7. イベントループの選択
+   - 標準・uvloop・eager_task_factoryの方式の切り替え
+   - 環境変数による子プロセス・ワーカープロセスへの引き継ぎ
+
+8. リクエストレートの制御
+   - perf_counter_nsで駆動するトークンバケットによる送信間隔の制御
+   - 目標レートと達成レートの算出
+
+9. 計時
+   - perf_counter_nsによる単調増加する整数ナノ秒の計時
+   - 計時のオーバーヘッドの校正と計測値からの差し引き
+
+10. 実行結果の履歴と回帰検出
+   - コミット・ホストの識別子・実行設定とともに記録する追記専用のSQLiteデータベース
+   - Mann-WhitneyのU検定による基準の実行との比較と有意な悪化の検出
+
+11. 反復計測
+   - ウォームアップの後のシナリオの繰り返し実行と反復ごとの指標の収集
+   - 四分位範囲・MADによる外れ値の除外
+   - 平均（t分布）・中央値（順序統計量）の信頼区間と区間の幅による早期終了
+
+12. シナリオのプロファイル
+   - 設定ファイルで定義した計測時間・反復回数・同時実行数の切り替え
+   - 使用する資源が重ならないシナリオの並行実行
+
+各計測機能は、記録件数によらずメモリ使用量が一定となるよう設計されています。
+"""
+
+from .histogram import LatencyHistogram
+from .tdigest import TDigest
+from .samples import SampleBuffer
+from .recorders import LATENCY_BACKENDS, create_recorder, recorder_to_dict, recorder_from_dict
+from .load import LoadProfile, OpenLoopGenerator, OpenLoopResult, find_saturation_rate
+from .workload import (
+    WorkloadBackend, WorkloadError, InProcessBackend, StdioBackend, HttpSseBackend, create_backend
+)
+from .distributed import DistributedLoadCoordinator
+from .loops import LOOP_MODES, available_loop_modes, current_loop_mode
+from .pacer import TokenBucketPacer
+from .timing import Timer, calibrate_overhead
+from .history import ResultsStore, host_fingerprint, git_revision, measurement_config
+from .regression import mann_whitney_u, compare_samples, compare_runs
+from .trials import TrialHarness, summarize_trials, reject_outliers
+from .scenarios import SCENARIOS, ScenarioProfile
+
+__all__ = [
+    'LatencyHistogram',
+    'TDigest',
+    'SampleBuffer',
+    'LATENCY_BACKENDS',
+    'create_recorder',
+    'recorder_to_dict',
+    'recorder_from_dict',
+    'LoadProfile',
+    'OpenLoopGenerator',
+    'OpenLoopResult',
+    'find_saturation_rate',
+    'WorkloadBackend',
+    'WorkloadError',
+    'InProcessBackend',
+    'StdioBackend',
+    'HttpSseBackend',
+    'create_backend',
+    'DistributedLoadCoordinator',
+    'LOOP_MODES',
+    'available_loop_modes',
+    'current_loop_mode',
+    'TokenBucketPacer',
+    'Timer',
+    'calibrate_overhead',
+    'ResultsStore',
+    'host_fingerprint',
+    'git_revision',
+    'measurement_config',
+    'mann_whitney_u',
+    'compare_samples',
+    'compare_runs',
+    'TrialHarness',
+    'summarize_trials',
+    'reject_outliers',
+    'SCENARIOS',
+    'ScenarioProfile'
+]
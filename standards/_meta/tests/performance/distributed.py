@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any
+import asyncio
+import multiprocessing
+import queue as queue_module
+import time
+from .loops import run as run_event_loop
+from .load import LoadProfile, OpenLoopGenerator, OpenLoopResult
+from .recorders import create_recorder, recorder_to_dict, recorder_from_dict
+from .workload import create_backend, request_cycle
+from .timing import NS_PER_SECOND, Timer, now_ns
+
+# ワーカーがスナップショットを送信する間隔（秒）
+SNAPSHOT_INTERVAL = 1.0
+# ワーカーの準備（バックエンドへの接続）を待つ時間（秒）
+READY_TIMEOUT = 60.0
+
+class _LoadWorker:
+    """ワーカープロセス内で独自のイベントループを動かし、担当分の負荷を送信する
+
+    メトリクスは SNAPSHOT_INTERVAL ごとに前回からの差分としてキューへ送信する。
+    """
+    def __init__(self, index: int, config: Dict[str, Any], messages: Any, start_event: Any):
+        self.index = index
+        self.config = config
+        self.messages = messages
+        self.start_event = start_event
+        self.latency_backend = config.get('latency_backend', 'histogram')
+        self.methods: Dict[str, Dict[str, Any]] = {}
+        self.sequence = 0
+        self.timer = Timer()
+
+    def _send(self, kind: str, **payload: Any) -> None:
+        self.messages.put({"kind": kind, "worker": self.index, **payload})
+
+    def _method_metrics_for(self, method: str) -> Dict[str, Any]:
+        metrics = self.methods.get(method)
+        if metrics is None:
+            metrics = {"success_count": 0, "error_count": 0, "response_times": create_recorder(self.latency_backend)}
+            self.methods[method] = metrics
+        return metrics
+
+    def _send_snapshot(self, result: OpenLoopResult, kind: str = "snapshot") -> None:
+        methods = {
+            method: {
+                "success_count": metrics["success_count"],
+                "error_count": metrics["error_count"],
+                "response_times": recorder_to_dict(metrics["response_times"])
+            }
+            for method, metrics in self.methods.items()
+        }
+        self.methods = {}
+        self.sequence += 1
+        self._send(kind, sequence=self.sequence, result=result.take_snapshot(), methods=methods)
+
+    async def _report_periodically(self, result: OpenLoopResult) -> None:
+        interval = self.config.get('snapshot_interval', SNAPSHOT_INTERVAL)
+        while True:
+            await asyncio.sleep(interval)
+            self._send_snapshot(result)
+
+    async def _closed_loop(self, operation: Any, result: OpenLoopResult) -> None:
+        """同時実行数を維持して完了ごとに次の要求を送信"""
+        deadline = now_ns() + int(self.config['duration'] * NS_PER_SECOND)
+
+        async def loop() -> None:
+            while (start := now_ns()) < deadline:
+                result.scheduled += 1
+                result.dispatched += 1
+                try:
+                    await operation(result.scheduled)
+                except Exception:
+                    result.errors += 1
+                    continue
+                latency = self.timer.elapsed_ms(start)
+                result.latency.record(latency)
+                result.service_time.record(latency)
+                result.completed += 1
+
+        await asyncio.gather(*(loop() for _ in range(self.config.get('concurrency', 64))))
+
+    async def run(self) -> None:
+        config = self.config
+        backend = create_backend(config['workload'], config.get('base_dir'))
+        requests = request_cycle(config['workload'].get('requests'))
+
+        async def operation(index: int) -> None:
+            method, params = next(requests)
+            metrics = self._method_metrics_for(method)
+            start = now_ns()
+            try:
+                await backend.call(method, params)
+            except Exception:
+                metrics["error_count"] += 1
+                raise
+            metrics["response_times"].record(self.timer.elapsed_ms(start))
+            metrics["success_count"] += 1
+
+        self.timer = Timer.calibrated()
+        await backend.start()
+        try:
+            self._send("ready")
+            # 全ワーカーの準備が整うまで待機（イベントループを止めないよう別スレッドで待つ）
+            await asyncio.to_thread(self.start_event.wait)
+            rate = config.get('rate', 0.0)
+            result = OpenLoopResult(
+                rate, create_recorder(self.latency_backend), create_recorder(self.latency_backend)
+            )
+            # 計測区間は全プロセスで共通の単調時計で記録（壁時計の補正の影響を受けない）
+            started = time.monotonic()
+            reporter = asyncio.create_task(self._report_periodically(result))
+            try:
+                if config.get('mode', 'open') == 'open':
+                    profile = LoadProfile.create(
+                        config.get('profile', 'constant'), rate, config['duration'],
+                        config.get('ramp_up', 0.0), config.get('steps', 4)
+                    )
+                    seed = config.get('seed')
+                    generator = OpenLoopGenerator(
+                        operation, profile, config.get('arrival', 'constant'),
+                        seed=None if seed is None else seed + self.index, timer=self.timer
+                    )
+                    await generator.run(result)
+                else:
+                    await self._closed_loop(operation, result)
+            finally:
+                reporter.cancel()
+            self._send_snapshot(result, "final")
+            self._send("window", started=started, finished=time.monotonic())
+        finally:
+            await backend.close()
+
+def _worker_main(index: int, config: Dict[str, Any], messages: Any, start_event: Any) -> None:
+    """ワーカープロセスのエントリーポイント"""
+    try:
+        run_event_loop(_LoadWorker(index, config, messages, start_event).run(), config.get('loop'))
+    except BaseException as e:
+        messages.put({"kind": "error", "worker": index, "error": f"{type(e).__name__}: {str(e)}"})
+
+class DistributedLoadCoordinator:
+    """複数のワーカープロセスで負荷を送信し、スナップショットを結合するコーディネーター
+
+    各ワーカーは独自のイベントループとバックエンドへの接続を持ち、目標レート
+    （closed では同時実行数）を均等に分担する。全ワーカーの準備が整ってから
+    一斉に開始し、スループットは全ワーカーの計測期間（最初の開始から最後の終了まで）
+    に対する完了数、分位点は全ワーカーの記録を結合して求める。
+    """
+    def __init__(self, workers: int, config: Dict[str, Any], start_method: str = 'spawn'):
+        if workers < 1:
+            raise ValueError(f"ワーカー数は1以上を指定してください: {workers}")
+        self.workers = workers
+        self.config = config
+        self.start_method = start_method
+
+    def _worker_config(self) -> Dict[str, Any]:
+        config = dict(self.config)
+        config['rate'] = self.config.get('rate', 0.0) / self.workers
+        config['concurrency'] = max(self.config.get('concurrency', 64) // self.workers, 1)
+        return config
+
+    def run(self) -> Dict[str, Any]:
+        """全ワーカーの終了まで負荷を送信し、結合したメトリクスを返す"""
+        context = multiprocessing.get_context(self.start_method)
+        messages = context.Queue()
+        start_event = context.Event()
+        worker_config = self._worker_config()
+        processes = [
+            context.Process(target=_worker_main, args=(index, worker_config, messages, start_event), daemon=True)
+            for index in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        latency_backend = self.config.get('latency_backend', 'histogram')
+        total = OpenLoopResult(self.config.get('rate', 0.0),
+                               create_recorder(latency_backend), create_recorder(latency_backend))
+        methods: Dict[str, Dict[str, Any]] = {}
+        workers: List[Dict[str, Any]] = [
+            {"worker": index, "completed": 0, "errors": 0, "snapshots": 0, "error": None, "window": None}
+            for index in range(self.workers)
+        ]
+        ready = set()
+        finished = set()
+        ready_deadline = time.monotonic() + READY_TIMEOUT
+        try:
+            while len(finished) < self.workers:
+                if not start_event.is_set() and len(ready | finished) >= self.workers:
+                    start_event.set()
+                try:
+                    message = messages.get(timeout=1.0)
+                except queue_module.Empty:
+                    for index, process in enumerate(processes):
+                        if index not in finished and not process.is_alive() and messages.empty():
+                            workers[index]["error"] = workers[index]["error"] or f"終了コード {process.exitcode}"
+                            finished.add(index)
+                    if not start_event.is_set() and time.monotonic() > ready_deadline:
+                        raise TimeoutError("ワーカーの準備が完了しません")
+                    continue
+
+                worker = workers[message["worker"]]
+                kind = message["kind"]
+                if kind == "ready":
+                    ready.add(message["worker"])
+                elif kind in ("snapshot", "final"):
+                    snapshot = message["result"]
+                    total.merge_snapshot(snapshot)
+                    worker["completed"] += snapshot["completed"]
+                    worker["errors"] += snapshot["errors"] + snapshot["missed_slots"]
+                    worker["snapshots"] += 1
+                    for method, data in message["methods"].items():
+                        merged = methods.setdefault(method, {
+                            "success_count": 0, "error_count": 0, "response_times": create_recorder(latency_backend)
+                        })
+                        merged["success_count"] += data["success_count"]
+                        merged["error_count"] += data["error_count"]
+                        merged["response_times"].merge(recorder_from_dict(data["response_times"]))
+                elif kind == "window":
+                    worker["window"] = (message["started"], message["finished"])
+                    finished.add(message["worker"])
+                elif kind == "error":
+                    worker["error"] = message["error"]
+                    finished.add(message["worker"])
+        finally:
+            start_event.set()
+            for process in processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+
+        windows = [worker["window"] for worker in workers if worker["window"]]
+        total.elapsed = max(end for _, end in windows) - min(start for start, _ in windows) if windows else 0.0
+        for worker in workers:
+            window = worker.pop("window")
+            duration = window[1] - window[0] if window else 0.0
+            worker["throughput"] = worker["completed"] / duration if duration > 0 else 0.0
+        for data in methods.values():
+            data["throughput"] = data["success_count"] / total.elapsed if total.elapsed > 0 else 0.0
+        return {"result": total, "methods": methods, "workers": workers}
+
+    async def run_async(self) -> Dict[str, Any]:
+        """イベントループを止めずに実行（コーディネーターは別スレッドで動作）"""
+        return await asyncio.to_thread(self.run)
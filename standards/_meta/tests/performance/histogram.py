@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from array import array
+import math
+
+# 記録単位（ナノ秒）の1ミリ秒あたりの値
+NS_PER_MS = 1000000
+
+class LatencyHistogram:
+    """固定メモリの対数線形（HDR形式）レイテンシーヒストグラム
+
+    値はミリ秒で受け取り、整数ナノ秒として記録する（計時のオーバーヘッドを差し引いた
+    1マイクロ秒未満の差も保持する）。2のべき乗ごとの
+    バケットを significant_figures 桁の精度で線形に分割するため、相対誤差は
+    10^-significant_figures 以内に収まる。記録はO(1)、メモリ使用量は
+    記録件数によらず highest_trackable_ms と精度のみで決まる。
+    同じ設定のヒストグラム同士はマージでき、to_dict()でスナップショットを取得できる。
+    """
+    def __init__(self, significant_figures: int = 3, highest_trackable_ms: float = 3600000.0):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError(f"有効桁数は1〜5の範囲で指定してください: {significant_figures}")
+        self.significant_figures = significant_figures
+        self.highest_trackable_ms = highest_trackable_ms
+        self.highest_trackable_value = max(int(highest_trackable_ms * NS_PER_MS), 2)
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        self._sub_bucket_count_magnitude = max(math.ceil(math.log2(largest_single_unit)), 1)
+        self._sub_bucket_half_count_magnitude = self._sub_bucket_count_magnitude - 1
+        self._sub_bucket_count = 1 << self._sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= self.highest_trackable_value:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._bucket_count = bucket_count
+        self.counts = array('Q', bytes(8 * (bucket_count + 1) * self._sub_bucket_half_count))
+
+        self.total_count = 0
+        self.min_value: Optional[int] = None
+        self.max_value: Optional[int] = None
+        self._sum = 0.0
+        self._sum_of_squares = 0.0
+
+    def _counts_index(self, value: int) -> int:
+        bucket_index = (value | self._sub_bucket_mask).bit_length() - self._sub_bucket_count_magnitude
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket_index - self._sub_bucket_half_count
+
+    def _value_range(self, index: int) -> Tuple[int, int]:
+        """カウント配列の添字が表す値の範囲（最小値, 最大値）"""
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        lowest = sub_bucket_index << bucket_index
+        return lowest, lowest + (1 << bucket_index) - 1
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        """レイテンシー（ミリ秒）を記録"""
+        value = min(max(int(round(value_ms * NS_PER_MS)), 0), self.highest_trackable_value)
+        self.counts[self._counts_index(value)] += count
+        self.total_count += count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+        self._sum += value * count
+        self._sum_of_squares += value * value * count
+
+    def _check_compatible(self, other: 'LatencyHistogram') -> None:
+        if (other.significant_figures, other.highest_trackable_value) != \
+                (self.significant_figures, self.highest_trackable_value):
+            raise ValueError("設定の異なるヒストグラムはマージできません")
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """別のヒストグラムの記録を加算"""
+        self._check_compatible(other)
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self._merge_totals(other.total_count, other.min_value, other.max_value,
+                           other._sum, other._sum_of_squares)
+        return self
+
+    def _merge_totals(
+        self,
+        total_count: int,
+        min_value: Optional[int],
+        max_value: Optional[int],
+        value_sum: float,
+        sum_of_squares: float
+    ) -> None:
+        self.total_count += total_count
+        if min_value is not None and (self.min_value is None or min_value < self.min_value):
+            self.min_value = min_value
+        if max_value is not None and (self.max_value is None or max_value > self.max_value):
+            self.max_value = max_value
+        self._sum += value_sum
+        self._sum_of_squares += sum_of_squares
+
+    def reset(self) -> None:
+        """記録を消去"""
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.total_count = 0
+        self.min_value = None
+        self.max_value = None
+        self._sum = 0.0
+        self._sum_of_squares = 0.0
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """複数の分位点（ミリ秒、0 <= q <= 1）を1回の走査で取得"""
+        if not self.total_count:
+            return [None] * len(qs)
+        targets = sorted(
+            (max(1, math.ceil(min(max(q, 0.0), 1.0) * self.total_count)), i)
+            for i, q in enumerate(qs)
+        )
+        values: List[Optional[float]] = [self.max_value / NS_PER_MS] * len(qs)
+        position = 0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            cumulative += count
+            while position < len(targets) and cumulative >= targets[position][0]:
+                # バケット内の最大値を返し、実測の最小・最大値の範囲に収める
+                value = min(max(self._value_range(index)[1], self.min_value), self.max_value)
+                values[targets[position][1]] = value / NS_PER_MS
+                position += 1
+            if position == len(targets):
+                break
+        return values
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位点（ミリ秒、0 <= q <= 1）"""
+        return self.quantiles([q])[0]
+
+    def percentile(self, p: float) -> Optional[float]:
+        """パーセンタイル（ミリ秒、0 <= p <= 100）"""
+        return self.quantile(p / 100)
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.quantile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.quantile(0.95)
+
+    @property
+    def p99(self) -> Optional[float]:
+        return self.quantile(0.99)
+
+    @property
+    def p999(self) -> Optional[float]:
+        return self.quantile(0.999)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """平均値（ミリ秒）"""
+        if not self.total_count:
+            return None
+        return self._sum / self.total_count / NS_PER_MS
+
+    @property
+    def stddev(self) -> Optional[float]:
+        """標準偏差（ミリ秒、母標準偏差）"""
+        if not self.total_count:
+            return None
+        mean = self._sum / self.total_count
+        variance = max(self._sum_of_squares / self.total_count - mean * mean, 0.0)
+        return math.sqrt(variance) / NS_PER_MS
+
+    def stats(self) -> Optional[Dict[str, float]]:
+        """主要な統計値（ミリ秒）"""
+        if not self.total_count:
+            return None
+        p50, p95, p99, p999 = self.quantiles([0.50, 0.95, 0.99, 0.999])
+        return {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "p99.9": p999,
+            "mean": self.mean,
+            "stddev": self.stddev,
+            "min": self.min_value / NS_PER_MS,
+            "max": self.max_value / NS_PER_MS,
+            "count": self.total_count
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """スナップショット（記録のある添字のみを保持）"""
+        return {
+            "significant_figures": self.significant_figures,
+            "highest_trackable_ms": self.highest_trackable_ms,
+            "total_count": self.total_count,
+            "min": self.min_value,
+            "max": self.max_value,
+            "sum": self._sum,
+            "sum_of_squares": self._sum_of_squares,
+            "counts": [[index, count] for index, count in enumerate(self.counts) if count]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        """スナップショットからの復元"""
+        histogram = cls(data["significant_figures"], data["highest_trackable_ms"])
+        for index, count in data["counts"]:
+            histogram.counts[index] = count
+        histogram._merge_totals(data["total_count"], data["min"], data["max"],
+                                data["sum"], data["sum_of_squares"])
+        return histogram
+
+    def merge_dict(self, data: Dict[str, Any]) -> 'LatencyHistogram':
+        """スナップショットの記録を加算"""
+        return self.merge(LatencyHistogram.from_dict(data))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+
+# 既定の保存先（メタディレクトリ内のファイル名）
+HISTORY_FILENAME = "performance_history.sqlite"
+# データベースの形式のバージョン（PRAGMA user_version）
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    git_commit TEXT,
+    git_dirty INTEGER NOT NULL DEFAULT 0,
+    host_fingerprint TEXT NOT NULL,
+    host TEXT NOT NULL,
+    config TEXT NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    metric_name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT NOT NULL,
+    stats TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs(git_commit);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics(run_id);
+CREATE TRIGGER IF NOT EXISTS runs_append_only_update BEFORE UPDATE ON runs
+    BEGIN SELECT RAISE(ABORT, 'performance history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS runs_append_only_delete BEFORE DELETE ON runs
+    BEGIN SELECT RAISE(ABORT, 'performance history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS metrics_append_only_update BEFORE UPDATE ON metrics
+    BEGIN SELECT RAISE(ABORT, 'performance history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS metrics_append_only_delete BEFORE DELETE ON metrics
+    BEGIN SELECT RAISE(ABORT, 'performance history is append-only'); END;
+"""
+
+def host_info() -> Dict[str, Any]:
+    """計測結果に影響するホストの情報"""
+    info = {
+        "node": platform.node(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}"
+    }
+    try:
+        import psutil
+        info["memory_total"] = psutil.virtual_memory().total
+    except ImportError:
+        pass
+    return info
+
+def host_fingerprint(info: Optional[Dict[str, Any]] = None) -> str:
+    """ホスト情報から求めた識別子（同じホスト・環境の計測結果の抽出に使用）"""
+    encoded = json.dumps(info or host_info(), sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def git_revision(path: str) -> Tuple[Optional[str], bool]:
+    """作業ツリーのコミットと未コミットの変更の有無（gitで管理されていない場合は None）"""
+    try:
+        commit = subprocess.run(
+            ["git", "-C", path, "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "-C", path, "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit or None, bool(status.strip())
+
+# 計測結果に影響する実行設定（比較する実行同士で一致している必要がある項目）
+MEASUREMENT_CONFIG_KEYS = ('profile', 'workload_backend', 'workers', 'load_mode', 'rate')
+
+def measurement_config(run: Dict[str, Any]) -> Dict[str, Any]:
+    """実行（select_runs() の要素）の設定のうち計測結果に影響する項目"""
+    config = json.loads(run['config']) if run.get('config') else {}
+    return {key: config.get(key) for key in MEASUREMENT_CONFIG_KEYS}
+
+def _labels_key(labels: Dict[str, str]) -> str:
+    return json.dumps(labels, sort_keys=True, ensure_ascii=False)
+
+class ResultsStore:
+    """パフォーマンステストの実行ごとのメトリクスを蓄積する追記専用のSQLiteデータベース
+
+    各実行はコミット・ホストの識別子・実行設定とともに記録し、更新・削除はトリガーで拒否する。
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.connection.close()
+            raise ValueError(f"未対応の履歴データベースのバージョン: {version}")
+        self.connection.executescript(_SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def record(self, document: Dict[str, Any], config: Dict[str, Any], repository: str,
+               label: Optional[str] = None) -> int:
+        """メトリクス文書（to_dict() の形式）を1回の実行として追記し、実行IDを返す"""
+        commit, dirty = git_revision(repository)
+        info = host_info()
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (recorded_at, source, git_commit, git_dirty, host_fingerprint, host, config, label)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    document.get("timestamp") or datetime.now().isoformat(timespec='seconds'),
+                    document.get("source", os.path.basename(sys.argv[0])),
+                    commit, int(dirty), host_fingerprint(info),
+                    json.dumps(info, ensure_ascii=False),
+                    json.dumps(config, ensure_ascii=False, sort_keys=True, default=str),
+                    label
+                )
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO metrics (run_id, metric_name, labels, value, unit, stats) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id, metric["metric_name"], _labels_key(metric.get("labels", {})),
+                        float(metric["value"]), metric["unit"],
+                        json.dumps(metric["stats"]) if metric.get("stats") is not None else None
+                    )
+                    for metric in document.get("metrics", [])
+                ]
+            )
+        return run_id
+
+    def select_runs(self, ref: str, source: Optional[str] = None,
+                    host: Optional[str] = None) -> List[Dict[str, Any]]:
+        """ラベルが一致する、またはコミットが前方一致する実行（記録順）"""
+        query = "SELECT * FROM runs WHERE (label = ? OR git_commit LIKE ?)"
+        params: List[Any] = [ref, f"{ref}%"]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        if host:
+            query += " AND host_fingerprint = ?"
+            params.append(host)
+        return [dict(row) for row in self.connection.execute(query + " ORDER BY id", params)]
+
+    def latest_commit(self, source: Optional[str] = None, host: Optional[str] = None) -> Optional[str]:
+        """最後に記録された実行のコミット"""
+        query = "SELECT git_commit FROM runs WHERE git_commit IS NOT NULL"
+        params: List[Any] = []
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        if host:
+            query += " AND host_fingerprint = ?"
+            params.append(host)
+        row = self.connection.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return row[0] if row else None
+
+    def samples(self, run_ids: List[int]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """実行ごとの値を (メトリクス名, ラベル) 単位でまとめる（値は実行の記録順）"""
+        samples: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        if not run_ids:
+            return samples
+        placeholders = ",".join("?" * len(run_ids))
+        rows = self.connection.execute(
+            f"SELECT metric_name, labels, value, unit FROM metrics WHERE run_id IN ({placeholders})"
+            " ORDER BY run_id, rowid", run_ids
+        )
+        for row in rows:
+            entry = samples.setdefault((row["metric_name"], row["labels"]), {
+                "metric_name": row["metric_name"],
+                "labels": json.loads(row["labels"]),
+                "unit": row["unit"],
+                "values": []
+            })
+            entry["values"].append(row["value"])
+        return samples
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Iterator, Tuple
+import asyncio
+import math
+import random
+from .histogram import LatencyHistogram
+from .recorders import recorder_to_dict, recorder_from_dict
+from .timing import NS_PER_SECOND, Timer, now_ns
+
+ARRIVAL_PROCESSES = ('constant', 'poisson')
+LOAD_PROFILES = ('constant', 'ramp', 'step')
+
+class LoadProfile:
+    """目標リクエストレートの時間変化（段階ごとの開始・終了レートを線形補間）"""
+    def __init__(self, stages: List[Tuple[float, float, float]]):
+        if not stages:
+            raise ValueError("負荷プロファイルには1つ以上の段階が必要です")
+        for duration, start_rate, end_rate in stages:
+            if duration <= 0 or start_rate < 0 or end_rate < 0:
+                raise ValueError(f"不正な負荷段階: {(duration, start_rate, end_rate)}")
+        self.stages = stages
+
+    @classmethod
+    def constant(cls, rate: float, duration: float) -> 'LoadProfile':
+        """一定レート"""
+        return cls([(duration, rate, rate)])
+
+    @classmethod
+    def ramp(cls, rate: float, duration: float, ramp_up: float) -> 'LoadProfile':
+        """ramp_up秒かけて0から目標レートまで上げ、残りの時間は維持"""
+        ramp_up = min(ramp_up, duration)
+        stages = [(ramp_up, 0.0, rate)] if ramp_up > 0 else []
+        if duration > ramp_up:
+            stages.append((duration - ramp_up, rate, rate))
+        return cls(stages)
+
+    @classmethod
+    def step(cls, rate: float, duration: float, steps: int) -> 'LoadProfile':
+        """目標レートまでsteps段階で等間隔に上げる（各段階は同じ時間）"""
+        steps = max(steps, 1)
+        return cls([(duration / steps, rate * i / steps, rate * i / steps) for i in range(1, steps + 1)])
+
+    @classmethod
+    def create(cls, profile: str, rate: float, duration: float, ramp_up: float = 0.0, steps: int = 4) -> 'LoadProfile':
+        """名前による生成（constant / ramp / step）"""
+        if profile == 'constant':
+            return cls.constant(rate, duration)
+        if profile == 'ramp':
+            return cls.ramp(rate, duration, ramp_up or duration / 2)
+        if profile == 'step':
+            return cls.step(rate, duration, steps)
+        raise ValueError(f"未定義の負荷プロファイル: {profile}")
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for duration, _, _ in self.stages)
+
+    @property
+    def mean_rate(self) -> float:
+        """全体を通した平均の目標レート（req/s）"""
+        return sum(duration * (start_rate + end_rate) / 2
+                   for duration, start_rate, end_rate in self.stages) / self.duration
+
+    def rate_at(self, elapsed: float) -> float:
+        """経過時間（秒）における目標レート（req/s）"""
+        offset = 0.0
+        for duration, start_rate, end_rate in self.stages:
+            if elapsed < offset + duration:
+                return start_rate + (end_rate - start_rate) * (elapsed - offset) / duration
+            offset += duration
+        return 0.0
+
+    def iter_arrivals(self, arrival: str = 'constant', rng: Optional[random.Random] = None) -> Iterator[float]:
+        """リクエストの予定開始時刻（開始からの経過秒）を順に生成
+
+        目標レートの積分（累積到着数）Λ(t) の逆関数で時刻へ変換する。constant は Λ が
+        1, 2, 3, ... となる時刻、poisson は Λ の尺度で平均1の指数分布の間隔をとる時刻
+        （非斉次ポアソン過程）とする。各段階ではレートが線形のため Λ は2次式で、閉じた形で解ける。
+        """
+        if arrival not in ARRIVAL_PROCESSES:
+            raise ValueError(f"未定義の到着過程: {arrival}")
+        rng = rng or random.Random()
+
+        def gap() -> float:
+            return 1.0 if arrival == 'constant' else rng.expovariate(1.0)
+
+        total = self.duration
+        offset = 0.0      # 段階の開始時刻
+        cumulative = 0.0  # 段階の開始時点の累積到着数
+        position = gap()  # 次の到着の累積到着数
+        for duration, start_rate, end_rate in self.stages:
+            stage_count = duration * (start_rate + end_rate) / 2
+            slope = (end_rate - start_rate) / duration
+            while position - cumulative <= stage_count:
+                # start_rate * s + slope * s^2 / 2 = u の解（桁落ちしない形）
+                u = position - cumulative
+                root = math.sqrt(max(start_rate * start_rate + 2 * slope * u, 0.0))
+                s = 2 * u / (start_rate + root) if start_rate + root > 0 else 0.0
+                elapsed = offset + min(s, duration)
+                if elapsed < total:
+                    yield elapsed
+                position += gap()
+            cumulative += stage_count
+            offset += duration
+
+class OpenLoopResult:
+    """開ループ負荷の計測結果（target_rate は負荷プロファイルの平均レート）
+
+    latency は予定開始時刻からの応答時間（coordinated omission を補正した値）、
+    service_time は実際の送信時刻からの応答時間。
+    missed_slots は同時実行数の上限により送信できなかった予定、
+    late_slots は許容範囲を超えて遅れて送信した予定の数。
+    """
+    def __init__(self, target_rate: float, latency: Any, service_time: Any):
+        self.target_rate = target_rate
+        self.latency = latency
+        self.service_time = service_time
+        self.scheduled = 0
+        self.dispatched = 0
+        self.completed = 0
+        self.errors = 0
+        self.missed_slots = 0
+        self.late_slots = 0
+        self.max_lateness = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def achieved_rate(self) -> float:
+        """完了したリクエストのレート（req/s）"""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """予定数に対するエラーと送信できなかった予定の割合"""
+        return (self.errors + self.missed_slots) / self.scheduled if self.scheduled else 0.0
+
+    def breaches(self, latency_ms: float, max_error_rate: float, quantile: float = 0.99,
+                 min_rate_ratio: float = 0.95) -> List[str]:
+        """閾値の超過内容（超過がなければ空）"""
+        reasons = []
+        latency = self.latency.quantile(quantile)
+        if latency is not None and latency > latency_ms:
+            reasons.append(f"P{quantile * 100:g}レイテンシー {latency:.2f}ms > {latency_ms}ms")
+        if self.error_rate > max_error_rate:
+            reasons.append(f"エラー率 {self.error_rate:.4f} > {max_error_rate}")
+        if self.missed_slots:
+            reasons.append(f"送信できなかった予定 {self.missed_slots}件")
+        if self.achieved_rate < self.target_rate * min_rate_ratio:
+            reasons.append(f"達成レート {self.achieved_rate:.1f} < 目標 {self.target_rate:.1f} req/s")
+        return reasons
+
+    _COUNTERS = ('scheduled', 'dispatched', 'completed', 'errors', 'missed_slots', 'late_slots')
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """前回のスナップショット以降の差分を取得して記録を空にする（プロセス間の受け渡し用）"""
+        snapshot = {name: getattr(self, name) for name in self._COUNTERS}
+        snapshot["max_lateness"] = self.max_lateness
+        snapshot["latency"] = recorder_to_dict(self.latency)
+        snapshot["service_time"] = recorder_to_dict(self.service_time)
+        for name in self._COUNTERS:
+            setattr(self, name, 0)
+        self.max_lateness = 0.0
+        self.latency = type(self.latency)()
+        self.service_time = type(self.service_time)()
+        return snapshot
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> 'OpenLoopResult':
+        """差分のスナップショットを加算"""
+        for name in self._COUNTERS:
+            setattr(self, name, getattr(self, name) + snapshot[name])
+        self.max_lateness = max(self.max_lateness, snapshot["max_lateness"])
+        self.latency.merge(recorder_from_dict(snapshot["latency"]))
+        self.service_time.merge(recorder_from_dict(snapshot["service_time"]))
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "target_rate": self.target_rate,
+            "achieved_rate": self.achieved_rate,
+            "scheduled": self.scheduled,
+            "dispatched": self.dispatched,
+            "completed": self.completed,
+            "errors": self.errors,
+            "missed_slots": self.missed_slots,
+            "late_slots": self.late_slots,
+            "max_lateness_ms": self.max_lateness * 1000,
+            "error_rate": self.error_rate,
+            "latency": self.latency.stats(),
+            "service_time": self.service_time.stats()
+        }
+
+class OpenLoopGenerator:
+    """予定開始時刻に従ってリクエストを送信する開ループ負荷生成器
+
+    応答を待たずに予定どおり送信するため、処理の遅延が後続のリクエストの
+    送信を遅らせることはない（coordinated omission が生じない）。
+    operation は予定の通し番号を受け取り、失敗時は例外を送出する。
+    時刻は整数ナノ秒で扱い、応答時間は timer のオーバーヘッドを差し引いて記録する。
+    """
+    def __init__(
+        self,
+        operation: Callable[[int], Awaitable[Any]],
+        profile: LoadProfile,
+        arrival: str = 'constant',
+        recorder_factory: Callable[[], Any] = LatencyHistogram,
+        max_outstanding: int = 10000,
+        late_tolerance: float = 0.001,
+        seed: Optional[int] = None,
+        timer: Optional[Timer] = None
+    ):
+        self.operation = operation
+        self.profile = profile
+        self.arrival = arrival
+        self.recorder_factory = recorder_factory
+        self.max_outstanding = max_outstanding
+        self.late_tolerance = late_tolerance
+        self.seed = seed
+        self.timer = timer or Timer()
+
+    async def _issue(self, index: int, intended: int, result: OpenLoopResult) -> None:
+        sent = now_ns()
+        try:
+            await self.operation(index)
+        except Exception:
+            result.errors += 1
+            return
+        finished = now_ns()
+        result.latency.record(self.timer.elapsed_ms(intended, finished))
+        result.service_time.record(self.timer.elapsed_ms(sent, finished))
+        result.completed += 1
+
+    async def run(self, result: Optional[OpenLoopResult] = None) -> OpenLoopResult:
+        """負荷プロファイルの終了まで送信し、送信済みのリクエストの完了を待つ
+
+        result を指定した場合はそこへ記録する（実行中のスナップショット取得用）。
+        """
+        if result is None:
+            result = OpenLoopResult(self.profile.mean_rate, self.recorder_factory(), self.recorder_factory())
+        outstanding = set()
+        late_tolerance = int(self.late_tolerance * NS_PER_SECOND)
+        start = now_ns()
+        for index, offset in enumerate(self.profile.iter_arrivals(self.arrival, random.Random(self.seed))):
+            intended = start + int(offset * NS_PER_SECOND)
+            delay = intended - now_ns()
+            if delay > 0:
+                await asyncio.sleep(delay / NS_PER_SECOND)
+            result.scheduled += 1
+            if len(outstanding) >= self.max_outstanding:
+                result.missed_slots += 1
+                continue
+            lateness = now_ns() - intended
+            if lateness > late_tolerance:
+                result.late_slots += 1
+            result.max_lateness = max(result.max_lateness, lateness / NS_PER_SECOND)
+            task = asyncio.create_task(self._issue(index, intended, result))
+            outstanding.add(task)
+            task.add_done_callback(outstanding.discard)
+            result.dispatched += 1
+        if outstanding:
+            await asyncio.gather(*outstanding)
+        result.elapsed = (now_ns() - start) / NS_PER_SECOND
+        return result
+
+async def find_saturation_rate(
+    run_at: Callable[[float], Awaitable[OpenLoopResult]],
+    latency_ms: float,
+    max_error_rate: float,
+    start_rate: float = 100.0,
+    max_rate: float = 100000.0,
+    growth: float = 2.0,
+    refine_steps: int = 3
+) -> Dict[str, Any]:
+    """閾値を満たす最大のレート（飽和スループット）を探索
+
+    start_rate からgrowth倍ずつレートを上げ、閾値を超えた時点で
+    直前のレートとの間を refine_steps 回の二分探索で絞り込む。
+    """
+    probes: List[Dict[str, Any]] = []
+
+    async def probe(rate: float) -> bool:
+        result = await run_at(rate)
+        reasons = result.breaches(latency_ms, max_error_rate)
+        probes.append({"rate": rate, "passed": not reasons, "reasons": reasons, "result": result.to_dict()})
+        return not reasons
+
+    passed_rate = 0.0
+    failed_rate = None
+    rate = start_rate
+    while rate <= max_rate:
+        if await probe(rate):
+            passed_rate = rate
+            rate *= growth
+        else:
+            failed_rate = rate
+            break
+    if failed_rate is not None and passed_rate > 0:
+        low, high = passed_rate, failed_rate
+        for _ in range(refine_steps):
+            middle = (low + high) / 2
+            if await probe(middle):
+                low = middle
+            else:
+                high = middle
+        passed_rate = low
+    return {
+        "saturation_rate": passed_rate,
+        "saturated": failed_rate is not None,
+        "latency_threshold_ms": latency_ms,
+        "error_rate_threshold": max_error_rate,
+        "probes": probes
+    }
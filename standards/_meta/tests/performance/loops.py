@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+import asyncio
+import os
+import sys
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# イベントループの方式（default: 標準 / uvloop: uvloop / eager: 標準ループ + eager_task_factory）
+LOOP_MODES = ('default', 'uvloop', 'eager')
+# 方式を子プロセスへ引き継ぐための環境変数
+EVENT_LOOP_ENV = 'MCP_EVENT_LOOP'
+
+T = TypeVar('T')
+
+def available_loop_modes() -> List[str]:
+    """この環境で利用可能な方式"""
+    modes = ['default']
+    if uvloop is not None:
+        modes.append('uvloop')
+    if hasattr(asyncio, 'eager_task_factory'):
+        modes.append('eager')
+    return modes
+
+def resolve_loop_mode(mode: Optional[str] = None) -> str:
+    """使用する方式を決定（指定がなければ環境変数、利用できない方式は default）"""
+    mode = mode or os.environ.get(EVENT_LOOP_ENV) or 'default'
+    if mode not in LOOP_MODES:
+        raise ValueError(f"未定義のイベントループ方式: {mode}")
+    if mode not in available_loop_modes():
+        print(f"イベントループ方式 {mode} は利用できないため default を使用します", file=sys.stderr)
+        return 'default'
+    return mode
+
+def loop_factory(mode: str) -> Callable[[], asyncio.AbstractEventLoop]:
+    """方式に応じたイベントループの生成関数"""
+    if mode == 'uvloop':
+        return uvloop.new_event_loop
+    if mode == 'eager':
+        def new_eager_loop() -> asyncio.AbstractEventLoop:
+            loop = asyncio.new_event_loop()
+            loop.set_task_factory(asyncio.eager_task_factory)
+            return loop
+        return new_eager_loop
+    return asyncio.new_event_loop
+
+class _FallbackRunner:
+    """asyncio.Runner のないPython 3.10向けの同等の実行器（run のたびに同じループを使用）"""
+    def __init__(self, loop_factory: Callable[[], asyncio.AbstractEventLoop]):
+        self._loop_factory = loop_factory
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __enter__(self) -> '_FallbackRunner':
+        self._loop = self._loop_factory()
+        asyncio.set_event_loop(self._loop)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, main: Awaitable[T]) -> T:
+        return self._loop.run_until_complete(main)
+
+    def close(self) -> None:
+        """残りのタスクを取り消し、非同期ジェネレーターと既定のエグゼキューターを終了してループを閉じる"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            for task in tasks:
+                if not task.cancelled() and task.exception() is not None:
+                    loop.call_exception_handler({
+                        "message": "unhandled exception during event loop shutdown",
+                        "exception": task.exception(),
+                        "task": task
+                    })
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+            self._loop = None
+
+def new_runner(factory: Callable[[], asyncio.AbstractEventLoop]) -> Any:
+    """イベントループの生成関数を使う実行器（asyncio.Runner、Python 3.10では同等の代替）"""
+    if hasattr(asyncio, 'Runner'):
+        return asyncio.Runner(loop_factory=factory)
+    return _FallbackRunner(factory)
+
+def run(main: Awaitable[T], mode: Optional[str] = None) -> T:
+    """指定した方式のイベントループでコルーチンを実行（asyncio.run の代替）
+
+    決定した方式は環境変数に設定し、子プロセスへ引き継ぐ。
+    """
+    mode = resolve_loop_mode(mode)
+    os.environ[EVENT_LOOP_ENV] = mode
+    with new_runner(loop_factory(mode)) as runner:
+        return runner.run(main)
+
+def current_loop_mode() -> str:
+    """実行中のイベントループの方式"""
+    loop = asyncio.get_running_loop()
+    if uvloop is not None and isinstance(loop, uvloop.Loop):
+        return 'uvloop'
+    if hasattr(asyncio, 'eager_task_factory') and loop.get_task_factory() is asyncio.eager_task_factory:
+        return 'eager'
+    return 'default'
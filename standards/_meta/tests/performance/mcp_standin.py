@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""負荷試験用の最小限のMCPサーバー（stdio / HTTP・SSE）
+
+    python -m performance.mcp_standin --transport stdio
+    python -m performance.mcp_standin --transport http --port 8765 --delay 1
+"""
+from typing import Dict, Any, Optional
+import argparse
+import asyncio
+import json
+import sys
+from .loops import run as run_event_loop
+
+SERVER_INFO = {"name": "mcp-standin", "version": "1.2.0"}
+TOOLS = [{
+    "name": "echo",
+    "description": "引数をそのまま返す",
+    "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}}
+}]
+
+class StandinServer:
+    """initialize・ping・tools/list・tools/call・resources/list に応答するサーバー"""
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay = delay_ms / 1000
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "initialize":
+            return {
+                "protocolVersion": params.get("protocolVersion", "2024-11-05"),
+                "capabilities": {"tools": {}, "resources": {}},
+                "serverInfo": SERVER_INFO
+            }
+        if method == "ping":
+            return {}
+        if method == "tools/list":
+            return {"tools": TOOLS}
+        if method == "tools/call":
+            if params.get("name") != "echo":
+                raise LookupError(f"Unknown tool: {params.get('name')}")
+            text = json.dumps(params.get("arguments", {}), ensure_ascii=False)
+            return {"content": [{"type": "text", "text": text}], "isError": False}
+        if method == "resources/list":
+            return {"resources": []}
+        raise KeyError(method)
+
+    async def handle(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """1件のJSON-RPCメッセージを処理（通知には応答しない）"""
+        if "id" not in message:
+            return None
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        try:
+            result = self._result(message.get("method", ""), message.get("params") or {})
+        except KeyError:
+            return {"jsonrpc": "2.0", "id": message["id"],
+                    "error": {"code": -32601, "message": "Method not found"}}
+        except LookupError as e:
+            return {"jsonrpc": "2.0", "id": message["id"],
+                    "error": {"code": -32602, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+async def serve_stdio(server: StandinServer) -> None:
+    """標準入出力で1行1件のJSONを送受信（要求は並行に処理）"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=16 * 1024 * 1024)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    out = sys.stdout.buffer
+    tasks = set()
+
+    async def respond(message: Dict[str, Any]) -> None:
+        response = await server.handle(message)
+        if response is not None:
+            out.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            out.flush()
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if line.strip():
+            task = asyncio.create_task(respond(json.loads(line)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+def serve_http(server: StandinServer, host: str, port: int, path: str) -> None:
+    """HTTPのPOSTでJSON-RPCを受け付け、Acceptに応じてSSEまたはJSONで応答"""
+    from aiohttp import web
+
+    async def post(request: 'web.Request') -> 'web.StreamResponse':
+        response = await server.handle(await request.json())
+        if response is None:
+            return web.Response(status=202)
+        headers = {"Mcp-Session-Id": request.headers.get("Mcp-Session-Id", "standin")}
+        if "text/event-stream" not in request.headers.get("Accept", ""):
+            return web.json_response(response, headers=headers)
+        stream = web.StreamResponse(headers={**headers, "Content-Type": "text/event-stream"})
+        await stream.prepare(request)
+        await stream.write(f"event: message\ndata: {json.dumps(response, ensure_ascii=False)}\n\n".encode('utf-8'))
+        await stream.write_eof()
+        return stream
+
+    app = web.Application()
+    app.router.add_post(path, post)
+    web.run_app(app, host=host, port=port, print=None)
+
+def main():
+    parser = argparse.ArgumentParser(prog="mcp_standin", description="負荷試験用の最小限のMCPサーバー")
+    parser.add_argument("--transport", choices=("stdio", "http"), default="stdio", help="トランスポート")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTPの待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="HTTPの待ち受けポート")
+    parser.add_argument("--path", default="/mcp", help="HTTPのエンドポイント")
+    parser.add_argument("--delay", type=float, default=0.0, help="応答までの遅延（ミリ秒）")
+    args = parser.parse_args()
+
+    server = StandinServer(args.delay)
+    if args.transport == "stdio":
+        # 負荷試験側と同じイベントループの方式（環境変数 MCP_EVENT_LOOP）で動作
+        run_event_loop(serve_stdio(server))
+    else:
+        serve_http(server, args.host, args.port, args.path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional
+import asyncio
+from .timing import NS_PER_SECOND, now_ns
+
+class TokenBucketPacer:
+    """トークンバケットによるリクエストレートの制御（perf_counter_ns による整数ナノ秒で計時）
+
+    rate（req/s）でトークンを補充し、burst 個まで蓄積できる。acquire() はトークンが
+    得られるまで待機して取得時刻を返し、duration 秒の計測期間を過ぎると None を返す。
+    処理が間に合わず遅れた分は burst を超えて取り戻さない。rate が0以下の場合は制限しない。
+    """
+    def __init__(self, rate: float, duration: float, burst: int = 1):
+        if burst < 1:
+            raise ValueError(f"burstは1以上を指定してください: {burst}")
+        self.target_rate = rate
+        self.burst = burst
+        self.duration_ns = int(duration * NS_PER_SECOND)
+        self._interval_ns = int(NS_PER_SECOND / rate) if rate > 0 else 0
+        self.acquired = 0
+        self.started_ns: Optional[int] = None
+        self.finished_ns: Optional[int] = None
+        self._deadline_ns = 0
+        # 次のトークンが補充される時刻
+        self._allowed_ns = 0
+
+    async def acquire(self) -> Optional[int]:
+        """トークンを1つ取得して取得時刻（perf_counter_ns）を返す（計測期間の終了後は None）"""
+        now = now_ns()
+        if self.started_ns is None:
+            self.started_ns = now
+            self._deadline_ns = now + self.duration_ns
+            self._allowed_ns = now
+        if self.finished_ns is not None:
+            return None
+        if self._interval_ns:
+            # 蓄積できるトークンは burst 個まで（それ以前の未使用分は失効）
+            allowed = max(self._allowed_ns, now - (self.burst - 1) * self._interval_ns)
+            if allowed >= self._deadline_ns:
+                self.finished_ns = max(now, self._deadline_ns)
+                return None
+            if allowed > now:
+                await asyncio.sleep((allowed - now) / NS_PER_SECOND)
+                now = now_ns()
+            self._allowed_ns = allowed + self._interval_ns
+        if now >= self._deadline_ns:
+            self.finished_ns = now
+            return None
+        self.acquired += 1
+        return now
+
+    @property
+    def elapsed(self) -> float:
+        """計測期間（秒、実行中は現在までの経過時間）"""
+        if self.started_ns is None:
+            return 0.0
+        end = self.finished_ns if self.finished_ns is not None else now_ns()
+        return (end - self.started_ns) / NS_PER_SECOND
+
+    @property
+    def achieved_rate(self) -> float:
+        """取得したトークンのレート（req/s）"""
+        elapsed = self.elapsed
+        return self.acquired / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "target_rate": self.target_rate,
+            "achieved_rate": self.achieved_rate,
+            "requests": self.acquired,
+            "elapsed": self.elapsed
+        }
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Union
+from .histogram import LatencyHistogram
+from .tdigest import TDigest
+from .samples import SampleBuffer
+
+LATENCY_BACKENDS = ('histogram', 'tdigest', 'samples')
+LATENCY_RECORDERS = (LatencyHistogram, TDigest, SampleBuffer)
+LatencyRecorder = Union[LatencyHistogram, TDigest, SampleBuffer]
+
+def create_recorder(backend: str = 'histogram') -> LatencyRecorder:
+    """レイテンシー記録先の生成（histogram / tdigest / samples）"""
+    if backend == 'histogram':
+        return LatencyHistogram()
+    if backend == 'tdigest':
+        return TDigest()
+    if backend == 'samples':
+        return SampleBuffer()
+    raise ValueError(f"未定義のレイテンシー記録方式: {backend}")
+
+def recorder_backend(recorder: LatencyRecorder) -> str:
+    """記録先の方式名"""
+    for backend, recorder_type in zip(LATENCY_BACKENDS, LATENCY_RECORDERS):
+        if isinstance(recorder, recorder_type):
+            return backend
+    raise ValueError(f"未定義のレイテンシー記録先: {type(recorder).__name__}")
+
+def recorder_to_dict(recorder: LatencyRecorder) -> Dict[str, Any]:
+    """方式名付きのスナップショット（プロセス間の受け渡し用）"""
+    return {"backend": recorder_backend(recorder), "data": recorder.to_dict()}
+
+def recorder_from_dict(snapshot: Dict[str, Any]) -> LatencyRecorder:
+    """方式名付きのスナップショットからの復元"""
+    recorder_type = dict(zip(LATENCY_BACKENDS, LATENCY_RECORDERS)).get(snapshot["backend"])
+    if recorder_type is None:
+        raise ValueError(f"未定義のレイテンシー記録方式: {snapshot['backend']}")
+    return recorder_type.from_dict(snapshot["data"])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Sequence, Tuple, Callable
+from functools import lru_cache
+import math
+import statistics
+
+# 厳密なp値を求める最大のサンプル数（それを超える場合や同順位がある場合は正規近似）
+EXACT_MAX_SAMPLES = 20
+
+def _ranks(values: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """同順位を平均した順位と、同順位の各グループの大きさ"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+@lru_cache(maxsize=None)
+def _u_distribution(m: int, n: int) -> Tuple[int, ...]:
+    """同順位がない場合のU統計量の分布（各値をとる並びの数）"""
+    if m == 0 or n == 0:
+        return (1,)
+    # 最大の値が x 側にある場合（U が n 増える）と y 側にある場合の和
+    with_x = _u_distribution(m - 1, n)
+    with_y = _u_distribution(m, n - 1)
+    counts = [0] * (m * n + 1)
+    for u, count in enumerate(with_x):
+        counts[u + n] += count
+    for u, count in enumerate(with_y):
+        counts[u] += count
+    return tuple(counts)
+
+def mann_whitney_u(x: Sequence[float], y: Sequence[float]) -> Tuple[float, float]:
+    """Mann-WhitneyのU検定（x が y より大きい傾向にあるという片側対立仮説のp値）
+
+    同順位がなく各サンプル数が EXACT_MAX_SAMPLES 以下の場合は厳密な分布、
+    それ以外は同順位補正と連続性補正を行った正規近似でp値を求める。
+    """
+    m, n = len(x), len(y)
+    if m == 0 or n == 0:
+        raise ValueError("両方のサンプルに1件以上の値が必要です")
+    ranks, ties = _ranks(list(x) + list(y))
+    u = sum(ranks[:m]) - m * (m + 1) / 2
+    if not ties and max(m, n) <= EXACT_MAX_SAMPLES:
+        counts = _u_distribution(m, n)
+        return u, sum(counts[int(u):]) / sum(counts)
+    total = m + n
+    mean = m * n / 2
+    variance = m * n / 12 * (total + 1 - sum(t ** 3 - t for t in ties) / (total * (total - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+def min_samples_met(m: int, n: int, alpha: float) -> bool:
+    """各サンプルが2件以上で、片側U検定のp値が alpha 未満になりうるか（最小のp値は 1/C(m+n, m)）"""
+    return m >= 2 and n >= 2 and 1 / math.comb(m + n, m) < alpha
+
+def compare_samples(
+    baseline: Sequence[float],
+    candidate: Sequence[float],
+    direction: str,
+    alpha: float = 0.05,
+    min_change: float = 0.05
+) -> Dict[str, Any]:
+    """基準と比較対象の実行ごとの値を比較して判定
+
+    悪化の方向への片側検定でp値が alpha 未満、かつ中央値の相対変化が min_change 以上の
+    場合に regression、改善の方向で同じ条件を満たす場合に improvement と判定する。
+    どちらかのサンプルが2件未満の場合や、到達しうる最小のp値 1/C(m+n, m) が alpha 以上で
+    有意差を検出できない件数の場合（alpha=0.05 では各4件未満など）は insufficient とする。
+    """
+    baseline_median = statistics.median(baseline) if baseline else None
+    candidate_median = statistics.median(candidate) if candidate else None
+    result = {
+        "baseline_median": baseline_median,
+        "candidate_median": candidate_median,
+        "baseline_count": len(baseline),
+        "candidate_count": len(candidate),
+        "change": None,
+        "p_value": None,
+        "verdict": "insufficient"
+    }
+    if not min_samples_met(len(baseline), len(candidate), alpha):
+        return result
+    if baseline_median:
+        result["change"] = (candidate_median - baseline_median) / abs(baseline_median)
+    # higher の場合は比較対象が小さい（基準が大きい）ことが悪化
+    worse, better = (baseline, candidate) if direction == 'higher' else (candidate, baseline)
+    _, p_worse = mann_whitney_u(worse, better)
+    _, p_better = mann_whitney_u(better, worse)
+    change = abs(result["change"]) if result["change"] is not None else math.inf
+    if p_worse < alpha and change >= min_change:
+        result.update(p_value=p_worse, verdict="regression")
+    elif p_better < alpha and change >= min_change:
+        result.update(p_value=p_better, verdict="improvement")
+    else:
+        result.update(p_value=min(p_worse, p_better), verdict="unchanged")
+    return result
+
+def compare_runs(
+    baseline: Dict[Tuple[str, str], Dict[str, Any]],
+    candidate: Dict[Tuple[str, str], Dict[str, Any]],
+    direction: Callable[[str, str], str],
+    alpha: float = 0.05,
+    min_change: float = 0.05
+) -> List[Dict[str, Any]]:
+    """ResultsStore.samples() の結果同士を、両方に含まれるメトリクスごとに比較
+
+    direction はメトリクス名と単位から良い方向（higher / lower）を返す関数
+    （通常は ThresholdEngine.direction）。
+    """
+    comparisons = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        entry = baseline[key]
+        metric_direction = direction(entry["metric_name"], entry["unit"])
+        comparisons.append({
+            "metric_name": entry["metric_name"],
+            "labels": entry["labels"],
+            "unit": entry["unit"],
+            "direction": metric_direction,
+            **compare_samples(entry["values"], candidate[key]["values"], metric_direction, alpha, min_change)
+        })
+    return comparisons
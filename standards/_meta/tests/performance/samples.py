@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Sequence, Iterable
+from array import array
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class SampleBuffer:
+    """生のレイテンシーサンプルを保持するバッファ
+
+    サンプルは事前確保した array('d') に記録し、容量が不足すると倍に拡張する。
+    NumPy が利用可能な場合はバッファをコピーせずに参照して分位点・平均・標準偏差を
+    ベクトル演算で求め、利用できない場合は純Pythonで同じ値を求める。
+    分位点は statistics.quantiles(method='exclusive') と同じ (n+1)·q の位置の
+    線形補間（両端は最小値・最大値に丸める）で、厳密な値となる。
+    LatencyHistogram と同じインターフェース（ミリ秒で記録）を持つ。
+    """
+    def __init__(self, capacity: int = 4096, use_numpy: Optional[bool] = None):
+        if use_numpy and np is None:
+            raise ValueError("NumPyがインストールされていません")
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._values = array('d', bytes(8 * max(capacity, 1)))
+        self.total_count = 0
+        self._sorted: Optional[List[float]] = None
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[float], use_numpy: Optional[bool] = None) -> 'SampleBuffer':
+        """サンプルの列から生成"""
+        values = array('d', samples)
+        buffer = cls(len(values), use_numpy)
+        buffer._values[:len(values)] = values
+        buffer.total_count = len(values)
+        return buffer
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        """レイテンシー（ミリ秒）を記録"""
+        if self.total_count + count > len(self._values):
+            self._grow(self.total_count + count)
+        for _ in range(count):
+            self._values[self.total_count] = value_ms
+            self.total_count += 1
+        self._sorted = None
+
+    def _grow(self, required: int) -> None:
+        capacity = len(self._values)
+        while capacity < required:
+            capacity *= 2
+        self._values.frombytes(bytes(8 * (capacity - len(self._values))))
+
+    def samples(self) -> array:
+        """記録済みのサンプル（記録順）"""
+        return self._values[:self.total_count]
+
+    def _view(self):
+        return np.frombuffer(self._values, dtype=np.float64, count=self.total_count)
+
+    def _sorted_samples(self) -> List[float]:
+        if self._sorted is None:
+            self._sorted = sorted(self._values[:self.total_count])
+        return self._sorted
+
+    def merge(self, other: 'SampleBuffer') -> 'SampleBuffer':
+        """別のバッファのサンプルを追加"""
+        count = other.total_count
+        if self.total_count + count > len(self._values):
+            self._grow(self.total_count + count)
+        self._values[self.total_count:self.total_count + count] = other._values[:count]
+        self.total_count += count
+        self._sorted = None
+        return self
+
+    def reset(self) -> None:
+        """記録を消去（確保済みの容量は維持）"""
+        self.total_count = 0
+        self._sorted = None
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """複数の分位点（ミリ秒、0 <= q <= 1）"""
+        if not self.total_count:
+            return [None] * len(qs)
+        qs = [min(max(q, 0.0), 1.0) for q in qs]
+        if self.use_numpy:
+            values = np.percentile(self._view(), [q * 100 for q in qs], method='weibull')
+            return [float(value) for value in values]
+        data = self._sorted_samples()
+        n = len(data)
+        results: List[Optional[float]] = []
+        for q in qs:
+            position = q * (n + 1)
+            if position <= 1:
+                results.append(data[0])
+            elif position >= n:
+                results.append(data[-1])
+            else:
+                lower = int(position)
+                results.append(data[lower - 1] + (position - lower) * (data[lower] - data[lower - 1]))
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位点（ミリ秒、0 <= q <= 1）"""
+        return self.quantiles([q])[0]
+
+    def percentile(self, p: float) -> Optional[float]:
+        """パーセンタイル（ミリ秒、0 <= p <= 100）"""
+        return self.quantile(p / 100)
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.quantile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.quantile(0.95)
+
+    @property
+    def p99(self) -> Optional[float]:
+        return self.quantile(0.99)
+
+    @property
+    def p999(self) -> Optional[float]:
+        return self.quantile(0.999)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """平均値（ミリ秒）"""
+        if not self.total_count:
+            return None
+        if self.use_numpy:
+            return float(self._view().mean())
+        return math.fsum(self._values[:self.total_count]) / self.total_count
+
+    @property
+    def stddev(self) -> Optional[float]:
+        """標準偏差（ミリ秒、母標準偏差）"""
+        if not self.total_count:
+            return None
+        if self.use_numpy:
+            return float(self._view().std())
+        values = self._values[:self.total_count]
+        mean = math.fsum(values) / self.total_count
+        return math.sqrt(math.fsum((value - mean) ** 2 for value in values) / self.total_count)
+
+    @property
+    def min_value(self) -> Optional[float]:
+        if not self.total_count:
+            return None
+        if self.use_numpy:
+            return float(self._view().min())
+        return min(self._values[:self.total_count])
+
+    @property
+    def max_value(self) -> Optional[float]:
+        if not self.total_count:
+            return None
+        if self.use_numpy:
+            return float(self._view().max())
+        return max(self._values[:self.total_count])
+
+    def stats(self) -> Optional[Dict[str, float]]:
+        """主要な統計値（ミリ秒）"""
+        if not self.total_count:
+            return None
+        p50, p95, p99, p999 = self.quantiles([0.50, 0.95, 0.99, 0.999])
+        return {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "p99.9": p999,
+            "mean": self.mean,
+            "stddev": self.stddev,
+            "min": self.min_value,
+            "max": self.max_value,
+            "count": self.total_count
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """スナップショット（サンプルを記録順に保持）"""
+        return {
+            "total_count": self.total_count,
+            "samples": self.samples().tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SampleBuffer':
+        """スナップショットからの復元"""
+        return cls.from_samples(data["samples"])
+
+    def merge_dict(self, data: Dict[str, Any]) -> 'SampleBuffer':
+        """スナップショットのサンプルを追加"""
+        return self.merge(SampleBuffer.from_dict(data))
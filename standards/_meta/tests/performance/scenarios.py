@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, Callable, Awaitable
+import asyncio
+import contextlib
+import copy
+from .timing import NS_PER_SECOND, now_ns
+
+# test_async_performance.py のシナリオ（記載順に開始を試みる）
+SCENARIOS = ('async_operations', 'performance', 'sampling', 'remote_mcp')
+# プロファイルで指定できる反復計測の設定
+TRIAL_SETTINGS = ('warmup', 'iterations', 'min_iterations', 'target_precision')
+
+# プロファイルを定義していない場合の設定（すべてのシナリオが event_loop を使用するため順に実行）
+DEFAULT_SCENARIOS: Dict[str, Dict[str, Any]] = {
+    'async_operations': {'iterations': 100, 'transition_delay': 0.05, 'concurrency': 1, 'resources': ['event_loop']},
+    'performance': {'duration': 10, 'concurrency': None, 'resources': ['event_loop']},
+    'sampling': {'duration': 30, 'resources': ['event_loop']},
+    'remote_mcp': {'duration': 60, 'resources': ['event_loop']}
+}
+
+class ScenarioProfile:
+    """シナリオの計測時間・反復回数・同時実行数と、資源の競合しないシナリオの並行実行
+
+    各シナリオは使用する資源（resources）を持ち、資源が重ならないシナリオは同時に、
+    重なるシナリオは記載順に実行する。プロファイルで省略した設定は DEFAULT_SCENARIOS を使用する。
+    """
+    def __init__(self, name: str, scenarios: Dict[str, Dict[str, Any]],
+                 trials: Optional[Dict[str, Any]] = None, description: str = ''):
+        self.name = name
+        self.scenarios = scenarios
+        self.trials = trials or {}
+        self.description = description
+        self.elapsed: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: Optional[str] = None) -> 'ScenarioProfile':
+        """パフォーマンステスト設定の profiles から生成（name を省略した場合は default_profile）"""
+        profiles = config.get('profiles') or {}
+        name = name or config.get('default_profile')
+        if name is None:
+            return cls('default', copy.deepcopy(DEFAULT_SCENARIOS))
+        if name not in profiles:
+            available = ", ".join(profiles) or "なし"
+            raise ValueError(f"未定義のプロファイル: {name}（定義済み: {available}）")
+        profile = profiles[name] or {}
+        overrides = profile.get('scenarios') or {}
+        unknown = set(overrides) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"未定義のシナリオ: {name}: {', '.join(sorted(unknown))}")
+        trials = profile.get('trials') or {}
+        unknown = set(trials) - set(TRIAL_SETTINGS)
+        if unknown:
+            raise ValueError(f"未定義の反復計測の設定: {name}: {', '.join(sorted(unknown))}")
+        scenarios = {}
+        for scenario in SCENARIOS:
+            settings = {**copy.deepcopy(DEFAULT_SCENARIOS[scenario]), **(overrides.get(scenario) or {})}
+            for key in ('duration', 'iterations', 'concurrency'):
+                if settings.get(key) is not None and settings[key] <= 0:
+                    raise ValueError(f"{key}は正の値を指定してください: {name}.{scenario}: {settings[key]}")
+            if settings.get('transition_delay', 0) < 0:
+                raise ValueError(f"transition_delayは0以上を指定してください: {name}.{scenario}")
+            if not isinstance(settings['resources'], list):
+                raise ValueError(f"resourcesは資源名のリストで指定してください: {name}.{scenario}")
+            scenarios[scenario] = settings
+        return cls(name, scenarios, trials, profile.get('description', ''))
+
+    def settings(self, scenario: str) -> Dict[str, Any]:
+        return self.scenarios[scenario]
+
+    async def run(self, runners: Dict[str, Callable[[], Awaitable[Any]]]) -> Dict[str, Any]:
+        """各シナリオを資源ごとのロックを取得して実行し、シナリオごとの結果を返す
+
+        ロックは資源名の順に取得するため、複数の資源を使うシナリオ同士でもデッドロックしない。
+        """
+        locks = {resource: asyncio.Lock()
+                 for scenario in runners for resource in self.scenarios[scenario]['resources']}
+
+        async def run_scenario(scenario: str) -> Any:
+            async with contextlib.AsyncExitStack() as stack:
+                for resource in sorted(set(self.scenarios[scenario]['resources'])):
+                    await stack.enter_async_context(locks[resource])
+                start = now_ns()
+                try:
+                    return await runners[scenario]()
+                finally:
+                    self.elapsed[scenario] = (now_ns() - start) / NS_PER_SECOND
+
+        names = [scenario for scenario in SCENARIOS if scenario in runners]
+        results = await asyncio.gather(*(run_scenario(scenario) for scenario in names))
+        return dict(zip(names, results))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "scenarios": {
+                scenario: {**settings, "elapsed": self.elapsed.get(scenario)}
+                for scenario, settings in self.scenarios.items()
+            },
+            "trials": self.trials
+        }
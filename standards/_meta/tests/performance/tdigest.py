@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Iterable
+import math
+
+class TDigest:
+    """マージ可能なストリーミング分位点スケッチ（マージ型 t-digest）
+
+    値をセントロイド（平均値と重み）の列に要約する。スケール関数
+    k(q) = δ/Z(n)·log(q/(1−q)) によりセントロイドの重みを q(1−q) に比例させるため、
+    p99・p99.9 のような裾の分位点ほど細かく保たれ、裾でも相対誤差が小さい。
+    セントロイド数は圧縮率 δ でおおむね決まり、記録件数によらず要約の大きさはほぼ一定となる。
+    LatencyHistogram と同じインターフェース（ミリ秒で記録）を持つ。
+    """
+    def __init__(self, compression: float = 200.0, buffer_size: Optional[int] = None):
+        if compression < 10:
+            raise ValueError(f"圧縮率は10以上を指定してください: {compression}")
+        self.compression = compression
+        self.buffer_size = buffer_size or int(compression * 5)
+        self._means: List[float] = []
+        self._weights: List[float] = []
+        self._buffer: List[Tuple[float, float]] = []
+        self.total_count = 0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        self._sum = 0.0
+        self._sum_of_squares = 0.0
+
+    def _normalizer(self, total: float) -> float:
+        return self.compression / (4 * math.log(max(total / self.compression, 1.0)) + 24)
+
+    def _k(self, q: float, normalizer: float) -> float:
+        q = min(max(q, 1e-15), 1 - 1e-15)
+        return normalizer * math.log(q / (1 - q))
+
+    def _k_inverse(self, k: float, normalizer: float) -> float:
+        return 1 / (1 + math.exp(-k / normalizer))
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        """値（ミリ秒）を記録"""
+        self._buffer.append((value_ms, count))
+        self.total_count += count
+        if self.min_value is None or value_ms < self.min_value:
+            self.min_value = value_ms
+        if self.max_value is None or value_ms > self.max_value:
+            self.max_value = value_ms
+        self._sum += value_ms * count
+        self._sum_of_squares += value_ms * value_ms * count
+        if len(self._buffer) >= self.buffer_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        """バッファとセントロイドを併合してセントロイド列を再構成"""
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self._means, self._weights)) + self._buffer)
+        self._buffer = []
+        total = float(sum(weight for _, weight in points))
+
+        means: List[float] = []
+        weights: List[float] = []
+        current_mean, current_weight = points[0]
+        normalizer = self._normalizer(total)
+        weight_so_far = 0.0
+        weight_limit = total * self._k_inverse(self._k(0.0, normalizer) + 1, normalizer)
+        for mean, weight in points[1:]:
+            if weight_so_far + current_weight + weight <= weight_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                weight_so_far += current_weight
+                weight_limit = total * self._k_inverse(self._k(weight_so_far / total, normalizer) + 1, normalizer)
+                current_mean, current_weight = mean, weight
+        means.append(current_mean)
+        weights.append(current_weight)
+        self._means = means
+        self._weights = weights
+
+    def centroids(self) -> List[Tuple[float, float]]:
+        """セントロイド（平均値, 重み）の列"""
+        self._compress()
+        return list(zip(self._means, self._weights))
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """別のスケッチの要約を加算"""
+        self._merge_centroids(other.centroids(), other.total_count, other.min_value,
+                              other.max_value, other._sum, other._sum_of_squares)
+        return self
+
+    def _merge_centroids(
+        self,
+        centroids: Iterable[Tuple[float, float]],
+        total_count: int,
+        min_value: Optional[float],
+        max_value: Optional[float],
+        value_sum: float,
+        sum_of_squares: float
+    ) -> None:
+        self._buffer.extend((mean, weight) for mean, weight in centroids)
+        self.total_count += total_count
+        if min_value is not None and (self.min_value is None or min_value < self.min_value):
+            self.min_value = min_value
+        if max_value is not None and (self.max_value is None or max_value > self.max_value):
+            self.max_value = max_value
+        self._sum += value_sum
+        self._sum_of_squares += sum_of_squares
+        self._compress()
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位点（ミリ秒、0 <= q <= 1）"""
+        if not self.total_count:
+            return None
+        self._compress()
+        means, weights = self._means, self._weights
+        q = min(max(q, 0.0), 1.0)
+        total = float(self.total_count)
+        index = q * total
+        if len(means) == 1 or index < 1:
+            return self.min_value if index < 1 else means[0]
+        if index > total - 1:
+            return self.max_value
+
+        # 最小値と先頭セントロイドの間
+        if weights[0] > 1 and index < weights[0] / 2:
+            return self.min_value + (index - 1) / (weights[0] / 2 - 1) * (means[0] - self.min_value)
+
+        weight_so_far = weights[0] / 2
+        for i in range(len(means) - 1):
+            delta = (weights[i] + weights[i + 1]) / 2
+            if weight_so_far + delta > index:
+                # 重み1のセントロイドは実測値そのものとして扱う
+                if weights[i] == 1 and index - weight_so_far < 0.5:
+                    return means[i]
+                if weights[i + 1] == 1 and weight_so_far + delta - index <= 0.5:
+                    return means[i + 1]
+                lower = index - weight_so_far
+                upper = weight_so_far + delta - index
+                return (means[i] * upper + means[i + 1] * lower) / delta
+            weight_so_far += delta
+
+        # 末尾セントロイドと最大値の間
+        last_half = weights[-1] / 2
+        if last_half <= 1:
+            return means[-1]
+        lower = index - weight_so_far
+        return means[-1] + lower / (last_half - 1) * (self.max_value - means[-1])
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """複数の分位点（ミリ秒）"""
+        return [self.quantile(q) for q in qs]
+
+    def percentile(self, p: float) -> Optional[float]:
+        """パーセンタイル（ミリ秒、0 <= p <= 100）"""
+        return self.quantile(p / 100)
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.quantile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.quantile(0.95)
+
+    @property
+    def p99(self) -> Optional[float]:
+        return self.quantile(0.99)
+
+    @property
+    def p999(self) -> Optional[float]:
+        return self.quantile(0.999)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """平均値（ミリ秒）"""
+        if not self.total_count:
+            return None
+        return self._sum / self.total_count
+
+    @property
+    def stddev(self) -> Optional[float]:
+        """標準偏差（ミリ秒、母標準偏差）"""
+        if not self.total_count:
+            return None
+        mean = self._sum / self.total_count
+        return math.sqrt(max(self._sum_of_squares / self.total_count - mean * mean, 0.0))
+
+    def stats(self) -> Optional[Dict[str, float]]:
+        """主要な統計値（ミリ秒）"""
+        if not self.total_count:
+            return None
+        p50, p95, p99, p999 = self.quantiles([0.50, 0.95, 0.99, 0.999])
+        return {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "p99.9": p999,
+            "mean": self.mean,
+            "stddev": self.stddev,
+            "min": self.min_value,
+            "max": self.max_value,
+            "count": self.total_count
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """スナップショット"""
+        return {
+            "compression": self.compression,
+            "total_count": self.total_count,
+            "min": self.min_value,
+            "max": self.max_value,
+            "sum": self._sum,
+            "sum_of_squares": self._sum_of_squares,
+            "centroids": [[mean, weight] for mean, weight in self.centroids()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TDigest':
+        """スナップショットからの復元"""
+        digest = cls(data["compression"])
+        digest._merge_centroids(
+            [(mean, weight) for mean, weight in data["centroids"]],
+            data["total_count"], data["min"], data["max"], data["sum"], data["sum_of_squares"]
+        )
+        return digest
+
+    def merge_dict(self, data: Dict[str, Any]) -> 'TDigest':
+        """スナップショットの要約を加算"""
+        return self.merge(TDigest.from_dict(data))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional
+import statistics
+import time
+
+NS_PER_MS = 1_000_000
+NS_PER_SECOND = 1_000_000_000
+
+# 単調増加する高分解能の時刻（整数ナノ秒、システム時刻の変更の影響を受けない）
+now_ns = time.perf_counter_ns
+
+def calibrate_overhead(samples: int = 10000) -> int:
+    """計時のオーバーヘッド（連続する2回の perf_counter_ns 呼び出しの間隔の中央値、ナノ秒）"""
+    deltas = []
+    for _ in range(samples):
+        start = now_ns()
+        deltas.append(now_ns() - start)
+    return int(statistics.median(deltas))
+
+class Timer:
+    """perf_counter_ns による区間の計測（整数ナノ秒）
+
+    区間には計時の呼び出し1回分のオーバーヘッドが含まれるため、校正した値を差し引く。
+    """
+    def __init__(self, overhead_ns: int = 0):
+        self.overhead_ns = overhead_ns
+
+    @classmethod
+    def calibrated(cls, samples: int = 10000) -> 'Timer':
+        """オーバーヘッドを校正したタイマー"""
+        return cls(calibrate_overhead(samples))
+
+    @staticmethod
+    def start() -> int:
+        """区間の開始時刻"""
+        return now_ns()
+
+    def elapsed_ns(self, start_ns: int, end_ns: Optional[int] = None) -> int:
+        """開始時刻からの経過時間（ナノ秒、オーバーヘッドを差し引いた値）"""
+        end_ns = now_ns() if end_ns is None else end_ns
+        return max(end_ns - start_ns - self.overhead_ns, 0)
+
+    def elapsed_ms(self, start_ns: int, end_ns: Optional[int] = None) -> float:
+        """開始時刻からの経過時間（ミリ秒、レイテンシーの記録先の単位）"""
+        return self.elapsed_ns(start_ns, end_ns) / NS_PER_MS
+
+    def elapsed_seconds(self, start_ns: int, end_ns: Optional[int] = None) -> float:
+        """開始時刻からの経過時間（秒）"""
+        return self.elapsed_ns(start_ns, end_ns) / NS_PER_SECOND
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"clock": "perf_counter_ns", "overhead_ns": self.overhead_ns}
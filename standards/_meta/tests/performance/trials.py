@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Tuple, Callable, Awaitable, Sequence, ContextManager
+import contextlib
+import math
+import statistics
+
+# 外れ値の除外方式と既定の閾値（iqr: 四分位範囲の倍数、mad: 正規分布換算のMADの倍数）
+OUTLIER_METHODS = {'iqr': 3.0, 'mad': 3.5, 'none': None}
+# MADを正規分布の標準偏差に換算する係数
+MAD_SCALE = 1.4826
+# 外れ値を判定する最小の反復回数
+MIN_OUTLIER_SAMPLES = 4
+
+def _continued_fraction(a: float, b: float, x: float) -> float:
+    """不完全ベータ関数の連分数展開（修正Lentz法）"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1) < 1e-15:
+            break
+    return result
+
+def _regularized_beta(a: float, b: float, x: float) -> float:
+    """正則化不完全ベータ関数 I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _continued_fraction(a, b, x) / a
+    return 1 - math.exp(log_front) * _continued_fraction(b, a, 1 - x) / b
+
+def t_cdf(t: float, df: float) -> float:
+    """自由度 df のStudentのt分布の累積分布関数"""
+    tail = 0.5 * _regularized_beta(df / 2, 0.5, df / (df + t * t))
+    return 1 - tail if t >= 0 else tail
+
+def t_quantile(p: float, df: float) -> float:
+    """自由度 df のStudentのt分布の分位点（二分法）"""
+    if not 0 < p < 1:
+        raise ValueError(f"pは0より大きく1未満で指定してください: {p}")
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+    low, high = 0.0, 1.0
+    while t_cdf(high, df) < p:
+        low, high = high, high * 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if t_cdf(middle, df) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+def reject_outliers(values: Sequence[float], method: str = 'iqr',
+                    threshold: Optional[float] = None) -> Tuple[List[float], List[float]]:
+    """外れ値を除外した値と除外した値（反復回数が少ない場合は除外しない）
+
+    四分位範囲・MADが0の場合は半数以上の値が中央値と等しいため、中央値と異なる値を外れ値とする。
+    """
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"未定義の外れ値の除外方式: {method}")
+    values = list(values)
+    if method == 'none' or len(values) < MIN_OUTLIER_SAMPLES:
+        return values, []
+    k = threshold if threshold is not None else OUTLIER_METHODS[method]
+    median = statistics.median(values)
+    if method == 'iqr':
+        q1, _, q3 = statistics.quantiles(values, n=4, method='inclusive')
+        spread = q3 - q1
+        low, high = q1 - k * spread, q3 + k * spread
+    else:
+        spread = MAD_SCALE * statistics.median(abs(value - median) for value in values)
+        low, high = median - k * spread, median + k * spread
+    if spread <= 0:
+        kept = [value for value in values if math.isclose(value, median)]
+        rejected = [value for value in values if not math.isclose(value, median)]
+        return kept, rejected
+    kept = [value for value in values if low <= value <= high]
+    rejected = [value for value in values if not low <= value <= high]
+    return kept, rejected
+
+def mean_confidence_interval(values: Sequence[float], confidence: float = 0.95) -> Optional[Tuple[float, float]]:
+    """平均の信頼区間（t分布、2件未満の場合は None）"""
+    n = len(values)
+    if n < 2:
+        return None
+    mean = statistics.fmean(values)
+    half_width = t_quantile((1 + confidence) / 2, n - 1) * statistics.stdev(values) / math.sqrt(n)
+    return mean - half_width, mean + half_width
+
+def median_confidence_interval(values: Sequence[float], confidence: float = 0.95) -> Optional[Tuple[float, float]]:
+    """中央値の信頼区間（順序統計量による分布によらない区間、2件未満の場合は None）
+
+    n 件では x_(l) から x_(n-l+1) の区間が確率 1 - 2P(B <= l-1)（B ~ Binomial(n, 1/2)）で
+    中央値を含むため、この確率が confidence 以上となる最大の l を選ぶ。件数が少なく
+    満たせない場合は最小値から最大値の区間とする。
+    """
+    n = len(values)
+    if n < 2:
+        return None
+    ordered = sorted(values)
+    alpha = 1 - confidence
+    lower = 1
+    cumulative = 0.0
+    for l in range(1, n // 2 + 1):
+        # P(B <= l-1)
+        cumulative += math.comb(n, l - 1) / 2 ** n
+        if 2 * cumulative > alpha:
+            break
+        lower = l
+    return ordered[lower - 1], ordered[n - lower]
+
+def summarize_trials(values: Sequence[float], confidence: float = 0.95, outliers: str = 'iqr',
+                     outlier_threshold: Optional[float] = None) -> Dict[str, Any]:
+    """反復ごとの値の要約（外れ値を除外した値の平均・中央値と信頼区間）"""
+    kept, rejected = reject_outliers(values, outliers, outlier_threshold)
+    mean = statistics.fmean(kept) if kept else None
+    mean_ci = mean_confidence_interval(kept, confidence)
+    relative_half_width = None
+    if mean_ci is not None:
+        half_width = (mean_ci[1] - mean_ci[0]) / 2
+        relative_half_width = half_width / abs(mean) if mean else (0.0 if half_width == 0 else math.inf)
+    return {
+        "values": list(values),
+        "rejected": rejected,
+        "count": len(kept),
+        "mean": mean,
+        "mean_ci": mean_ci,
+        "median": statistics.median(kept) if kept else None,
+        "median_ci": median_confidence_interval(kept, confidence),
+        "stddev": statistics.stdev(kept) if len(kept) > 1 else 0.0,
+        "relative_half_width": relative_half_width
+    }
+
+class TrialHarness:
+    """シナリオをウォームアップの後に繰り返し計測し、反復ごとの指標を要約するクラス
+
+    ウォームアップの反復は結果に含めない（run の warmup_context の中で実行する）。
+    測定の反復はすべて実際の実行として扱い、各反復のエラー・警告は合算する。
+    target_precision が0より大きい場合は、
+    min_iterations 回以上の計測で全指標の平均の信頼区間の半幅が平均の target_precision 倍
+    以下となった時点で iterations 回に達する前に終了する。
+    """
+    def __init__(
+        self,
+        iterations: int = 1,
+        warmup: int = 0,
+        min_iterations: int = 3,
+        outliers: str = 'iqr',
+        outlier_threshold: Optional[float] = None,
+        confidence: float = 0.95,
+        target_precision: float = 0.0
+    ):
+        if iterations < 1 or warmup < 0 or min_iterations < 2:
+            raise ValueError(
+                f"反復回数の指定が不正です: iterations={iterations}, warmup={warmup}, "
+                f"min_iterations={min_iterations}"
+            )
+        if outliers not in OUTLIER_METHODS:
+            raise ValueError(f"未定義の外れ値の除外方式: {outliers}")
+        if not 0 < confidence < 1:
+            raise ValueError(f"信頼水準は0より大きく1未満で指定してください: {confidence}")
+        self.iterations = iterations
+        self.warmup = warmup
+        self.min_iterations = min_iterations
+        self.outliers = outliers
+        self.outlier_threshold = outlier_threshold
+        self.confidence = confidence
+        self.target_precision = target_precision
+
+    def summarize(self, samples: Dict[str, List[float]]) -> Dict[str, Dict[str, Any]]:
+        return {name: summarize_trials(values, self.confidence, self.outliers, self.outlier_threshold)
+                for name, values in samples.items()}
+
+    def converged(self, summaries: Dict[str, Dict[str, Any]]) -> bool:
+        """全指標の信頼区間が目標の精度に達したか"""
+        return bool(summaries) and all(
+            summary["relative_half_width"] is not None
+            and summary["relative_half_width"] <= self.target_precision
+            for summary in summaries.values()
+        )
+
+    async def run(
+        self,
+        scenario: Callable[[], Awaitable[Dict[str, Any]]],
+        measure: Callable[[Dict[str, Any]], Dict[str, Optional[float]]],
+        warmup_context: Callable[[], ContextManager[Any]] = contextlib.nullcontext
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """シナリオを実行し、最後の反復の結果と反復計測の要約を返す
+
+        measure は1回の結果から指標名と値の辞書を求める（値が None の指標はその反復では記録しない）。
+        warmup_context はウォームアップの反復の間に有効にするコンテキスト（エラー・警告の記録の抑止など）。
+        """
+        for _ in range(self.warmup):
+            with warmup_context():
+                await scenario()
+
+        samples: Dict[str, List[float]] = {}
+        result: Dict[str, Any] = {}
+        summaries: Dict[str, Dict[str, Any]] = {}
+        stopped_early = False
+        completed = 0
+        while completed < self.iterations:
+            result = await scenario()
+            completed += 1
+            for name, value in measure(result).items():
+                if value is not None:
+                    samples.setdefault(name, []).append(value)
+            if self.target_precision > 0 and completed >= self.min_iterations and completed < self.iterations:
+                summaries = self.summarize(samples)
+                if self.converged(summaries):
+                    stopped_early = True
+                    break
+
+        return result, {
+            "warmup": self.warmup,
+            "iterations": completed,
+            "max_iterations": self.iterations,
+            "stopped_early": stopped_early,
+            "confidence": self.confidence,
+            "outliers": self.outliers,
+            "target_precision": self.target_precision,
+            "metrics": summaries if stopped_early else self.summarize(samples)
+        }
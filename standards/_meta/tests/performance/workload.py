@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Iterator, Tuple
+from abc import ABC, abstractmethod
+import asyncio
+import itertools
+import json
+import os
+import sys
+
+# MCPの初期化で提示するプロトコルバージョンとクライアント情報
+PROTOCOL_VERSION = "2024-11-05"
+CLIENT_INFO = {"name": "mcp-performance-tester", "version": "1.2.0"}
+
+WORKLOAD_BACKENDS = ('in_process', 'stdio', 'http_sse')
+
+class WorkloadError(Exception):
+    """ワークロードの呼び出しエラー（JSON-RPCのエラー応答を含む）"""
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+class WorkloadBackend(ABC):
+    """負荷対象への接続（JSON-RPCのメソッド呼び出し）の基底クラス
+
+    start() で接続と初期化を行い、call() は同じ接続上で並行に呼び出せる。
+    同時に応答待ちとなる要求の数は pipeline_depth で制限する。
+    """
+    name = 'base'
+
+    def __init__(self, pipeline_depth: int = 64, timeout: float = 30.0):
+        self.pipeline_depth = pipeline_depth
+        self.timeout = timeout
+        self.server_info: Dict[str, Any] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(self) -> None:
+        """接続と初期化"""
+        self._slots = asyncio.Semaphore(self.pipeline_depth)
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """メソッドを呼び出して結果を返す（エラー応答は WorkloadError を送出）"""
+        async with self._slots:
+            return await asyncio.wait_for(self._call(method, params or {}), self.timeout)
+
+    @abstractmethod
+    async def _call(self, method: str, params: Dict[str, Any]) -> Any:
+        """1件の呼び出し"""
+
+    async def close(self) -> None:
+        """接続の終了"""
+
+    async def __aenter__(self) -> 'WorkloadBackend':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+class InProcessBackend(WorkloadBackend):
+    """プロセス内のハンドラーを呼び出すバックエンド（ハンドラー未定義のメソッドは即時に完了）"""
+    name = 'in_process'
+
+    def __init__(
+        self,
+        handlers: Optional[Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]]] = None,
+        pipeline_depth: int = 64,
+        timeout: float = 30.0
+    ):
+        super().__init__(pipeline_depth, timeout)
+        self.handlers = handlers or {}
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        # 計測対象が呼び出しのオーバーヘッドのみとなるよう同時実行数の制限とタイムアウトを省略
+        return await self._call(method, params or {})
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> Any:
+        handler = self.handlers.get(method)
+        if handler is None:
+            return {"status": "completed"}
+        return await handler(params)
+
+class _JsonRpcClient(WorkloadBackend):
+    """JSON-RPC 2.0の要求IDの採番と初期化ハンドシェイク"""
+    def __init__(self, pipeline_depth: int = 64, timeout: float = 30.0):
+        super().__init__(pipeline_depth, timeout)
+        self._ids = itertools.count(1)
+
+    def _request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+    @staticmethod
+    def _result(message: Dict[str, Any]) -> Any:
+        if "error" in message:
+            error = message["error"] or {}
+            raise WorkloadError(error.get("message", "JSON-RPCエラー"), error.get("code"))
+        return message.get("result")
+
+    async def _initialize(self) -> None:
+        """initialize要求とinitialized通知によるハンドシェイク"""
+        self.server_info = await asyncio.wait_for(self._call("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO
+        }), self.timeout) or {}
+        await self._notify("notifications/initialized", {})
+
+    @abstractmethod
+    async def _notify(self, method: str, params: Dict[str, Any]) -> None:
+        """通知（応答なし）の送信"""
+
+class StdioBackend(_JsonRpcClient):
+    """子プロセスのMCPサーバーへ標準入出力（1行1件のJSON）で接続するバックエンド
+
+    要求は応答を待たずに同じパイプへ書き込み、応答はIDで対応付ける。
+    """
+    name = 'stdio'
+
+    def __init__(
+        self,
+        command: List[str],
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        pipeline_depth: int = 64,
+        timeout: float = 30.0
+    ):
+        super().__init__(pipeline_depth, timeout)
+        if not command:
+            raise ValueError("stdioバックエンドには起動コマンドが必要です")
+        self.command = command
+        self.cwd = cwd
+        self.env = env or {}
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    async def start(self) -> None:
+        await super().start()
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            env={**os.environ, **self.env},
+            limit=16 * 1024 * 1024
+        )
+        self._reader = asyncio.create_task(self._read_responses())
+        await self._initialize()
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        self._process.stdin.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+        await self._process.stdin.drain()
+
+    async def _read_responses(self) -> None:
+        error: Exception = WorkloadError("MCPサーバーが終了しました")
+        try:
+            while True:
+                line = await self._process.stdout.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if "method" in message:
+                    # サーバーからの要求には未対応として応答し、通知は無視する
+                    if "id" in message:
+                        await self._write({
+                            "jsonrpc": "2.0", "id": message["id"],
+                            "error": {"code": -32601, "message": "Method not found"}
+                        })
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            error = WorkloadError(f"MCPサーバーの応答を読み込めません: {str(e)}")
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> Any:
+        request = self._request(method, params)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["id"]] = future
+        try:
+            await self._write(request)
+            return self._result(await future)
+        finally:
+            self._pending.pop(request["id"], None)
+
+    async def _notify(self, method: str, params: Dict[str, Any]) -> None:
+        await self._write({"jsonrpc": "2.0", "method": method, "params": params})
+
+    async def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.stdin and not self._process.stdin.is_closing():
+            self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), 5)
+        except asyncio.TimeoutError:
+            self._process.kill()
+            await self._process.wait()
+        if self._reader is not None:
+            await self._reader
+        self._process = None
+
+class HttpSseBackend(_JsonRpcClient):
+    """HTTPエンドポイントへJSON-RPCをPOSTするバックエンド（Streamable HTTP）
+
+    応答はJSONまたはSSE（text/event-stream）のいずれでも受け付け、SSEの場合は
+    要求IDに対応するdataイベントを応答とする。接続はセッション内で再利用する。
+    """
+    name = 'http_sse'
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        pipeline_depth: int = 64,
+        timeout: float = 30.0
+    ):
+        super().__init__(pipeline_depth, timeout)
+        self.url = url
+        self.headers = headers or {}
+        self._session = None
+        self._session_id: Optional[str] = None
+
+    async def start(self) -> None:
+        await super().start()
+        import aiohttp
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pipeline_depth),
+            headers={
+                **self.headers,
+                "Content-Type": "application/json",
+                "Accept": "application/json, text/event-stream"
+            }
+        )
+        await self._initialize()
+
+    async def _post(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        headers = {"Mcp-Session-Id": self._session_id} if self._session_id else {}
+        async with self._session.post(self.url, data=json.dumps(message, ensure_ascii=False), headers=headers) as response:
+            if response.status >= 400:
+                raise WorkloadError(f"HTTPエラー: {response.status}", response.status)
+            self._session_id = response.headers.get("Mcp-Session-Id", self._session_id)
+            if "id" not in message:
+                return None
+            if response.content_type == "text/event-stream":
+                return await self._read_event(response, message["id"])
+            return json.loads(await response.text())
+
+    @staticmethod
+    async def _read_event(response: Any, request_id: int) -> Dict[str, Any]:
+        data: List[str] = []
+        async for raw_line in response.content:
+            line = raw_line.decode('utf-8').rstrip("\r\n")
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+            elif not line and data:
+                message = json.loads("\n".join(data))
+                data = []
+                if message.get("id") == request_id and "method" not in message:
+                    return message
+        raise WorkloadError("SSEストリームに応答が含まれていません")
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> Any:
+        return self._result(await self._post(self._request(method, params)))
+
+    async def _notify(self, method: str, params: Dict[str, Any]) -> None:
+        await self._post({"jsonrpc": "2.0", "method": method, "params": params})
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+def create_backend(config: Dict[str, Any], base_dir: Optional[str] = None) -> WorkloadBackend:
+    """ワークロード設定からバックエンドを生成（相対パスの作業ディレクトリは base_dir 基準）"""
+    backend = config.get('backend', 'in_process')
+    pipeline_depth = config.get('pipeline_depth', 64)
+    timeout = config.get('timeout', 30.0)
+    if backend == 'in_process':
+        return InProcessBackend(pipeline_depth=pipeline_depth, timeout=timeout)
+    if backend == 'stdio':
+        stdio = config.get('stdio', {})
+        cwd = stdio.get('cwd')
+        if cwd and base_dir and not os.path.isabs(cwd):
+            cwd = os.path.join(base_dir, cwd)
+        command = list(stdio.get('command', []))
+        if command and command[0] in ('python', 'python3'):
+            # テストを実行しているインタープリターでサーバーを起動
+            command[0] = sys.executable
+        return StdioBackend(command, cwd, stdio.get('env'), pipeline_depth, timeout)
+    if backend == 'http_sse':
+        http = config.get('http_sse') or {}
+        if not http.get('url'):
+            raise ValueError("http_sse の接続先URLが未設定です（workload.http_sse.url または --workload-url）")
+        return HttpSseBackend(http['url'], http.get('headers'), pipeline_depth, timeout)
+    raise ValueError(f"未定義のワークロードバックエンド: {backend}")
+
+def request_cycle(requests: Optional[List[Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """送信する要求（メソッド名, パラメーター）をweightの比率で巡回（未定義の場合はping）"""
+    requests = requests or [{"method": "ping"}]
+    return itertools.cycle([
+        (request['method'], request.get('params') or {})
+        for request in requests
+        for _ in range(max(int(request.get('weight', 1)), 1))
+    ])
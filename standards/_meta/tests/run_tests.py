@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 import os
 import sys
+import argparse
 import subprocess
 import asyncio
+import tempfile
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple, NamedTuple
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Iterator
 from enum import Enum, auto
+from performance.loops import LOOP_MODES, run as run_event_loop
+from validators.metrics_document import MetricsDocument, MetricsDocumentError
+from validators.thresholds import ThresholdEngine
+from performance.history import (
+    HISTORY_FILENAME, ResultsStore, git_revision, host_fingerprint, measurement_config
+)
+from performance.regression import compare_runs
 
 class ErrorSeverity(Enum):
     """エラーの重要度を定義"""
@@ -21,6 +30,7 @@ class TestResult(NamedTuple):
     output: str
     error: Optional[str]
     severity: Optional[ErrorSeverity]
+    verdicts: Optional[List[Dict[str, Any]]] = None
 
 class ReportGenerator:
     """レポート生成を管理するクラス"""
@@ -85,6 +95,10 @@ class ReportGenerator:
                 "```"
             ])
         
+        if result.verdicts:
+            lines.append("閾値判定:")
+            lines.extend(f"- {TestRunner.format_verdict(verdict)}" for verdict in result.verdicts)
+
         if not result.success and result.error:
             lines.extend([
                 f"重要度: {result.severity.name if result.severity else 'Unknown'}",
@@ -122,40 +136,6 @@ class ReportGenerator:
         
         return "\n".join(sections)
 
-class MetricsConfig:
-    """メトリクス設定を管理するクラス"""
-    def __init__(self, meta_dir: str):
-        self.config_path = os.path.join(meta_dir, "contexts", "unified_metrics.yaml")
-        self._load_config()
-
-    def _load_config(self):
-        """unified_metrics.yamlから設定を読み込む"""
-        try:
-            import yaml
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                
-            # パフォーマンス基準値の設定
-            perf = config['base_metrics']['performance']
-            self.response_time = perf['response_time']['threshold']
-            self.throughput = perf['throughput']['threshold']
-            self.error_rate = perf['error_rate']['threshold']
-            
-            # サンプリング基準値の設定
-            sampling = config['base_metrics']['sampling']
-            self.sampling_latency = sampling['latency']['threshold']
-            self.sampling_throughput = sampling['throughput']['threshold']
-            self.fallback_rate = sampling['fallback_rate']['threshold']
-        except Exception as e:
-            print(f"設定ファイルの読み込みエラー: {str(e)}")
-            # デフォルト値の設定
-            self.response_time = {'critical': 1000, 'non_critical': 500}
-            self.throughput = {'critical': 1000, 'non_critical': 800}
-            self.error_rate = {'critical': 0.01, 'non_critical': 0.005}
-            self.sampling_latency = {'critical': 2000, 'warning': 1000}
-            self.sampling_throughput = {'critical': 10, 'warning': 20}
-            self.fallback_rate = {'critical': 0.3, 'warning': 0.2}
-
 class TestConfig:
     """テスト設定を管理するクラス"""
     def __init__(self, meta_dir: str):
@@ -175,37 +155,6 @@ class TestConfig:
             ]
         }
 
-class MetricsValidator:
-    """メトリクス検証を担当するクラス"""
-    def __init__(self, metrics_config: MetricsConfig):
-        self.config = metrics_config
-        self.patterns = {
-            'throughput': (r"スループット: (\d+\.\d+) req/sec", 0),
-            'latency': (r"P99: (\d+\.\d+) ms", float('inf')),
-            'success_rate': (r"成功率: (\d+\.\d+)%", 0)
-        }
-
-    def extract_metrics(self, output: str) -> Dict[str, float]:
-        """出力からメトリクスを抽出"""
-        metrics = {}
-        for name, (pattern, default) in self.patterns.items():
-            match = re.search(pattern, output)
-            metrics[name] = float(match.group(1)) if match else default
-
-        if 'success_rate' in metrics:
-            rates = [float(rate) for rate in re.findall(self.patterns['success_rate'][0], output)]
-            metrics['success_rate'] = min(rates) if rates else 0
-
-        return metrics
-
-    def validate_metrics(self, metrics: Dict[str, float]) -> bool:
-        """メトリクスが基準を満たしているか検証"""
-        return (
-            metrics['throughput'] >= self.config.throughput['non_critical'] and
-            metrics['latency'] <= self.config.sampling_latency['warning'] and
-            metrics['success_rate'] >= (100 - self.config.error_rate['non_critical'] * 100)
-        )
-
 class ErrorAnalyzer:
     """エラー分析を担当するクラス"""
     def __init__(self, test_config: TestConfig):
@@ -240,19 +189,21 @@ class TestRunner:
         self.meta_dir = meta_dir
         self.test_results: List[TestResult] = []
         self.max_parallel_tests = 3
-        metrics_config = MetricsConfig(meta_dir)
         test_config = TestConfig(meta_dir)
-        self.metrics_validator = MetricsValidator(metrics_config)
+        # パフォーマンス基準は unified_metrics.yaml の base_metrics のみから取得
+        self.threshold_engine = ThresholdEngine.load(os.path.join(meta_dir, "contexts", "unified_metrics.yaml"))
         self.error_analyzer = ErrorAnalyzer(test_config)
 
-    async def _execute_test_process(self, script_path: str, env: Dict[str, str]) -> Tuple[int, str, str]:
-        """テストプロセスの実行を担当"""
+    async def _execute_test_process(self, script_path: str, env: Dict[str, str],
+                                    metrics_path: str) -> Tuple[int, str, str]:
+        """テストプロセスの実行を担当（メトリクス文書は metrics_path に出力させる）"""
         try:
             process = await asyncio.create_subprocess_exec(
                 sys.executable,
                 "-X", "utf8",
                 script_path,
                 self.meta_dir,
+                "--metrics-out", metrics_path,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 env=env
@@ -267,29 +218,56 @@ class TestRunner:
         except Exception as e:
             return (1, "", f"プロセス実行エラー: {str(e)}")
 
-    def _validate_test_output(self, script_name: str, output: str, error: str) -> Tuple[bool, Optional[ErrorSeverity], Optional[str]]:
-        """テスト出力を検証"""
-        # パフォーマンステストの場合
-        if script_name == "test_async_performance.py":
-            # 基本パフォーマンス指標の抽出
-            throughput_match = re.search(r"スループット: (\d+\.\d+) req/sec", output)
-            latency_match = re.search(r"P99: (\d+\.\d+) ms", output)
-            success_rate_matches = re.findall(r"成功率: (\d+\.\d+)%", output)
-
-            if throughput_match and latency_match and success_rate_matches:
-                throughput = float(throughput_match.group(1))
-                latency = float(latency_match.group(1))
-                min_success_rate = min(float(rate) for rate in success_rate_matches)
-
-                # 基準値との比較（unified_metrics.yamlの基準に基づく）
-                meets_criteria = (
-                    throughput >= 800 and  # non_critical threshold from unified_metrics.yaml
-                    latency <= 500 and     # non_critical threshold from unified_metrics.yaml
-                    min_success_rate >= 95.0
-                )
-
-                if not meets_criteria:
-                    return False, ErrorSeverity.NON_CRITICAL, "パフォーマンス基準未達: 一般的なエラー"
+    @staticmethod
+    def _load_metrics_document(metrics_path: str) -> Tuple[Optional[MetricsDocument], Optional[str]]:
+        """テストスクリプトが出力したメトリクス文書の読み込み"""
+        try:
+            return MetricsDocument.load(metrics_path), None
+        except MetricsDocumentError as e:
+            return None, str(e)
+
+    @staticmethod
+    def _format_metric(metric: Dict[str, Any]) -> str:
+        labels = ", ".join(f"{key}={value}" for key, value in metric['labels'].items())
+        return f"{metric['metric_name']}{{{labels}}}" if labels else metric['metric_name']
+
+    @classmethod
+    def format_verdict(cls, verdict: Dict[str, Any]) -> str:
+        """閾値判定の結果を1行に整形"""
+        name = cls._format_metric(verdict)
+        if verdict['threshold_level'] == 'invalid':
+            return f"{name}: invalid（{verdict['reason']}）"
+        line = f"{name} {verdict['value']:.3f} {verdict['unit']}: {verdict['threshold_level']}"
+        if verdict['threshold'] is not None:
+            comparison = "<" if verdict['direction'] == 'higher' else ">"
+            line += f"（{comparison} {verdict['threshold']:g}）"
+        return line
+
+    def _threshold_breaches(self, verdicts: List[Dict[str, Any]]) -> Tuple[Optional[ErrorSeverity], List[str]]:
+        """失敗とする閾値判定の重要度と内容（critical は CRITICAL、non_critical と判定不能は NON_CRITICAL）"""
+        breaches = [v for v in verdicts if v['threshold_level'] in ('critical', 'non_critical', 'invalid')]
+        if not breaches:
+            return None, []
+        critical = any(v['threshold_level'] == 'critical' for v in breaches)
+        severity = ErrorSeverity.CRITICAL if critical else ErrorSeverity.NON_CRITICAL
+        return severity, [self.format_verdict(v) for v in breaches]
+
+    def _validate_test_output(
+        self,
+        script_name: str,
+        document: Optional[MetricsDocument],
+        error: str,
+        document_error: Optional[str] = None,
+        verdicts: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[bool, Optional[ErrorSeverity], Optional[str]]:
+        """テスト出力を検証（メトリクスは標準出力ではなくメトリクス文書から取得）"""
+        if document is None:
+            return False, ErrorSeverity.NON_CRITICAL, f"メトリクス文書が出力されていません: {document_error}"
+
+        # 基準値との比較（unified_metrics.yaml の閾値定義がある全メトリクス）
+        severity, breaches = self._threshold_breaches(verdicts or [])
+        if breaches:
+            return False, severity, "閾値超過: " + "; ".join(breaches)
 
         # エラーメッセージの検証
         if error and not self.error_analyzer.is_expected_error(script_name, error):
@@ -307,10 +285,16 @@ class TestRunner:
             env = os.environ.copy()
             env['PYTHONIOENCODING'] = 'utf-8'
             
-            returncode, stdout, stderr = await self._execute_test_process(script_path, env)
+            with tempfile.TemporaryDirectory(prefix="mcp-metrics-") as metrics_dir:
+                metrics_path = os.path.join(metrics_dir, f"{os.path.splitext(script_name)[0]}.json")
+                returncode, stdout, stderr = await self._execute_test_process(script_path, env, metrics_path)
+                document, document_error = self._load_metrics_document(metrics_path)
+            verdicts = self.threshold_engine.evaluate(document.metrics) if document else []
             
             # テスト出力を検証
-            success, severity, reason = self._validate_test_output(script_name, stdout, stderr)
+            success, severity, reason = self._validate_test_output(
+                script_name, document, stderr, document_error, verdicts
+            )
             
             # 結果オブジェクトを作成
             result = TestResult(
@@ -319,7 +303,8 @@ class TestRunner:
                 success=success,
                 output=stdout,
                 error=stderr if stderr else reason,
-                severity=severity
+                severity=severity,
+                verdicts=verdicts
             )
             
             self.test_results.append(result)
@@ -337,6 +322,10 @@ class TestRunner:
                     print(stderr if stderr else reason)
                     if severity:
                         print(f"重要度: {severity.name}")
+            if verdicts:
+                print("閾値判定:")
+                for verdict in verdicts:
+                    print(f"- {self.format_verdict(verdict)}")
 
             return success
 
@@ -370,6 +359,125 @@ class TestRunner:
             print(f"レポート保存中にエラーが発生: {str(e)}")
             raise
 
+class PerformanceComparison:
+    """履歴データベースに記録したパフォーマンステストの実行を基準と比較するクラス
+
+    基準・比較対象はラベルまたはコミット（前方一致）で指定し、それぞれに該当する
+    実行ごとの値を標本としてMann-WhitneyのU検定で有意な悪化を検出する。
+    標本には比較対象の最後の実行と計測結果に影響する実行設定（measurement_config）が
+    一致する実行のみを使用し、除外した実行は警告として報告する。
+    """
+    SOURCE = "test_async_performance.py"
+    VERDICTS = {
+        'regression': '悪化',
+        'improvement': '改善',
+        'unchanged': '変化なし',
+        'insufficient': '標本不足'
+    }
+
+    def __init__(self, meta_dir: str, history_path: Optional[str] = None, alpha: float = 0.05,
+                 min_change: float = 0.05, any_host: bool = False, any_config: bool = False):
+        self.meta_dir = meta_dir
+        self.history_path = history_path or os.path.join(meta_dir, HISTORY_FILENAME)
+        self.alpha = alpha
+        self.min_change = min_change
+        self.any_host = any_host
+        self.any_config = any_config
+        # メトリクスの良い方向は統一メトリクス定義の閾値と共通にする
+        self.threshold_engine = ThresholdEngine.load(os.path.join(meta_dir, "contexts", "unified_metrics.yaml"))
+
+    def compare(self, baseline: str, candidate: Optional[str] = None) -> Dict[str, Any]:
+        """基準と比較対象の実行を選択してメトリクスごとに比較"""
+        if not os.path.exists(self.history_path):
+            raise FileNotFoundError(f"履歴データベースがありません: {self.history_path}")
+        host = None if self.any_host else host_fingerprint()
+        with ResultsStore(self.history_path) as store:
+            # 比較対象の既定は作業ツリーのコミット（gitで管理されていない場合は最後に記録したコミット）
+            candidate = candidate or git_revision(self.meta_dir)[0] or store.latest_commit(self.SOURCE, host)
+            if not candidate:
+                raise ValueError("比較対象の実行がありません")
+            baseline_runs = store.select_runs(baseline, self.SOURCE, host)
+            candidate_runs = store.select_runs(candidate, self.SOURCE, host)
+            baseline_ids = {run['id'] for run in baseline_runs}
+            if baseline_ids & {run['id'] for run in candidate_runs}:
+                raise ValueError(f"基準と比較対象が同じ実行を含んでいます: {baseline} / {candidate}")
+            config = measurement_config(candidate_runs[-1]) if candidate_runs else None
+            warnings: List[str] = []
+            baseline_runs = self._select_config(baseline_runs, config, "基準", warnings)
+            candidate_runs = self._select_config(candidate_runs, config, "比較対象", warnings)
+            comparisons = compare_runs(
+                store.samples([run['id'] for run in baseline_runs]),
+                store.samples([run['id'] for run in candidate_runs]),
+                self.threshold_engine.direction, self.alpha, self.min_change
+            )
+        order = list(self.VERDICTS)
+        comparisons.sort(key=lambda c: order.index(c['verdict']))
+        return {
+            "baseline": baseline,
+            "candidate": candidate,
+            "baseline_runs": len(baseline_runs),
+            "candidate_runs": len(candidate_runs),
+            "config": config,
+            "warnings": warnings,
+            "comparisons": comparisons
+        }
+
+    def _select_config(self, runs: List[Dict[str, Any]], config: Optional[Dict[str, Any]],
+                       side: str, warnings: List[str]) -> List[Dict[str, Any]]:
+        """実行設定が config と一致する実行を選択（any_config 指定時は警告のみ）"""
+        if config is None:
+            return runs
+        matched = [run for run in runs if measurement_config(run) == config]
+        differing = len(runs) - len(matched)
+        if not differing:
+            return runs
+        if self.any_config:
+            warnings.append(f"{side}に実行設定の異なる実行が{differing}回含まれています")
+            return runs
+        warnings.append(f"{side}から実行設定の異なる実行を{differing}回除外しました")
+        return matched
+
+    def iter_report_lines(self, result: Dict[str, Any]) -> Iterator[str]:
+        """比較結果のレポートを1行ずつ生成"""
+        yield "# パフォーマンス比較レポート"
+        yield f"- 基準: {result['baseline']}（{result['baseline_runs']}回）"
+        yield f"- 比較対象: {result['candidate']}（{result['candidate_runs']}回）"
+        yield f"- 判定基準: 片側U検定 p < {self.alpha}、中央値の変化率 {self.min_change:.0%}以上"
+        yield f"- ホスト: {'すべて' if self.any_host else '同一ホストのみ'}"
+        if result['config'] is not None:
+            yield "- 実行設定: " + ", ".join(f"{key}={value}" for key, value in result['config'].items())
+        for warning in result['warnings']:
+            yield f"- 警告: {warning}"
+        counts = {verdict: 0 for verdict in self.VERDICTS}
+        for comparison in result['comparisons']:
+            counts[comparison['verdict']] += 1
+        yield "- 結果: " + ", ".join(f"{self.VERDICTS[verdict]} {count}件" for verdict, count in counts.items())
+        if not result['comparisons']:
+            return
+        yield ""
+        yield "| メトリクス | ラベル | 基準（中央値） | 比較対象（中央値） | 変化率 | p値 | 判定 |"
+        yield "|---|---|---|---|---|---|---|"
+        for c in result['comparisons']:
+            labels = ", ".join(f"{key}={value}" for key, value in c['labels'].items()) or "-"
+            change = f"{c['change']:+.1%}" if c['change'] is not None else "-"
+            p_value = f"{c['p_value']:.4f}" if c['p_value'] is not None else "-"
+            yield (
+                f"| {c['metric_name']} | {labels} | {self._format_value(c['baseline_median'], c['unit'])} "
+                f"| {self._format_value(c['candidate_median'], c['unit'])} | {change} | {p_value} "
+                f"| {self.VERDICTS[c['verdict']]} |"
+            )
+
+    @staticmethod
+    def _format_value(value: Optional[float], unit: str) -> str:
+        return "-" if value is None else f"{value:.3f} {unit}"
+
+    def run(self, baseline: str, candidate: Optional[str] = None) -> bool:
+        """比較結果を出力し、有意な悪化がなければ True を返す"""
+        result = self.compare(baseline, candidate)
+        for line in self.iter_report_lines(result):
+            print(line)
+        return not any(c['verdict'] == 'regression' for c in result['comparisons'])
+
 class TestExecutor:
     """テスト実行を管理するクラス"""
     def __init__(self, meta_dir: str):
@@ -395,13 +503,34 @@ class TestExecutor:
         await self.runner.generate_and_save_report()
         return all(results)
 
-async def main():
-    if len(sys.argv) != 2:
-        print("使用方法: python run_tests.py <path_to_meta_dir>")
-        sys.exit(1)
-
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="run_tests.py", description="テストの一括実行")
+    parser.add_argument("meta_dir", help="_metaディレクトリのパス")
+    parser.add_argument("--loop", choices=LOOP_MODES, default=None,
+                        help="イベントループの方式（default / uvloop / eager、各テストへ引き継ぐ）")
+    parser.add_argument("--compare", metavar="BASELINE", default=None,
+                        help="テストを実行せず、履歴データベースの実行を基準（ラベルまたはコミット）と比較")
+    parser.add_argument("--candidate", default=None,
+                        help="比較対象のラベルまたはコミット（既定: 作業ツリーのコミット）")
+    parser.add_argument("--history", default=None,
+                        help=f"履歴データベースのパス（既定: メタディレクトリの {HISTORY_FILENAME}）")
+    parser.add_argument("--alpha", type=float, default=0.05, help="有意水準")
+    parser.add_argument("--min-change", type=float, default=0.05,
+                        help="悪化と判定する中央値の最小の変化率")
+    parser.add_argument("--any-host", action="store_true",
+                        help="異なるホストで記録した実行も比較に含める")
+    parser.add_argument("--any-config", action="store_true",
+                        help="実行設定（プロファイル・負荷対象・ワーカー数・負荷方式・レート）の異なる実行も比較に含める")
+    return parser.parse_args(argv)
+
+async def main(args: argparse.Namespace):
     try:
-        meta_dir = sys.argv[1]
+        meta_dir = args.meta_dir
+        if args.compare:
+            comparison = PerformanceComparison(
+                meta_dir, args.history, args.alpha, args.min_change, args.any_host, args.any_config
+            )
+            sys.exit(0 if comparison.run(args.compare, args.candidate) else 1)
         executor = TestExecutor(meta_dir)
         success = await executor.execute_tests()
         sys.exit(0 if success else 1)
@@ -410,4 +539,5 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    run_event_loop(main(args), args.loop)
\ No newline at end of file
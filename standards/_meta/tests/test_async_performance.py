@@ -5,11 +5,47 @@ import yaml
 import time
 import random
 import asyncio
+import itertools
 import aiohttp
-import statistics
-from typing import Dict, List, Any, Optional
+import argparse
+import functools
+import contextlib
+import contextvars
+from typing import Dict, List, Any, Optional, Iterator, Union
 from datetime import datetime
 from enum import Enum, auto
+from validators.result_sink import ResultSink, MemorySink, SINK_TYPES, create_sink, write_report
+from validators.metrics_document import MetricsDocument
+from performance.tdigest import TDigest
+from performance.samples import SampleBuffer
+from performance.recorders import LATENCY_BACKENDS, LATENCY_RECORDERS, LatencyRecorder, create_recorder
+from performance.workload import WORKLOAD_BACKENDS, WorkloadBackend, create_backend, request_cycle
+from performance.distributed import DistributedLoadCoordinator
+from performance.loops import LOOP_MODES, current_loop_mode, run as run_event_loop
+from performance.pacer import TokenBucketPacer
+from performance.timing import NS_PER_MS, NS_PER_SECOND, Timer, now_ns
+from performance.history import HISTORY_FILENAME, ResultsStore
+from performance.trials import OUTLIER_METHODS, TrialHarness
+from performance.scenarios import ScenarioProfile
+from performance.load import (
+    ARRIVAL_PROCESSES, LOAD_PROFILES, LoadProfile, OpenLoopGenerator, OpenLoopResult, find_saturation_rate
+)
+
+# サンプリング・リモートMCP接続テストの既定の目標リクエストレート（req/s、モード・カテゴリごと）
+DEFAULT_SAMPLING_RATE = 50.0
+DEFAULT_REMOTE_RATE = 100.0
+# 開ループの既定の目標レートのスループット閾値に対する倍率（目標どおりでも閾値を下回らない余裕）
+OPEN_LOOP_RATE_HEADROOM = 1.2
+# 反復計測の指標の単位
+TRIAL_UNITS = {
+    "throughput": "requests_per_second",
+    "latency_p99": "milliseconds",
+    "success_rate": "percent"
+}
+# ウォームアップ中のシナリオか（並行するシナリオのタスクごとに切り替えるためコンテキスト変数で保持）
+_in_warmup: contextvars.ContextVar[bool] = contextvars.ContextVar('in_warmup', default=False)
+# 反復計測のシナリオごとの指標のグループを表すラベル
+TRIAL_GROUP_LABELS = {"sampling": "mode", "remote_mcp": "category"}
 
 class ErrorSeverity(Enum):
     """エラーの重要度を定義"""
@@ -58,20 +94,49 @@ class StateTransitions:
 class MetricsAnalyzer:
     """メトリクス分析を担当"""
     @staticmethod
-    def calculate_latency_stats(response_times: List[float]) -> Optional[Dict[str, float]]:
-        """レイテンシー統計を計算"""
+    def create_recorder(backend: str = 'histogram') -> LatencyRecorder:
+        """レイテンシー記録先の生成（histogram / tdigest / samples）"""
+        return create_recorder(backend)
+
+    @staticmethod
+    def calculate_latency_stats(response_times: Union[LatencyRecorder, List[float]]) -> Optional[Dict[str, float]]:
+        """レイテンシー統計を計算（記録先またはレスポンスタイムのリスト）"""
         if not response_times:
             return None
+        if isinstance(response_times, LATENCY_RECORDERS):
+            return response_times.stats()
         try:
-            quantiles = statistics.quantiles(response_times, n=100)
-            return {
-                "p50": quantiles[49],
-                "p95": quantiles[94],
-                "p99": quantiles[98]
-            }
+            # リストはサンプルバッファに移して計算（NumPyがあればベクトル演算）
+            return SampleBuffer.from_samples(response_times).stats()
         except Exception:
             return None
 
+    @staticmethod
+    def calculate_sketch_stats(
+        response_times: Union[LatencyRecorder, List[float]],
+        compression: float = 200.0
+    ) -> Optional[Dict[str, float]]:
+        """レイテンシー統計をt-digestで計算（calculate_latency_statsと同じキーを返却）"""
+        if not response_times:
+            return None
+        if isinstance(response_times, LATENCY_RECORDERS):
+            return response_times.stats()
+        sketch = TDigest(compression)
+        for response_time in response_times:
+            sketch.record(response_time)
+        return sketch.stats()
+
+    @staticmethod
+    def merge_latency(recorders: List[LatencyRecorder]) -> Optional[LatencyRecorder]:
+        """ワーカー・カテゴリごとのレイテンシー記録を結合（元の記録は変更しない）"""
+        recorders = [recorder for recorder in recorders if recorder is not None]
+        if not recorders:
+            return None
+        merged = type(recorders[0]).from_dict(recorders[0].to_dict())
+        for recorder in recorders[1:]:
+            merged.merge(recorder)
+        return merged
+
     @staticmethod
     def calculate_success_rate(success_count: int, error_count: int) -> float:
         """成功率を計算"""
@@ -79,12 +144,84 @@ class MetricsAnalyzer:
         return (success_count / total * 100) if total > 0 else 0.0
 
 class AsyncPerformanceTester:
-    def __init__(self, meta_dir: str):
+    def __init__(
+        self,
+        meta_dir: str,
+        sink: Optional[ResultSink] = None,
+        latency_backend: str = 'histogram',
+        workload_backend: Optional[str] = None,
+        workload_url: Optional[str] = None
+    ):
         self.meta_dir = meta_dir
-        self.results: List[Dict[str, Any]] = []
+        self.sink = sink if sink is not None else MemorySink()
+        # レイテンシーは perf_counter_ns で計測し、校正した計時のオーバーヘッドを差し引く
+        self.timer = Timer.calibrated()
+        self.latency_backend = latency_backend
+        # 状態遷移1回あたりの検証の待機時間（秒、シナリオのプロファイルで変更）
+        self.transition_delay = 0.05
         self.error_count = 0
         self.warning_count = 0
+        # ウォームアップ中に発生し、結果に含めなかったエラー・警告の数
+        self.warmup_error_count = 0
+        self.warmup_warning_count = 0
         self.metrics_config = self._load_metrics_config()
+        self.performance_config = self._load_performance_config()
+
+        # 負荷対象のバックエンドと送信する要求の順序（weightの比率で巡回）
+        workload_config = dict(self.performance_config.get('workload', {}))
+        if workload_backend:
+            workload_config['backend'] = workload_backend
+        if workload_url:
+            workload_config['http_sse'] = {**(workload_config.get('http_sse') or {}), 'url': workload_url}
+        self.workload: WorkloadBackend = create_backend(workload_config, meta_dir)
+        self.workload_config = workload_config
+        self._requests = request_cycle(workload_config.get('requests'))
+        self.method_metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _new_recorder(self) -> LatencyRecorder:
+        """設定された方式のレイテンシー記録先を生成"""
+        return MetricsAnalyzer.create_recorder(self.latency_backend)
+
+    def _load_performance_config(self) -> Dict[str, Any]:
+        """パフォーマンステスト設定の読み込み（未作成の場合は既定値）"""
+        config_path = os.path.join(self.meta_dir, "contexts", "performance_config.yaml")
+        if not os.path.exists(config_path):
+            return {}
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+            if config.get('version') != '1.2.0':
+                self.add_error("パフォーマンステスト設定のバージョンが不一致", ErrorSeverity.CRITICAL)
+            return config
+        except Exception as e:
+            self.add_error(f"パフォーマンステスト設定の読み込みエラー: {str(e)}", ErrorSeverity.CRITICAL)
+            return {}
+
+    async def start_workload(self) -> None:
+        """負荷対象への接続と初期化"""
+        await self.workload.start()
+
+    async def close_workload(self) -> None:
+        """負荷対象への接続の終了"""
+        await self.workload.close()
+
+    def _reset_method_metrics(self) -> None:
+        self.method_metrics = {}
+
+    def _method_metrics_for(self, method: str) -> Dict[str, Any]:
+        metrics = self.method_metrics.get(method)
+        if metrics is None:
+            metrics = {"success_count": 0, "error_count": 0, "response_times": self._new_recorder()}
+            self.method_metrics[method] = metrics
+        return metrics
+
+    def _collect_method_metrics(self, elapsed: float) -> Dict[str, Any]:
+        """メソッド別メトリクスにスループットを付与して返す（以降の記録とは分離）"""
+        methods = self.method_metrics
+        for metrics in methods.values():
+            metrics["throughput"] = metrics["success_count"] / elapsed if elapsed > 0 else 0.0
+        self._reset_method_metrics()
+        return {"backend": self.workload.name, "methods": methods}
 
     def _load_metrics_config(self) -> Dict[str, Any]:
         """統一メトリクス定義の読み込み"""
@@ -99,21 +236,22 @@ class AsyncPerformanceTester:
             self.add_error(f"統一メトリクス定義の読み込みエラー: {str(e)}", ErrorSeverity.CRITICAL)
             return {}
 
-    async def test_performance(self, test_duration: int = 10) -> Dict[str, Any]:
-        """パフォーマンステスト（MCPフレームワーク標準v1.2.0準拠）"""
+    async def test_performance(self, test_duration: float = 10, concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """パフォーマンステスト（MCPフレームワーク標準v1.2.0準拠、concurrency は同時実行数の上限）"""
         metrics = {
             "throughput": 0,
             "error_counts": 0,
-            "response_times": [],
+            "response_times": self._new_recorder(),
             "sampling": {
-                "llm_sampling": {"success_count": 0, "error_count": 0, "response_times": []},
-                "tool_fallback": {"success_count": 0, "error_count": 0, "response_times": []},
-                "prompt_fallback": {"success_count": 0, "error_count": 0, "response_times": []}
+                "llm_sampling": {"success_count": 0, "error_count": 0, "response_times": self._new_recorder()},
+                "tool_fallback": {"success_count": 0, "error_count": 0, "response_times": self._new_recorder()},
+                "prompt_fallback": {"success_count": 0, "error_count": 0, "response_times": self._new_recorder()}
             }
         }
 
-        start_time = time.time()
-        end_time = start_time + test_duration
+        self._reset_method_metrics()
+        start_time = now_ns()
+        end_time = start_time + test_duration * NS_PER_SECOND
         request_count = 0
         
         # システムリソースに基づいて並列実行数を動的に調整
@@ -125,13 +263,11 @@ class AsyncPerformanceTester:
             int(memory_available / (1024 * 1024 * 2)),  # 利用可能メモリに基づく上限（2MB/タスクと仮定）
             5000  # 絶対上限
         )
-
-        # メモリ効率を改善するためのバッチ処理
-        batch_size = 1000
-        response_times_batch = []
+        if concurrency:
+            max_concurrent = min(max_concurrent, concurrency)
 
         tasks = []
-        while time.time() < end_time:
+        while now_ns() < end_time:
             if len(tasks) < max_concurrent:
                 tasks.append(asyncio.create_task(self.simulate_async_operation(request_count)))
                 request_count += 1
@@ -142,12 +278,7 @@ class AsyncPerformanceTester:
                 for task in done:
                     try:
                         result = await task
-                        response_times_batch.append(result.get("processing_time", 0) * 1000)
-                        
-                        # バッチサイズに達したら集計してメインの配列に追加
-                        if len(response_times_batch) >= batch_size:
-                            metrics["response_times"].extend(response_times_batch)
-                            response_times_batch = []
+                        metrics["response_times"].record(result.get("processing_time_ns", 0) / NS_PER_MS)
                     except Exception as e:
                         metrics["error_counts"] += 1
                         self.add_error(f"パフォーマンステストエラー: {str(e)}", ErrorSeverity.NON_CRITICAL)
@@ -158,20 +289,185 @@ class AsyncPerformanceTester:
             for task in done:
                 try:
                     result = await task
-                    response_times_batch.append(result.get("processing_time", 0) * 1000)
+                    metrics["response_times"].record(result.get("processing_time_ns", 0) / NS_PER_MS)
                 except Exception as e:
                     metrics["error_counts"] += 1
                     self.add_error(f"パフォーマンステストエラー: {str(e)}", ErrorSeverity.NON_CRITICAL)
 
-        # 残りのレスポンスタイムを追加
-        if response_times_batch:
-            metrics["response_times"].extend(response_times_batch)
-
-        total_time = time.time() - start_time
+        total_time = (now_ns() - start_time) / NS_PER_SECOND
         metrics["throughput"] = request_count / total_time
+        metrics["workload"] = self._collect_method_metrics(total_time)
+
+        return metrics
+
+    @staticmethod
+    def measure_performance(metrics: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        """反復計測で比較する基本パフォーマンスの指標"""
+        stats = MetricsAnalyzer.calculate_latency_stats(metrics.get('response_times'))
+        return {
+            "throughput": metrics.get('throughput', 0),
+            "latency_p99": stats['p99'] if stats else None
+        }
+
+    @staticmethod
+    def measure_groups(metrics: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        """反復計測で比較するサンプリングのモード・リモートMCP接続のカテゴリごとの指標"""
+        measured: Dict[str, Optional[float]] = {}
+        for key, data in metrics.items():
+            stats = MetricsAnalyzer.calculate_latency_stats(data.get('response_times'))
+            measured[f"{key}.success_rate"] = MetricsAnalyzer.calculate_success_rate(
+                data.get('success_count', 0), data.get('error_count', 0))
+            measured[f"{key}.latency_p99"] = stats['p99'] if stats else None
+        return measured
+
+    def _performance_threshold(self, metric: str, default: float, level: str = 'critical') -> float:
+        """統一メトリクス定義の基本パフォーマンス閾値"""
+        thresholds = self.metrics_config.get('base_metrics', {}).get('performance', {}).get(metric, {})
+        return thresholds.get('threshold', {}).get(level, default)
+
+    def _throughput_gate(self) -> float:
+        """スループットの合格ライン（失敗となる critical・non_critical のうち最も高い下限）"""
+        thresholds = self.metrics_config.get('base_metrics', {}).get('performance', {}) \
+            .get('throughput', {}).get('threshold') or {}
+        return max((thresholds[level] for level in ('critical', 'non_critical') if level in thresholds), default=1000)
+
+    def _default_target_rate(self) -> float:
+        """開ループの既定の目標レート（スループット閾値の最も厳しいレベルに余裕を持たせた値）"""
+        thresholds = self.metrics_config.get('base_metrics', {}).get('performance', {}) \
+            .get('throughput', {}).get('threshold') or {}
+        return max(thresholds.values(), default=1000) * OPEN_LOOP_RATE_HEADROOM
+
+    async def _open_loop_operation(self, index: int) -> None:
+        """開ループ負荷で送信する1件の処理（失敗時は例外を送出）"""
+        result = await self.simulate_async_operation(index)
+        if not result["success"]:
+            raise Exception(result["error"])
+
+    async def _run_open_loop(self, profile: LoadProfile, arrival: str, seed: Optional[int]) -> OpenLoopResult:
+        generator = OpenLoopGenerator(
+            self._open_loop_operation, profile, arrival,
+            recorder_factory=self._new_recorder, seed=seed, timer=self.timer
+        )
+        return await generator.run()
 
+    async def test_open_loop_performance(
+        self,
+        rate: Optional[float] = None,
+        test_duration: int = 10,
+        arrival: str = 'constant',
+        profile: str = 'constant',
+        ramp_up: float = 0.0,
+        steps: int = 4,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """開ループのパフォーマンステスト（目標レートで予定どおりに送信）
+
+        レイテンシーは予定開始時刻から計測するため、処理の滞留による待ち時間も含まれる。
+        rate を省略した場合は _default_target_rate() を目標とする。
+        """
+        if rate is None:
+            rate = self._default_target_rate()
+        load_profile = LoadProfile.create(profile, rate, test_duration, ramp_up, steps)
+        self._reset_method_metrics()
+        result = await self._run_open_loop(load_profile, arrival, seed)
+        workload = self._collect_method_metrics(result.elapsed)
+        if result.missed_slots:
+            self.add_warning(f"開ループ負荷で送信できなかった予定: {result.missed_slots}件")
+        return {
+            "throughput": result.achieved_rate,
+            "error_counts": result.errors + result.missed_slots,
+            "response_times": result.latency,
+            "workload": workload,
+            "open_loop": {
+                **result.to_dict(),
+                "arrival": arrival,
+                "profile": profile
+            }
+        }
+
+    async def test_distributed_performance(
+        self,
+        workers: int,
+        load_mode: str = 'open',
+        rate: Optional[float] = None,
+        test_duration: int = 10,
+        arrival: str = 'constant',
+        profile: str = 'constant',
+        ramp_up: float = 0.0,
+        steps: int = 4,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """複数のワーカープロセスによるパフォーマンステスト
+
+        各ワーカーは独自のイベントループと負荷対象への接続を持ち、目標レート
+        （closed ではパイプラインの深さを合計した同時実行数）を均等に分担する。
+        ワーカーから送られるメトリクスの差分を結合して全体のスループットと分位点を求める。
+        """
+        if rate is None:
+            rate = self._default_target_rate()
+        coordinator = DistributedLoadCoordinator(workers, {
+            "workload": self.workload_config,
+            "base_dir": self.meta_dir,
+            "mode": load_mode,
+            "rate": rate,
+            "concurrency": self.workload.pipeline_depth * workers,
+            "duration": test_duration,
+            "arrival": arrival,
+            "profile": profile,
+            "ramp_up": ramp_up,
+            "steps": steps,
+            "seed": seed,
+            "latency_backend": self.latency_backend,
+            "loop": current_loop_mode()
+        })
+        outcome = await coordinator.run_async()
+        result = outcome["result"]
+        for worker in outcome["workers"]:
+            if worker["error"]:
+                self.add_error(f"ワーカー{worker['worker']}のエラー: {worker['error']}", ErrorSeverity.CRITICAL)
+        if result.missed_slots:
+            self.add_warning(f"開ループ負荷で送信できなかった予定: {result.missed_slots}件")
+
+        metrics = {
+            "throughput": result.achieved_rate,
+            "error_counts": result.errors + result.missed_slots,
+            "response_times": result.latency,
+            "workload": {"backend": self.workload.name, "methods": outcome["methods"]},
+            "distributed": {"workers": workers, "per_worker": outcome["workers"]}
+        }
+        if load_mode == 'open':
+            metrics["open_loop"] = {**result.to_dict(), "arrival": arrival, "profile": profile}
         return metrics
 
+    async def test_saturation(
+        self,
+        start_rate: float = 100.0,
+        max_rate: float = 100000.0,
+        probe_duration: float = 5.0,
+        arrival: str = 'constant',
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """統一メトリクス定義の閾値（critical）を満たす飽和スループットの探索
+
+        応答時間はP99を閾値と比較し、エラー率には送信できなかった予定も含める。
+        飽和スループットはスループットの合格ライン（_throughput_gate）と比較する。
+        """
+        latency_ms = self._performance_threshold('response_time', 1000)
+        max_error_rate = self._performance_threshold('error_rate', 0.01)
+        required_rate = self._throughput_gate()
+
+        async def run_at(rate: float) -> OpenLoopResult:
+            return await self._run_open_loop(LoadProfile.constant(rate, probe_duration), arrival, seed)
+
+        saturation = await find_saturation_rate(run_at, latency_ms, max_error_rate, start_rate, max_rate)
+        saturation["required_rate"] = required_rate
+        if saturation["saturation_rate"] < required_rate:
+            self.add_error(
+                f"飽和スループットが閾値未満: {saturation['saturation_rate']:.1f} req/s (目標: {required_rate} req/s)",
+                ErrorSeverity.CRITICAL
+            )
+        return saturation
+
     async def test_sampling_performance(self, test_duration: int = 30) -> Dict[str, Any]:
         """サンプリング機能のパフォーマンステスト"""
         # メトリクス設定から基準値を取得
@@ -193,18 +489,15 @@ class AsyncPerformanceTester:
             }
         }
 
-        metrics = {mode: {"response_times": [], "success_count": 0, "error_count": 0}
+        metrics = {mode: {"response_times": self._new_recorder(), "success_count": 0, "error_count": 0}
+                  for mode in sampling_modes}
+        # モードごとのリクエストレートの制御
+        pacers = {mode: TokenBucketPacer(self._pacing_rate('sampling', mode, DEFAULT_SAMPLING_RATE), test_duration)
                   for mode in sampling_modes}
 
-        start_time = time.time()
-        end_time = start_time + test_duration
-
-        # 並列処理用のタスクリスト
-        tasks = []
-        
         async def process_sampling_mode(mode: str, config: dict) -> None:
-            while time.time() < end_time:
-                start_request = time.time()
+            pacer = pacers[mode]
+            while (start_request := await pacer.acquire()) is not None:
                 try:
                     # 設定された遅延を適用
                     await asyncio.sleep(config['latency']['threshold'])
@@ -214,22 +507,42 @@ class AsyncPerformanceTester:
                         raise Exception(f"{mode}エラー")
                     
                     metrics[mode]["success_count"] += 1
-                    metrics[mode]["response_times"].append((time.time() - start_request) * 1000)
+                    metrics[mode]["response_times"].record(self.timer.elapsed_ms(start_request))
                 except Exception:
                     metrics[mode]["error_count"] += 1
-                
-                # 処理間隔を最適化
-                await asyncio.sleep(0.0001)
 
         # 各モードを並列実行
-        for mode, config in sampling_modes.items():
-            tasks.append(asyncio.create_task(process_sampling_mode(mode, config)))
-
-        # すべてのタスクが完了するまで待機
-        await asyncio.gather(*tasks)
+        await asyncio.gather(*(process_sampling_mode(mode, config) for mode, config in sampling_modes.items()))
 
+        for mode, pacer in pacers.items():
+            metrics[mode]["pacing"] = pacer.to_dict()
+        self._validate_sampling_throughput(metrics)
         return metrics
 
+    def _pacing_rate(self, group: str, name: str, default: float) -> float:
+        """パフォーマンステスト設定の目標リクエストレート（req/s、0は制限なし）"""
+        return self.performance_config.get('pacing', {}).get(group, {}).get(name, default)
+
+    def _validate_sampling_throughput(self, metrics: Dict[str, Any]) -> None:
+        """サンプリングのモードごとの達成レートを統一メトリクス定義の閾値で検証"""
+        thresholds = (self.metrics_config.get('base_metrics', {}).get('sampling', {})
+                      .get('throughput', {}).get('threshold', {}))
+        critical = thresholds.get('critical', 10)
+        warning = thresholds.get('warning', 20)
+        for mode, data in metrics.items():
+            pacing = data["pacing"]
+            if pacing["achieved_rate"] < critical:
+                self.add_error(
+                    f"{mode}の低いスループット: {pacing['achieved_rate']:.2f} req/sec "
+                    f"(目標: {pacing['target_rate']} req/sec, 閾値: {critical} req/sec)",
+                    ErrorSeverity.CRITICAL
+                )
+            elif pacing["achieved_rate"] < warning:
+                self.add_warning(
+                    f"{mode}のスループットが警告閾値未満: {pacing['achieved_rate']:.2f} req/sec "
+                    f"(閾値: {warning} req/sec)"
+                )
+
     async def test_remote_mcp_performance(self, test_duration: int = 60) -> Dict[str, Any]:
         """リモートMCP接続のパフォーマンステスト"""
         # メトリクス設定から基準値を取得
@@ -243,7 +556,6 @@ class AsyncPerformanceTester:
                     ("http", remote_config.get('http_latency', 0.008), remote_config.get('http_error_rate', 0.003)),
                     ("manual", remote_config.get('manual_latency', 0.001), remote_config.get('manual_error_rate', 0.002))
                 ],
-                "batch_size": 100,
                 "threshold": remote_config.get('discovery_threshold', 2.0)
             },
             "authentication": {
@@ -251,61 +563,47 @@ class AsyncPerformanceTester:
                     ("oauth2", remote_config.get('oauth2_latency', 0.01), remote_config.get('oauth2_error_rate', 0.005)),
                     ("token", remote_config.get('token_latency', 0.005), remote_config.get('token_error_rate', 0.003))
                 ],
-                "batch_size": 100,
                 "threshold": remote_config.get('auth_threshold', 1.0)
             },
             "stateless": {
                 "tests": [
                     ("operation", remote_config.get('operation_latency', 0.001), remote_config.get('operation_error_rate', 0.002))
                 ],
-                "batch_size": 100,
                 "threshold": remote_config.get('stateless_threshold', 0.5)
             }
         }
 
         metrics = {category: {
-            "response_times": [],
+            "response_times": self._new_recorder(),
             "success_count": 0,
-            "error_count": 0,
-            "response_times_batch": []
+            "error_count": 0
         } for category in test_configs}
 
+        # カテゴリごとのリクエストレートの制御
+        pacers = {category: TokenBucketPacer(self._pacing_rate('remote_mcp', category, DEFAULT_REMOTE_RATE), test_duration)
+                  for category in test_configs}
+
         async def run_category_tests(category: str, config: dict) -> None:
-            end_time = time.time() + test_duration
-            while time.time() < end_time:
-                for test_type, delay, error_rate in config["tests"]:
-                    start_request = time.time()
-                    try:
-                        await asyncio.sleep(delay)
-                        if random.random() < error_rate:
-                            raise Exception(f"{test_type}エラー")
-                        
-                        response_time = time.time() - start_request
-                        metrics[category]["response_times_batch"].append(response_time)
-                        metrics[category]["success_count"] += 1
-                        
-                        # バッチ処理によるメモリ効率の改善
-                        if len(metrics[category]["response_times_batch"]) >= config["batch_size"]:
-                            metrics[category]["response_times"].extend(metrics[category]["response_times_batch"])
-                            metrics[category]["response_times_batch"] = []
-                            
-                    except Exception as e:
-                        metrics[category]["error_count"] += 1
-                        self.add_error(f"{category}エラー ({test_type}): {str(e)}")
+            pacer = pacers[category]
+            tests = itertools.cycle(config["tests"])
+            while (start_request := await pacer.acquire()) is not None:
+                test_type, delay, error_rate = next(tests)
+                try:
+                    await asyncio.sleep(delay)
+                    if random.random() < error_rate:
+                        raise Exception(f"{test_type}エラー")
                     
-                    # 処理間隔の最適化
-                    await asyncio.sleep(0.0001)
+                    metrics[category]["response_times"].record(self.timer.elapsed_ms(start_request))
+                    metrics[category]["success_count"] += 1
+                except Exception as e:
+                    metrics[category]["error_count"] += 1
+                    self.add_error(f"{category}エラー ({test_type}): {str(e)}")
 
         # 各カテゴリを並列実行
-        tasks = [run_category_tests(category, config)
-                for category, config in test_configs.items()]
-        await asyncio.gather(*tasks)
+        await asyncio.gather(*(run_category_tests(category, config) for category, config in test_configs.items()))
 
-        # 残りのバッチデータを処理
-        for category in metrics:
-            if metrics[category]["response_times_batch"]:
-                metrics[category]["response_times"].extend(metrics[category]["response_times_batch"])
-                del metrics[category]["response_times_batch"]
+        for category, pacer in pacers.items():
+            metrics[category]["pacing"] = pacer.to_dict()
 
         # メトリクスの検証
         self._validate_remote_metrics(metrics)
@@ -351,10 +649,10 @@ class AsyncPerformanceTester:
             # レイテンシーの検証
             if data["response_times"]:
                 try:
-                    # メモリ効率を考慮した統計計算
-                    response_times = sorted(data["response_times"])
-                    p95_index = int(len(response_times) * 0.95)
-                    p95_latency = response_times[p95_index]
+                    # 記録先はミリ秒で記録しているため秒に換算
+                    p50_latency, p95_latency, p99_latency = (
+                        value / 1000 for value in data["response_times"].quantiles([0.50, 0.95, 0.99])
+                    )
                     
                     if p95_latency > category_thresholds["latency"]:
                         self.add_error(
@@ -363,13 +661,11 @@ class AsyncPerformanceTester:
                         )
                         
                     # 詳細な統計情報を警告として追加
-                    p50_index = int(len(response_times) * 0.5)
-                    p99_index = int(len(response_times) * 0.99)
                     self.add_warning(
                         f"{category}のレイテンシー統計:\n"
-                        f"  - P50: {response_times[p50_index]:.3f}秒\n"
+                        f"  - P50: {p50_latency:.3f}秒\n"
                         f"  - P95: {p95_latency:.3f}秒\n"
-                        f"  - P99: {response_times[p99_index]:.3f}秒"
+                        f"  - P99: {p99_latency:.3f}秒"
                     )
                 except Exception as e:
                     self.add_error(
@@ -385,70 +681,76 @@ class AsyncPerformanceTester:
                     ErrorSeverity.CRITICAL
                 )
 
-    async def test_async_operations(self, iterations: int = 100) -> bool:
-        """非同期処理テスト"""
-        transition_results = []
-        
-        for _ in range(iterations):
-            current_state = 'pending'
-            state_history = []
-            checkpoints = []
-            recovery_points = []
-
-            while current_state not in ['completed', 'failed', 'cancelled']:
-                state_record = {
-                    'state': current_state,
-                    'timestamp': time.time(),
-                    'checkpoint': None,
-                    'recovery_point': None
-                }
-
-                if StateTransitions.requires_checkpoint(current_state):
-                    checkpoint = await self.create_checkpoint(current_state)
-                    state_record['checkpoint'] = checkpoint
-                    checkpoints.append(checkpoint)
-
-                state_history.append(state_record)
-
-                valid_next_states = StateTransitions.STATES[current_state]['valid_transitions']
-                if not valid_next_states:
-                    break
+    async def test_async_operations(self, iterations: int = 100, concurrency: int = 1) -> bool:
+        """非同期処理テスト（状態遷移を iterations 回、最大 concurrency 件ずつ並行して検証）"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_transitions() -> Dict[str, Any]:
+            async with semaphore:
+                return await self._run_state_transitions()
+
+        transition_results = await asyncio.gather(*(run_transitions() for _ in range(iterations)))
+        return await self.analyze_transition_results(list(transition_results))
+
+    async def _run_state_transitions(self) -> Dict[str, Any]:
+        """pending から終了状態まで無作為に状態を遷移させた履歴"""
+        current_state = 'pending'
+        state_history = []
+        checkpoints = []
+        recovery_points = []
+
+        while current_state not in ['completed', 'failed', 'cancelled']:
+            state_record = {
+                'state': current_state,
+                'timestamp': time.time(),
+                'checkpoint': None,
+                'recovery_point': None
+            }
 
-                next_state = random.choice(valid_next_states)
+            if StateTransitions.requires_checkpoint(current_state):
+                checkpoint = await self.create_checkpoint(current_state)
+                state_record['checkpoint'] = checkpoint
+                checkpoints.append(checkpoint)
 
-                try:
-                    if next_state == 'recovering':
-                        if not checkpoints:
-                            self.add_error(
-                                "リカバリーポイントが存在しない状態でのリカバリー試行",
-                                ErrorSeverity.CRITICAL
-                            )
-                            break
-                        
-                        recovery_point = await self.create_recovery_point(
-                            current_state,
-                            checkpoints[-1]
-                        )
-                        state_record['recovery_point'] = recovery_point
-                        recovery_points.append(recovery_point)
+            state_history.append(state_record)
 
-                    await self.validate_state_transition(current_state, next_state)
-                    current_state = next_state
+            valid_next_states = StateTransitions.STATES[current_state]['valid_transitions']
+            if not valid_next_states:
+                break
 
-                except Exception as e:
-                    self.add_error(
-                        f"状態遷移エラー {current_state} -> {next_state}: {str(e)}",
-                        ErrorSeverity.CRITICAL
+            next_state = random.choice(valid_next_states)
+
+            try:
+                if next_state == 'recovering':
+                    if not checkpoints:
+                        self.add_error(
+                            "リカバリーポイントが存在しない状態でのリカバリー試行",
+                            ErrorSeverity.CRITICAL
+                        )
+                        break
+                    
+                    recovery_point = await self.create_recovery_point(
+                        current_state,
+                        checkpoints[-1]
                     )
-                    break
+                    state_record['recovery_point'] = recovery_point
+                    recovery_points.append(recovery_point)
 
-            transition_results.append({
-                'history': state_history,
-                'checkpoints': checkpoints,
-                'recovery_points': recovery_points
-            })
+                await self.validate_state_transition(current_state, next_state)
+                current_state = next_state
 
-        return await self.analyze_transition_results(transition_results)
+            except Exception as e:
+                self.add_error(
+                    f"状態遷移エラー {current_state} -> {next_state}: {str(e)}",
+                    ErrorSeverity.CRITICAL
+                )
+                break
+
+        return {
+            'history': state_history,
+            'checkpoints': checkpoints,
+            'recovery_points': recovery_points
+        }
 
     async def create_checkpoint(self, state: str) -> Dict[str, Any]:
         """チェックポイントの作成"""
@@ -469,7 +771,7 @@ class AsyncPerformanceTester:
 
     async def validate_state_transition(self, current_state: str, next_state: str) -> None:
         """状態遷移の妥当性検証"""
-        await asyncio.sleep(0.05)
+        await asyncio.sleep(self.transition_delay)
         if not StateTransitions.is_valid_transition(current_state, next_state):
             raise Exception(f"無効な状態遷移: {current_state} -> {next_state}")
 
@@ -524,14 +826,13 @@ class AsyncPerformanceTester:
     async def simulate_async_operation(self, iteration: int) -> Dict[str, Any]:
         """非同期処理のシミュレーション"""
         try:
-            start_time = time.time()
+            start_time = now_ns()
             result = await self.process_async_task()
-            end_time = time.time()
             
             return {
                 "iteration": iteration,
                 "success": True,
-                "processing_time": end_time - start_time
+                "processing_time_ns": self.timer.elapsed_ns(start_time)
             }
         except Exception as e:
             self.add_error(f"非同期処理エラー (iteration {iteration}): {str(e)}")
@@ -542,13 +843,34 @@ class AsyncPerformanceTester:
             }
 
     async def process_async_task(self) -> Dict[str, Any]:
-        """実際の非同期タスク処理"""
-        # 遅延を完全に除去し、即時返却
-        return {"status": "completed"}
+        """負荷対象へ次の要求を送信し、メソッド別のレイテンシーを記録"""
+        method, params = next(self._requests)
+        metrics = self._method_metrics_for(method)
+        start_time = now_ns()
+        try:
+            await self.workload.call(method, params)
+        except Exception:
+            metrics["error_count"] += 1
+            raise
+        metrics["response_times"].record(self.timer.elapsed_ms(start_time))
+        metrics["success_count"] += 1
+        return {"status": "completed", "method": method}
+
+    @contextlib.contextmanager
+    def warmup(self) -> Iterator[None]:
+        """ウォームアップの間、このタスク（と生成したタスク）のエラー・警告を結果に含めない"""
+        token = _in_warmup.set(True)
+        try:
+            yield
+        finally:
+            _in_warmup.reset(token)
 
     def add_error(self, message: str, severity: ErrorSeverity = ErrorSeverity.NON_CRITICAL):
-        """エラーの追加"""
-        self.results.append({
+        """エラーの追加（ウォームアップ中は件数のみ数える）"""
+        if _in_warmup.get():
+            self.warmup_error_count += 1
+            return
+        self.sink.emit({
             "level": "ERROR",
             "message": message,
             "severity": severity.name.lower(),
@@ -557,104 +879,476 @@ class AsyncPerformanceTester:
         self.error_count += 1
 
     def add_warning(self, message: str):
-        """警告の追加"""
-        self.results.append({
+        """警告の追加（ウォームアップ中は件数のみ数える）"""
+        if _in_warmup.get():
+            self.warmup_warning_count += 1
+            return
+        self.sink.emit({
             "level": "WARNING",
             "message": message,
             "timestamp": time.time()
         })
         self.warning_count += 1
 
-    def generate_report(self, metrics: Dict[str, Any]) -> str:
-        """レポートの生成"""
-        report = []
-        report.append("# 非同期処理・パフォーマンステストレポート")
-        report.append(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    def iter_report_lines(self, metrics: Dict[str, Any]) -> Iterator[str]:
+        """レポートを1行ずつ生成（結果は出力先から読み戻す）"""
+        yield "# 非同期処理・パフォーマンステストレポート"
+        yield f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         
         # 基本パフォーマンスメトリクス
-        report.append("\n## 基本パフォーマンスメトリクス:")
-        report.append(f"- スループット: {metrics.get('throughput', 0):.2f} req/sec")
-        report.append(f"- エラー数: {metrics.get('error_counts', 0)}")
+        yield "\n## 基本パフォーマンスメトリクス:"
+        if metrics.get('profile'):
+            yield f"- シナリオのプロファイル: {metrics['profile']['name']}"
+        if metrics.get('event_loop'):
+            yield f"- イベントループ: {metrics['event_loop']}"
+        if metrics.get('timer'):
+            yield f"- 計時: {metrics['timer']['clock']}（オーバーヘッド {metrics['timer']['overhead_ns']} ns を差し引き）"
+        yield f"- スループット: {metrics.get('throughput', 0):.2f} req/sec"
+        yield f"- エラー数: {metrics.get('error_counts', 0)}"
         
         # レイテンシー統計
         if metrics.get('response_times'):
             stats = MetricsAnalyzer.calculate_latency_stats(metrics['response_times'])
             if stats:
-                report.append("- レイテンシー:")
-                report.append(f"  - P50: {stats['p50']:.3f} ms")
-                report.append(f"  - P95: {stats['p95']:.3f} ms")
-                report.append(f"  - P99: {stats['p99']:.3f} ms")
+                yield "- レイテンシー:"
+                yield f"  - P50: {stats['p50']:.3f} ms"
+                yield f"  - P95: {stats['p95']:.3f} ms"
+                yield f"  - P99: {stats['p99']:.3f} ms"
+                yield f"  - P99.9: {stats['p99.9']:.3f} ms"
+
+        # メソッド別メトリクス
+        if metrics.get('workload'):
+            workload = metrics['workload']
+            yield "\n## メソッド別メトリクス:"
+            yield f"- ワークロードバックエンド: {workload['backend']}"
+            for method, data in sorted(workload['methods'].items()):
+                yield f"\n### {method}:"
+                yield f"- スループット: {data['throughput']:.2f} req/sec"
+                yield f"- 成功数: {data['success_count']}"
+                yield f"- エラー数: {data['error_count']}"
+                stats = MetricsAnalyzer.calculate_latency_stats(data['response_times'])
+                if stats:
+                    yield "- レイテンシー:"
+                    yield f"  - P50: {stats['p50']:.3f} ms"
+                    yield f"  - P95: {stats['p95']:.3f} ms"
+                    yield f"  - P99: {stats['p99']:.3f} ms"
+                    yield f"  - P99.9: {stats['p99.9']:.3f} ms"
+
+        # マルチプロセス負荷
+        if metrics.get('distributed'):
+            distributed = metrics['distributed']
+            yield "\n## マルチプロセス負荷:"
+            yield f"- ワーカー数: {distributed['workers']}"
+            for worker in distributed['per_worker']:
+                line = (
+                    f"  - ワーカー{worker['worker']}: {worker['throughput']:.2f} req/sec"
+                    f"（完了数 {worker['completed']}, エラー数 {worker['errors']}, スナップショット {worker['snapshots']}件）"
+                )
+                if worker['error']:
+                    line += f" エラー: {worker['error']}"
+                yield line
+
+        # 開ループ負荷
+        if metrics.get('open_loop'):
+            open_loop = metrics['open_loop']
+            yield "\n## 開ループ負荷:"
+            yield f"- 到着過程: {open_loop['arrival']} / 負荷プロファイル: {open_loop['profile']}"
+            yield f"- 目標レート（平均）: {open_loop['target_rate']:.2f} req/sec"
+            yield f"- 達成レート: {open_loop['achieved_rate']:.2f} req/sec"
+            yield f"- 予定数: {open_loop['scheduled']} / 送信数: {open_loop['dispatched']} / 完了数: {open_loop['completed']}"
+            yield f"- 送信できなかった予定: {open_loop['missed_slots']}"
+            yield f"- 遅れて送信した予定: {open_loop['late_slots']}（最大遅延 {open_loop['max_lateness_ms']:.3f} ms）"
+            if open_loop['service_time']:
+                yield f"- 処理時間（送信時刻から）P99: {open_loop['service_time']['p99']:.3f} ms"
+
+        # 飽和スループット
+        if metrics.get('saturation'):
+            saturation = metrics['saturation']
+            yield "\n## 飽和スループット:"
+            yield f"- 飽和スループット: {saturation['saturation_rate']:.2f} req/sec（目標: {saturation['required_rate']} req/sec）"
+            yield (
+                f"- 判定基準: P99レイテンシー {saturation['latency_threshold_ms']} ms以下, "
+                f"エラー率 {saturation['error_rate_threshold']}以下"
+            )
+            for probe in saturation['probes']:
+                verdict = "合格" if probe['passed'] else f"不合格（{', '.join(probe['reasons'])}）"
+                yield f"  - {probe['rate']:.1f} req/sec: {verdict}"
 
         # サンプリング機能メトリクス
         if metrics.get('sampling'):
-            report.append("\n## サンプリング機能メトリクス:")
+            yield "\n## サンプリング機能メトリクス:"
             for mode, data in metrics['sampling'].items():
                 success_rate = MetricsAnalyzer.calculate_success_rate(
                     data.get('success_count', 0),
                     data.get('error_count', 0)
                 )
-                report.append(f"\n### {mode}:")
-                report.append(f"- 成功率: {success_rate:.2f}%")
-                report.append(f"- 成功数: {data.get('success_count', 0)}")
-                report.append(f"- エラー数: {data.get('error_count', 0)}")
+                yield f"\n### {mode}:"
+                yield f"- 成功率: {success_rate:.2f}%"
+                yield f"- 成功数: {data.get('success_count', 0)}"
+                yield f"- エラー数: {data.get('error_count', 0)}"
+                yield from self._iter_pacing_lines(data)
 
-                stats = MetricsAnalyzer.calculate_latency_stats(data.get('response_times', []))
+                stats = MetricsAnalyzer.calculate_latency_stats(data.get('response_times'))
                 if stats:
-                    report.append("- レイテンシー:")
-                    report.append(f"  - P50: {stats['p50']:.3f} ms")
-                    report.append(f"  - P95: {stats['p95']:.3f} ms")
-                    report.append(f"  - P99: {stats['p99']:.3f} ms")
+                    yield "- レイテンシー:"
+                    yield f"  - P50: {stats['p50']:.3f} ms"
+                    yield f"  - P95: {stats['p95']:.3f} ms"
+                    yield f"  - P99: {stats['p99']:.3f} ms"
+                    yield f"  - P99.9: {stats['p99.9']:.3f} ms"
+
+            # 全モードのレイテンシー（モードごとの記録を結合）
+            yield from self._iter_combined_latency_lines("全モード", metrics['sampling'])
+
+        # リモートMCP接続メトリクス
+        if metrics.get('remote_mcp'):
+            yield "\n## リモートMCP接続メトリクス:"
+            for category, data in metrics['remote_mcp'].items():
+                yield f"\n### {category}:"
+                yield from self._iter_pacing_lines(data)
+            yield from self._iter_combined_latency_lines("全カテゴリ", metrics['remote_mcp'])
+
+        # シナリオごとの設定と所要時間
+        if metrics.get('profile'):
+            yield f"\n## シナリオ（プロファイル: {metrics['profile']['name']}）:"
+            for scenario, settings in metrics['profile']['scenarios'].items():
+                details = [f"{key}: {settings[key]}" for key in ('duration', 'iterations', 'concurrency', 'transition_delay')
+                           if settings.get(key) is not None]
+                elapsed = f"{settings['elapsed']:.2f}秒" if settings.get('elapsed') is not None else "未実行"
+                yield (
+                    f"- {scenario}: 所要時間 {elapsed}（{', '.join(details)}, "
+                    f"資源: {', '.join(settings['resources'])}）"
+                )
+
+        # 反復計測
+        trials = {scenario: trial for scenario, trial in metrics.get('trials', {}).items()
+                  if trial['max_iterations'] > 1}
+        if trials:
+            yield "\n## 反復計測:"
+            for scenario, trial in trials.items():
+                yield from self._iter_trial_lines(scenario, trial)
 
         # テスト結果サマリー
-        report.append(f"\n## テスト結果サマリー:")
-        report.append(f"- エラー数: {self.error_count}")
-        report.append(f"- 警告数: {self.warning_count}")
+        yield f"\n## テスト結果サマリー:"
+        yield f"- エラー数: {self.error_count}"
+        yield f"- 警告数: {self.warning_count}"
+        if self.warmup_error_count or self.warmup_warning_count:
+            yield (
+                f"- ウォームアップ中のエラー数: {self.warmup_error_count} / 警告数: {self.warmup_warning_count}"
+                "（集計対象外）"
+            )
         
         # 詳細なエラーと警告
-        if self.results:
-            report.append("\n## 詳細:")
-            for result in self.results:
-                report.append(f"- [{result['level']}] {result['message']}")
-
-        return "\n".join(report)
-
-async def main():
-    if len(sys.argv) != 2:
-        print("使用方法: python test_async_performance.py <path_to_meta_dir>")
-        sys.exit(1)
+        if len(self.sink):
+            yield "\n## 詳細:"
+            for result in self.sink:
+                yield f"- [{result['level']}] {result['message']}"
 
-    meta_dir = sys.argv[1]
-    tester = AsyncPerformanceTester(meta_dir)
+    @staticmethod
+    def _iter_pacing_lines(data: Dict[str, Any]) -> Iterator[str]:
+        """目標レートと達成レートの行を生成"""
+        pacing = data.get('pacing')
+        if pacing:
+            target = f"{pacing['target_rate']} req/sec" if pacing['target_rate'] > 0 else "制限なし"
+            yield f"- スループット: {pacing['achieved_rate']:.2f} req/sec（目標: {target}）"
 
-    print("非同期処理テストを実行中...")
-    async_success = await tester.test_async_operations()
+    @staticmethod
+    def _iter_trial_lines(scenario: str, trial: Dict[str, Any]) -> Iterator[str]:
+        """反復計測の要約の行を生成"""
+        confidence = f"{trial['confidence']:.0%}"
+        notes = [f"最大 {trial['max_iterations']}回", f"ウォームアップ {trial['warmup']}回"]
+        if trial['stopped_early']:
+            notes.append(f"信頼区間の半幅が平均の{trial['target_precision']:.1%}以下となり早期終了")
+        yield f"\n### {scenario}:"
+        yield f"- 反復: {trial['iterations']}回（{', '.join(notes)}）"
+        yield f"- 外れ値の除外: {trial['outliers']} / 信頼水準: {confidence}"
+        for name, summary in trial['metrics'].items():
+            if summary['mean'] is None:
+                continue
+            line = f"- {name}: 平均 {summary['mean']:.3f}"
+            if summary['mean_ci']:
+                line += f"（{summary['mean_ci'][0]:.3f}〜{summary['mean_ci'][1]:.3f}）"
+            line += f" / 中央値 {summary['median']:.3f}"
+            if summary['median_ci']:
+                line += f"（{summary['median_ci'][0]:.3f}〜{summary['median_ci'][1]:.3f}）"
+            if summary['rejected']:
+                line += f" / 外れ値 {len(summary['rejected'])}件を除外"
+            yield line
+
+    def build_metrics_document(self, metrics: Dict[str, Any]) -> MetricsDocument:
+        """レポートと同じメトリクスを機械可読の文書に変換（ラベルでメソッド・モード・カテゴリを区別）"""
+        document = MetricsDocument("test_async_performance.py")
+        document.add("performance.throughput", metrics.get('throughput', 0), "requests_per_second")
+        response_times = metrics.get('response_times')
+        document.add_distribution(
+            "performance.response_time", MetricsAnalyzer.calculate_latency_stats(response_times), "milliseconds"
+        )
+        requests = (len(response_times) if response_times else 0) + metrics.get('error_counts', 0)
+        document.add("performance.error_rate",
+                     metrics.get('error_counts', 0) / requests if requests else 0.0, "ratio")
+
+        for method, data in metrics.get('workload', {}).get('methods', {}).items():
+            labels = {"method": method}
+            document.add("workload.throughput", data.get('throughput', 0), "requests_per_second", labels)
+            document.add("workload.success_rate", MetricsAnalyzer.calculate_success_rate(
+                data.get('success_count', 0), data.get('error_count', 0)), "percent", labels)
+            document.add_distribution("workload.response_time", MetricsAnalyzer.calculate_latency_stats(
+                data.get('response_times')), "milliseconds", labels)
+
+        if metrics.get('open_loop'):
+            open_loop = metrics['open_loop']
+            labels = {"arrival": open_loop['arrival'], "profile": open_loop['profile']}
+            document.add("open_loop.achieved_rate", open_loop['achieved_rate'], "requests_per_second", labels)
+            document.add("open_loop.missed_slots", open_loop['missed_slots'], "requests", labels)
+        if metrics.get('saturation'):
+            document.add("saturation.rate", metrics['saturation']['saturation_rate'], "requests_per_second")
+
+        for section, label, name in (('sampling', 'mode', 'sampling'), ('remote_mcp', 'category', 'remote_mcp')):
+            for key, data in metrics.get(section, {}).items():
+                labels = {label: key}
+                if data.get('pacing'):
+                    document.add(f"{name}.throughput", data['pacing']['achieved_rate'], "requests_per_second", labels)
+                document.add(f"{name}.success_rate", MetricsAnalyzer.calculate_success_rate(
+                    data.get('success_count', 0), data.get('error_count', 0)), "percent", labels)
+                document.add_distribution(f"{name}.latency", MetricsAnalyzer.calculate_latency_stats(
+                    data.get('response_times')), "milliseconds", labels)
+
+        # 反復計測の指標（値は外れ値を除外した中央値、stats に平均と信頼区間を含める）
+        for scenario, trial in metrics.get('trials', {}).items():
+            if trial['iterations'] < 2:
+                continue
+            for name, summary in trial['metrics'].items():
+                if summary['median'] is None:
+                    continue
+                group, _, metric = name.rpartition('.')
+                labels = {"scenario": scenario}
+                if group:
+                    labels[TRIAL_GROUP_LABELS[scenario]] = group
+                document.add(f"trials.{metric}", summary['median'], TRIAL_UNITS[metric], labels, {
+                    "count": summary['count'],
+                    "rejected": len(summary['rejected']),
+                    "mean": summary['mean'],
+                    "mean_ci": summary['mean_ci'],
+                    "median_ci": summary['median_ci'],
+                    "stddev": summary['stddev']
+                })
+
+        document.add("tests.error_count", self.error_count, "count")
+        document.add("tests.warning_count", self.warning_count, "count")
+        return document
+
+    def _iter_combined_latency_lines(self, label: str, groups: Dict[str, Any]) -> Iterator[str]:
+        """グループごとのレイテンシー記録を結合した統計の行を生成"""
+        merged = MetricsAnalyzer.merge_latency([
+            data.get('response_times') for data in groups.values()
+            if isinstance(data.get('response_times'), LATENCY_RECORDERS)
+        ])
+        stats = MetricsAnalyzer.calculate_latency_stats(merged)
+        if stats:
+            yield f"\n### {label}:"
+            yield f"- 件数: {stats['count']}"
+            yield "- レイテンシー:"
+            yield f"  - P50: {stats['p50']:.3f} ms"
+            yield f"  - P95: {stats['p95']:.3f} ms"
+            yield f"  - P99: {stats['p99']:.3f} ms"
+            yield f"  - P99.9: {stats['p99.9']:.3f} ms"
 
-    print("パフォーマンステストを実行中...")
-    performance_metrics = await tester.test_performance()
+    def generate_report(self, metrics: Dict[str, Any]) -> str:
+        """レポートの生成"""
+        return "\n".join(self.iter_report_lines(metrics))
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(
+        prog="test_async_performance.py",
+        description="非同期処理・パフォーマンステストを実行します"
+    )
+    parser.add_argument("meta_dir", help="メタディレクトリのパス")
+    parser.add_argument("--sink", choices=SINK_TYPES, default="memory",
+                        help="テスト結果の出力先（memory / ndjson / stdout）")
+    parser.add_argument("--sink-path", default=None,
+                        help="ndjson出力先のファイルパス（既定: メタディレクトリの async_performance_results.ndjson）")
+    parser.add_argument("--latency-backend", choices=LATENCY_BACKENDS, default="histogram",
+                        help="レイテンシーの記録方式（histogram: HDRヒストグラム / tdigest: t-digestスケッチ / "
+                             "samples: 生のサンプル）")
+    parser.add_argument("--workload-backend", choices=WORKLOAD_BACKENDS, default=None,
+                        help="負荷対象（既定: contexts/performance_config.yaml の workload.backend）")
+    parser.add_argument("--workload-url", default=None,
+                        help="http_sse の接続先URL（既定: contexts/performance_config.yaml の workload.http_sse.url）")
+    parser.add_argument("--loop", choices=LOOP_MODES, default=None,
+                        help="イベントループの方式（default / uvloop / eager、既定: 環境変数 MCP_EVENT_LOOP）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="負荷を送信するワーカープロセス数（1: 単一プロセス / 0: CPU数）")
+    parser.add_argument("--load-mode", choices=("closed", "open"), default="closed",
+                        help="基本パフォーマンステストの負荷方式（closed: 同時実行数を維持 / open: 目標レートで送信）")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="開ループの目標レート（req/s、既定: 統一メトリクス定義のスループット閾値の1.2倍）")
+    parser.add_argument("--arrival", choices=ARRIVAL_PROCESSES, default="constant",
+                        help="開ループの到着過程（constant: 等間隔 / poisson: ポアソン到着）")
+    parser.add_argument("--load-profile", choices=LOAD_PROFILES, default="constant",
+                        help="開ループの負荷プロファイル（constant / ramp / step）")
+    parser.add_argument("--ramp-up", type=float, default=0.0,
+                        help="rampで目標レートに達するまでの秒数（既定: テスト時間の半分）")
+    parser.add_argument("--steps", type=int, default=4, help="stepの段階数")
+    parser.add_argument("--find-saturation", action="store_true",
+                        help="閾値を満たす飽和スループットを探索")
+    parser.add_argument("--saturation-max-rate", type=float, default=100000.0,
+                        help="飽和スループット探索の上限レート（req/s）")
+    parser.add_argument("--seed", type=int, default=None, help="ポアソン到着の乱数シード")
+    parser.add_argument("--profile", default=None,
+                        help="performance_config.yaml の profiles のシナリオのプロファイル（既定: default_profile）")
+    parser.add_argument("--iterations", type=int, default=None,
+                        help="各シナリオの計測の最大反復回数（既定: プロファイルの値または1）")
+    parser.add_argument("--warmup", type=int, default=None,
+                        help="計測前に実行して結果を捨てる反復回数（既定: プロファイルの値または0）")
+    parser.add_argument("--min-iterations", type=int, default=None,
+                        help="早期終了を判定する最小の反復回数（既定: プロファイルの値または3）")
+    parser.add_argument("--target-precision", type=float, default=None,
+                        help="早期終了する平均の信頼区間の半幅（平均に対する比率、0は早期終了しない）")
+    parser.add_argument("--confidence", type=float, default=0.95, help="信頼区間の信頼水準")
+    parser.add_argument("--outliers", choices=tuple(OUTLIER_METHODS), default="iqr",
+                        help="反復ごとの値の外れ値の除外方式")
+    parser.add_argument("--metrics-out", default=None,
+                        help="機械可読のメトリクス文書（JSON）の出力先")
+    parser.add_argument("--history", default=None,
+                        help=f"実行結果を追記する履歴データベース（既定: メタディレクトリの {HISTORY_FILENAME}）")
+    parser.add_argument("--no-history", action="store_true", help="実行結果を履歴データベースに記録しない")
+    parser.add_argument("--label", default=None,
+                        help="履歴データベースで実行を識別するラベル（run_tests.py --compare で基準に指定可能）")
+    return parser.parse_args(argv)
+
+async def main(args: argparse.Namespace):
+    meta_dir = args.meta_dir
+    sink = create_sink(args.sink, args.sink_path or os.path.join(meta_dir, "async_performance_results.ndjson"))
+    try:
+        tester = AsyncPerformanceTester(
+            meta_dir, sink, args.latency_backend, args.workload_backend, args.workload_url
+        )
+    except ValueError as e:
+        print(f"ワークロードの設定エラー: {str(e)}", file=sys.stderr)
+        sys.exit(2)
+
+    # 各シナリオをウォームアップの後に繰り返し計測（コマンドライン引数がプロファイルの設定より優先）
+    def trial_setting(name: str, default: Any) -> Any:
+        value = getattr(args, name)
+        return value if value is not None else profile.trials.get(name, default)
+
+    try:
+        profile = ScenarioProfile.from_config(tester.performance_config, args.profile)
+        harness = TrialHarness(
+            trial_setting('iterations', 1), trial_setting('warmup', 0), trial_setting('min_iterations', 3),
+            args.outliers, confidence=args.confidence, target_precision=trial_setting('target_precision', 0.0)
+        )
+    except ValueError as e:
+        print(f"シナリオの設定エラー: {str(e)}", file=sys.stderr)
+        sys.exit(2)
+
+    async def run_async_operations() -> bool:
+        settings = profile.settings('async_operations')
+        print("非同期処理テストを実行中...")
+        tester.transition_delay = settings['transition_delay']
+        return await tester.test_async_operations(settings['iterations'], settings['concurrency'])
+
+    async def run_performance() -> Dict[str, Any]:
+        settings = profile.settings('performance')
+        print(f"パフォーマンステストを実行中...（ワークロードバックエンド: {tester.workload.name}）")
+        await tester.start_workload()
+        try:
+            workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+            if workers > 1:
+                scenario = functools.partial(
+                    tester.test_distributed_performance,
+                    workers, args.load_mode, args.rate, settings['duration'], arrival=args.arrival,
+                    profile=args.load_profile, ramp_up=args.ramp_up, steps=args.steps, seed=args.seed
+                )
+            elif args.load_mode == "open":
+                scenario = functools.partial(
+                    tester.test_open_loop_performance,
+                    args.rate, settings['duration'], arrival=args.arrival, profile=args.load_profile,
+                    ramp_up=args.ramp_up, steps=args.steps, seed=args.seed
+                )
+            else:
+                scenario = functools.partial(tester.test_performance, settings['duration'], settings['concurrency'])
+            metrics, trials = await harness.run(scenario, tester.measure_performance, tester.warmup)
 
-    print("サンプリング機能のパフォーマンステストを実行中...")
-    sampling_metrics = await tester.test_sampling_performance()
+            if args.find_saturation:
+                print("飽和スループットを探索中...")
+                metrics["saturation"] = await tester.test_saturation(
+                    max_rate=args.saturation_max_rate, arrival=args.arrival, seed=args.seed
+                )
+        finally:
+            await tester.close_workload()
+        return {"metrics": metrics, "trials": trials}
+
+    async def run_sampling() -> Dict[str, Any]:
+        print("サンプリング機能のパフォーマンステストを実行中...")
+        metrics, trials = await harness.run(
+            functools.partial(tester.test_sampling_performance, profile.settings('sampling')['duration']),
+            tester.measure_groups,
+            tester.warmup
+        )
+        return {"metrics": metrics, "trials": trials}
+
+    async def run_remote_mcp() -> Dict[str, Any]:
+        print("リモートMCP接続のパフォーマンステストを実行中...")
+        metrics, trials = await harness.run(
+            functools.partial(tester.test_remote_mcp_performance, profile.settings('remote_mcp')['duration']),
+            tester.measure_groups,
+            tester.warmup
+        )
+        return {"metrics": metrics, "trials": trials}
 
-    print("リモートMCP接続のパフォーマンステストを実行中...")
-    remote_metrics = await tester.test_remote_mcp_performance()
+    # 使用する資源が重ならないシナリオは並行して実行
+    results = await profile.run({
+        "async_operations": run_async_operations,
+        "performance": run_performance,
+        "sampling": run_sampling,
+        "remote_mcp": run_remote_mcp
+    })
+    async_success = results["async_operations"]
 
     # メトリクスの結合
     combined_metrics = {
-        **performance_metrics,
-        "sampling": sampling_metrics,
-        "remote_mcp": remote_metrics
+        **results["performance"]["metrics"],
+        "event_loop": current_loop_mode(),
+        "timer": tester.timer.to_dict(),
+        "profile": profile.to_dict(),
+        "sampling": results["sampling"]["metrics"],
+        "remote_mcp": results["remote_mcp"]["metrics"],
+        "trials": {
+            scenario: results[scenario]["trials"] for scenario in ("performance", "sampling", "remote_mcp")
+        }
     }
 
-    # レポート生成
-    report = tester.generate_report(combined_metrics)
-    print(report)
-
-    # レポートをファイルに保存
+    # レポートを出力先から読み戻してファイルに保存
     report_path = os.path.join(meta_dir, "async_performance_report.md")
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    write_report(tester.iter_report_lines(combined_metrics), report_path)
+    sink.close()
+    document = tester.build_metrics_document(combined_metrics)
+    if args.metrics_out:
+        document.write(args.metrics_out)
+    if not args.no_history:
+        # 比較時に条件の違いを確認できるよう実行設定も記録
+        config = {
+            "latency_backend": tester.latency_backend,
+            "workload_backend": tester.workload.name,
+            "workers": args.workers,
+            "load_mode": args.load_mode,
+            "rate": args.rate,
+            "arrival": args.arrival,
+            "load_profile": args.load_profile,
+            "event_loop": combined_metrics["event_loop"],
+            "profile": profile.name,
+            "iterations": harness.iterations,
+            "warmup": harness.warmup,
+            "target_precision": harness.target_precision,
+            "pacing": tester.performance_config.get('pacing', {})
+        }
+        with ResultsStore(args.history or os.path.join(meta_dir, HISTORY_FILENAME)) as store:
+            run_id = store.record(document.to_dict(), config, meta_dir, args.label)
+        print(f"実行結果を履歴データベースに記録しました（実行ID: {run_id}）")
 
     sys.exit(0 if async_success and tester.error_count == 0 else 1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    run_event_loop(main(args), args.loop)
\ No newline at end of file
@@ -4,11 +4,22 @@ import sys
 import yaml
 import json
 import re
-from typing import Dict, List, Any, Optional, Set
+import argparse
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Set, Iterator, Iterable, Sequence, Tuple
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from validators.vulnerability_scanner import (
+    VulnerabilityScanner, Finding, STREAM_THRESHOLD, SCAN_EXTENSIONS, iter_scan_targets
+)
+from validators.result_sink import (
+    ResultSink, MemorySink, SINK_TYPES, RESULT_FILE_PATTERN, create_sink, write_report
+)
+from validators.metrics_document import MetricsDocument
 
 @dataclass
 class SecurityLevel:
@@ -17,8 +28,28 @@ class SecurityLevel:
     description: str
 
 class ErrorCodeRegistry:
-    """エラーコード管理クラス（MCPフレームワーク標準v1.2.0準拠）"""
-    def __init__(self):
+    """エラーコード管理クラス（MCPフレームワーク標準v1.2.0準拠）
+
+    サーバーエラー範囲（-32599〜-32000）をカテゴリごとのブロックに分割し、
+    使用状況をビットマップで管理する。各ブロックは未使用コードへのカーソルと
+    解放済みコードのフリーリストを持ち、割り当て・登録・解放はいずれも
+    償却O(1)で行う。ブロックを使い切った場合は overflow_policy に従い、
+    'hash' ではメッセージのCRC32からブロック内の既存コードを安定して再利用し、
+    'raise' では ValueError を送出する。
+    """
+    # カテゴリごとのコードブロック（最小値, 最大値）
+    category_blocks = {
+        'general': (-32599, -32500),
+        'config': (-32499, -32400),
+        'filesystem': (-32399, -32300),
+        'vulnerability': (-32299, -32000)
+    }
+    overflow_policies = ('hash', 'raise')
+
+    def __init__(self, overflow_policy: str = 'hash'):
+        if overflow_policy not in self.overflow_policies:
+            raise ValueError(f"未定義のオーバーフローポリシー: {overflow_policy}")
+        self.overflow_policy = overflow_policy
         self.standard_error_codes = {
             'parse_error': -32700,
             'invalid_request': -32600,
@@ -27,29 +58,107 @@ class ErrorCodeRegistry:
             'internal_error': -32603
         }
         self.server_error_code_range = {'minimum': -32599, 'maximum': -32000}
-        self.used_error_codes: Set[int] = set()
         self.error_code_mapping: Dict[int, str] = {}
+        self._used_standard_codes: Set[int] = set()
+        minimum = self.server_error_code_range['minimum']
+        self._bitmap = bytearray(self.server_error_code_range['maximum'] - minimum + 1)
+        self._cursors = {category: start - minimum for category, (start, _) in self.category_blocks.items()}
+        self._free_lists: Dict[str, List[int]] = {category: [] for category in self.category_blocks}
+
+    @property
+    def used_error_codes(self) -> Set[int]:
+        """使用済みのエラーコード"""
+        minimum = self.server_error_code_range['minimum']
+        return self._used_standard_codes | {
+            minimum + i for i, used in enumerate(self._bitmap) if used
+        }
 
     def is_valid_error_code(self, code: int) -> bool:
         """エラーコードの範囲検証"""
         return (code in self.standard_error_codes.values() or
                 self.server_error_code_range['minimum'] <= code <= self.server_error_code_range['maximum'])
 
+    def _category_of(self, code: int) -> str:
+        """サーバーエラーコードの属するカテゴリ"""
+        for category, (start, end) in self.category_blocks.items():
+            if start <= code <= end:
+                return category
+        raise ValueError(f"カテゴリに属さないエラーコード: {code}")
+
     def register_error_code(self, code: int, message: str) -> bool:
         """エラーコードの登録"""
-        if not self.is_valid_error_code(code) or code in self.used_error_codes:
+        if not self.is_valid_error_code(code):
             return False
-        self.used_error_codes.add(code)
+        if code in self.standard_error_codes.values():
+            if code in self._used_standard_codes:
+                return False
+            self._used_standard_codes.add(code)
+        else:
+            index = code - self.server_error_code_range['minimum']
+            if self._bitmap[index]:
+                return False
+            self._bitmap[index] = 1
         self.error_code_mapping[code] = message
         return True
 
-    def get_next_available_code(self) -> int:
-        """利用可能な次のエラーコードを取得"""
-        for code in range(self.server_error_code_range['minimum'], 
-                         self.server_error_code_range['maximum'] + 1):
-            if code not in self.used_error_codes:
+    def release_error_code(self, code: int) -> bool:
+        """エラーコードの解放（解放したコードは同じカテゴリで再利用）"""
+        minimum = self.server_error_code_range['minimum']
+        maximum = self.server_error_code_range['maximum']
+        if code in self.standard_error_codes.values():
+            if code not in self._used_standard_codes:
+                return False
+            self._used_standard_codes.discard(code)
+        else:
+            # ビットマップはサーバーエラーコードの範囲のみを扱う
+            if not minimum <= code <= maximum or not self._bitmap[code - minimum]:
+                return False
+            self._bitmap[code - minimum] = 0
+            self._free_lists[self._category_of(code)].append(code)
+        self.error_code_mapping.pop(code, None)
+        return True
+
+    def _find_free(self, category: str) -> Optional[int]:
+        """カテゴリ内の未使用コード（フリーリスト、カーソルの順に探索）"""
+        minimum = self.server_error_code_range['minimum']
+        free_list = self._free_lists[category]
+        while free_list:
+            code = free_list[-1]
+            if not self._bitmap[code - minimum]:
                 return code
-        raise ValueError("利用可能なエラーコードがありません")
+            # 解放後に直接登録されたコードは破棄
+            free_list.pop()
+        end = self.category_blocks[category][1] - minimum
+        cursor = self._cursors[category]
+        while cursor <= end and self._bitmap[cursor]:
+            cursor += 1
+        self._cursors[category] = cursor
+        return minimum + cursor if cursor <= end else None
+
+    def allocate_code(self, message: str, category: str = 'general') -> int:
+        """カテゴリ内の未使用コードを割り当てて登録"""
+        if category not in self.category_blocks:
+            raise ValueError(f"未定義のエラーコードカテゴリ: {category}")
+        code = self._find_free(category)
+        if code is not None:
+            free_list = self._free_lists[category]
+            if free_list and free_list[-1] == code:
+                free_list.pop()
+            self.register_error_code(code, message)
+            return code
+
+        if self.overflow_policy == 'raise':
+            raise ValueError(f"利用可能なエラーコードがありません: {category}")
+        # メッセージのハッシュによりブロック内のコードを安定して再利用
+        start, end = self.category_blocks[category]
+        return start + zlib.crc32(message.encode('utf-8')) % (end - start + 1)
+
+    def get_next_available_code(self, category: str = 'general') -> int:
+        """利用可能な次のエラーコードを取得（登録は行わない）"""
+        code = self._find_free(category)
+        if code is None:
+            raise ValueError("利用可能なエラーコードがありません")
+        return code
 
 class ConfigValidator(ABC):
     """設定検証の基底クラス"""
@@ -95,10 +204,23 @@ class OAuth2ConfigValidator(ConfigValidator):
 
 class SecurityTester:
     """セキュリティテストの実行クラス"""
-    def __init__(self, meta_dir: str):
+    def __init__(
+        self,
+        meta_dir: str,
+        sink: Optional[ResultSink] = None,
+        stream_threshold: int = STREAM_THRESHOLD,
+        jobs: int = 1,
+        extensions: Sequence[str] = SCAN_EXTENSIONS,
+        ignore: Sequence[str] = ()
+    ):
         self.meta_dir = meta_dir
-        self.results: List[Dict[str, Any]] = []
+        self.jobs = jobs
+        self.scan_extensions = tuple(extensions)
+        # 既定の出力先に書き込まれた前回の結果ファイルはスキャンしない
+        self.ignore_patterns = (RESULT_FILE_PATTERN,) + tuple(ignore)
+        self.sink = sink if sink is not None else MemorySink()
         self.error_count = 0
+        self.critical_error_count = 0
         self.warning_count = 0
         self.error_registry = ErrorCodeRegistry()
         
@@ -118,6 +240,22 @@ class SecurityTester:
             'hardcoded_credentials': r'(?i)(password|secret|key|token|credential)["\']:\s*["\'][^*\n]{3,}["\']',
         }
 
+        # 脆弱性パターンの事前フィルター（一致する文字列に必ず含まれるリテラル）
+        credential_keywords = ['password', 'secret', 'key', 'token', 'credential']
+        self.vulnerability_prefilters = {
+            'sql_injection': ['${'],
+            'command_injection': ['${'],
+            'path_traversal': ['../'],
+            'sensitive_data': credential_keywords,
+            'insecure_protocols': ['http://', 'ftp://'],
+            'hardcoded_credentials': credential_keywords,
+        }
+        self.scanner = VulnerabilityScanner(
+            self.vulnerability_patterns,
+            self.vulnerability_prefilters,
+            stream_threshold=stream_threshold
+        )
+
         # 設定検証クラスの初期化
         self.validators = {
             'authentication': AuthenticationConfigValidator(),
@@ -128,30 +266,53 @@ class SecurityTester:
         """設定の検証を実行"""
         validator = self.validators.get(validator_name)
         if not validator:
-            self.add_error(f"未定義の検証タイプ: {validator_name}")
+            self.add_error(f"未定義の検証タイプ: {validator_name}", category='config')
             return False
         return validator.validate(config)
 
     def scan_for_vulnerabilities(self, file_path: str) -> bool:
         """ファイル内の潜在的な脆弱性をスキャン"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            is_secure = True
-            for vuln_type, pattern in self.vulnerability_patterns.items():
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    line_num = content[:match.start()].count('\n') + 1
-                    self.add_error(
-                        f"潜在的な{vuln_type}脆弱性: {file_path}:{line_num} - {match.group()}"
-                    )
-                    is_secure = False
+        return self._report_scan(file_path, *_scan_file(self.scanner, file_path))
 
-            return is_secure
-        except Exception as e:
-            self.add_error(f"脆弱性スキャンエラー {file_path}: {str(e)}")
+    def _report_scan(self, file_path: str, findings: List[Finding], error: Optional[str]) -> bool:
+        """スキャン結果をエラーとして記録"""
+        if error is not None:
+            self.add_error(f"脆弱性スキャンエラー {file_path}: {error}", category='filesystem')
             return False
+        for finding in findings:
+            self.add_error(
+                f"潜在的な{finding.vuln_type}脆弱性: {file_path}:{finding.line} - {finding.text}",
+                category='vulnerability'
+            )
+        return not findings
+
+    def _scan_files(self, paths: Iterable[str]) -> Iterator[Tuple[str, List[Finding], Optional[str]]]:
+        """ファイルをスキャンし、入力と同じ順序で結果を返す
+
+        jobs が2以上の場合はプロセスプールで並列にスキャンする。実行中のスキャンは
+        jobs の4倍までに制限し、完了順にかかわらず入力順に結果を返すため、
+        エラーコードは常に同じ順序で割り当てられる。
+        """
+        if self.jobs <= 1:
+            for file_path in paths:
+                yield (file_path, *_scan_file(self.scanner, file_path))
+            return
+
+        max_in_flight = self.jobs * 4
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_scan_worker,
+            initargs=(self.scanner,)
+        ) as executor:
+            in_flight = deque()
+            for file_path in paths:
+                in_flight.append((file_path, executor.submit(_scan_in_worker, file_path)))
+                if len(in_flight) >= max_in_flight:
+                    done_path, future = in_flight.popleft()
+                    yield (done_path, *future.result())
+            while in_flight:
+                done_path, future = in_flight.popleft()
+                yield (done_path, *future.result())
 
     def test_file_permissions(self, file_path: str) -> bool:
         """ファイルのパーミッションをチェック"""
@@ -163,7 +324,7 @@ class SecurityTester:
             dacl = sd.GetSecurityDescriptorDacl()
 
             if dacl is None:
-                self.add_error(f"セキュリティリスク: NULLのDACL {file_path}", "critical")
+                self.add_error(f"セキュリティリスク: NULLのDACL {file_path}", "critical", category='filesystem')
                 return False
 
             everyone = win32security.ConvertStringSidToSid("S-1-1-0")
@@ -176,7 +337,8 @@ class SecurityTester:
                         if (ace[1] & con.FILE_GENERIC_WRITE) or (ace[1] & con.GENERIC_WRITE):
                             self.add_error(
                                 f"セキュリティリスク: 一般ユーザーに書き込み権限があります {file_path}",
-                                "non-critical"
+                                "non-critical",
+                                category='filesystem'
                             )
                             return False
                 except Exception as ace_error:
@@ -192,18 +354,22 @@ class SecurityTester:
             self.add_warning(f"パーミッションチェックをスキップ {file_path}: {str(e)}")
             return True
 
-    def add_error(self, message: str, severity: str = 'non-critical', error_code: Optional[int] = None):
+    def add_error(
+        self,
+        message: str,
+        severity: str = 'non-critical',
+        error_code: Optional[int] = None,
+        category: str = 'general'
+    ):
         """エラーの追加"""
         try:
             if severity not in self.severity_levels:
                 severity = 'non-critical'
 
-            if error_code is None:
-                error_code = self.error_registry.get_next_available_code()
-            elif not self.error_registry.register_error_code(error_code, message):
-                error_code = self.error_registry.get_next_available_code()
+            if error_code is None or not self.error_registry.register_error_code(error_code, message):
+                error_code = self.error_registry.allocate_code(message, category)
 
-            self.results.append({
+            self.sink.emit({
                 "level": "ERROR",
                 "severity": severity,
                 "error_code": error_code,
@@ -212,10 +378,12 @@ class SecurityTester:
                 "timestamp": datetime.now().isoformat()
             })
             self.error_count += 1
+            if severity == 'critical':
+                self.critical_error_count += 1
 
         except Exception as e:
             fallback_code = self.error_registry.standard_error_codes['internal_error']
-            self.results.append({
+            self.sink.emit({
                 "level": "ERROR",
                 "severity": "critical",
                 "error_code": fallback_code,
@@ -224,56 +392,51 @@ class SecurityTester:
                 "timestamp": datetime.now().isoformat()
             })
             self.error_count += 1
+            self.critical_error_count += 1
 
     def add_warning(self, message: str):
         """警告の追加"""
-        self.results.append({
+        self.sink.emit({
             "level": "WARNING",
             "message": message,
             "timestamp": datetime.now().isoformat()
         })
         self.warning_count += 1
 
-    def generate_report(self) -> str:
-        """セキュリティテストレポートの生成"""
-        report = []
-        report.append("# セキュリティテストレポート")
-        report.append(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    def iter_report_lines(self) -> Iterator[str]:
+        """セキュリティテストレポートを1行ずつ生成（結果は出力先から読み戻す）"""
+        yield "# セキュリティテストレポート"
+        yield f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         
         # テスト結果サマリー
-        report.append("\n## テスト結果サマリー:")
-        critical_errors = sum(1 for r in self.results 
-                            if r.get('level') == 'ERROR' and r.get('severity') == 'critical')
-        non_critical_errors = sum(1 for r in self.results 
-                                if r.get('level') == 'ERROR' and r.get('severity') == 'non-critical')
+        yield "\n## テスト結果サマリー:"
+        yield f"- クリティカルエラー数: {self.critical_error_count}"
+        yield f"- 非クリティカルエラー数: {self.error_count - self.critical_error_count}"
+        yield f"- 警告数: {self.warning_count}"
         
-        report.append(f"- クリティカルエラー数: {critical_errors}")
-        report.append(f"- 非クリティカルエラー数: {non_critical_errors}")
-        report.append(f"- 警告数: {self.warning_count}")
-        
-        if self.results:
-            report.append("\n## 詳細:")
-            for result in sorted(self.results,
-                               key=lambda x: (x.get('level') != 'ERROR',
-                                            x.get('severity') != 'critical',
-                                            x.get('timestamp', ''))):
+        if len(self.sink):
+            yield "\n## 詳細:"
+            for result in self.sink.iter_sorted(
+                    key=lambda x: (x.get('level') != 'ERROR',
+                                   x.get('severity') != 'critical',
+                                   x.get('timestamp', ''))):
                 if result['level'] == 'ERROR':
                     severity = result.get('severity', 'non-critical')
                     error_code = result.get('error_code', '')
                     response_time = result.get('response_time', 
                                             self.severity_levels[severity].response_time)
-                    report.append(
+                    yield (
                         f"- [{result['level']} - {severity.upper()}] "
                         f"(コード: {error_code}, 対応時間: {response_time}分) "
                         f"{result['message']}"
                     )
                 else:
-                    report.append(f"- [{result['level']}] {result['message']}")
+                    yield f"- [{result['level']}] {result['message']}"
         else:
-            report.append("\n問題は検出されませんでした。")
+            yield "\n問題は検出されませんでした。"
 
         # セキュリティ推奨事項
-        report.append("\n## セキュリティ推奨事項:")
+        yield "\n## セキュリティ推奨事項:"
         recommendations = [
             "すべての設定ファイルで適切なファイルパーミッションを設定",
             "機密情報は環境変数または暗号化された設定ファイルで管理",
@@ -287,9 +450,11 @@ class SecurityTester:
             "HTTPSを使用し、安全でない通信プロトコルを避ける"
         ]
         for i, rec in enumerate(recommendations, 1):
-            report.append(f"{i}. {rec}")
+            yield f"{i}. {rec}"
 
-        return "\n".join(report)
+    def generate_report(self) -> str:
+        """セキュリティテストレポートの生成"""
+        return "\n".join(self.iter_report_lines())
 
     def test_all(self) -> bool:
         """すべてのセキュリティテストを実行"""
@@ -322,7 +487,7 @@ class SecurityTester:
             with open(index_path, 'r', encoding='utf-8') as f:
                 return yaml.safe_load(f)
         except Exception as e:
-            self.add_error(f"設定ファイル読み込みエラー {index_path}: {str(e)}")
+            self.add_error(f"設定ファイル読み込みエラー {index_path}: {str(e)}", category='config')
             return None
 
     def _validate_all_configs(self, config: Dict[str, Any]) -> bool:
@@ -332,7 +497,7 @@ class SecurityTester:
         # グローバル設定の検証
         global_settings = config.get('global', {})
         if not global_settings:
-            self.add_error("グローバル設定が見つかりません", "critical")
+            self.add_error("グローバル設定が見つかりません", "critical", category='config')
             return False
 
         # 認証設定の検証
@@ -351,35 +516,87 @@ class SecurityTester:
     def _validate_filesystem(self) -> bool:
         """ファイルシステムの検証"""
         success = True
-        for root, _, files in os.walk(self.meta_dir):
-            for file in files:
-                if file.endswith(('.yaml', '.json')):
-                    file_path = os.path.join(root, file)
-                    if not self.test_file_permissions(file_path):
-                        success = False
-                    if not self.scan_for_vulnerabilities(file_path):
-                        success = False
+        paths = iter_scan_targets(self.meta_dir, self.scan_extensions, self.ignore_patterns)
+        # 結果の記録（エラーコードの割り当てを含む）はこのプロセスでのみ行う
+        for file_path, findings, error in self._scan_files(paths):
+            if not self.test_file_permissions(file_path):
+                success = False
+            if not self._report_scan(file_path, findings, error):
+                success = False
         return success
 
+_worker_scanner: Optional[VulnerabilityScanner] = None
+
+def _init_scan_worker(scanner: VulnerabilityScanner) -> None:
+    """ワーカープロセスの初期化"""
+    global _worker_scanner
+    _worker_scanner = scanner
+
+def _scan_in_worker(file_path: str) -> Tuple[List[Finding], Optional[str]]:
+    """ワーカープロセスでのスキャン"""
+    return _scan_file(_worker_scanner, file_path)
+
+def _scan_file(scanner: VulnerabilityScanner, file_path: str) -> Tuple[List[Finding], Optional[str]]:
+    """ファイルをスキャンし、検出結果とエラーメッセージを返す"""
+    try:
+        return scanner.scan_file(file_path), None
+    except Exception as e:
+        return [], str(e)
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(
+        prog="test_security.py",
+        description="セキュリティテストを実行します"
+    )
+    parser.add_argument("meta_dir", help="メタディレクトリのパス")
+    parser.add_argument("--sink", choices=SINK_TYPES, default="memory",
+                        help="テスト結果の出力先（memory / ndjson / stdout）")
+    parser.add_argument("--sink-path", default=None,
+                        help="ndjson出力先のファイルパス（既定: メタディレクトリの security_results.ndjson）")
+    parser.add_argument("--stream-threshold", type=int, default=STREAM_THRESHOLD // (1024 * 1024),
+                        help="このサイズ（MiB）を超えるファイルをチャンク単位でスキャン")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="脆弱性スキャンの並列プロセス数（0を指定するとCPU数）")
+    parser.add_argument("--extensions", default=",".join(SCAN_EXTENSIONS),
+                        help="スキャン対象の拡張子（カンマ区切り）")
+    parser.add_argument("--ignore", action="append", default=[],
+                        help="スキャン対象外とするファイル・ディレクトリのパターン（複数指定可）")
+    parser.add_argument("--metrics-out", default=None,
+                        help="機械可読のメトリクス文書（JSON）の出力先")
+    return parser.parse_args(argv)
+
 def main():
     """メイン実行関数"""
-    if len(sys.argv) != 2:
-        print("使用方法: python test_security.py <path_to_meta_dir>")
-        sys.exit(1)
-
-    meta_dir = sys.argv[1]
-    tester = SecurityTester(meta_dir)
+    args = parse_args(sys.argv[1:])
+
+    meta_dir = args.meta_dir
+    sink = create_sink(args.sink, args.sink_path or os.path.join(meta_dir, "security_results.ndjson"))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    extensions = [ext.strip() for ext in args.extensions.split(",") if ext.strip()]
+    tester = SecurityTester(
+        meta_dir,
+        sink,
+        args.stream_threshold * 1024 * 1024,
+        jobs,
+        extensions,
+        args.ignore
+    )
     success = tester.test_all()
     
-    report = tester.generate_report()
-    print(report)
-    
-    # レポートをファイルに保存
+    # レポートを出力先から読み戻してファイルに保存
     report_path = os.path.join(meta_dir, "security_report.md")
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    write_report(tester.iter_report_lines(), report_path)
+    sink.close()
+
+    if args.metrics_out:
+        document = MetricsDocument("test_security.py")
+        document.add("security.critical_error_count", tester.critical_error_count, "count")
+        document.add("security.error_count", tester.error_count, "count")
+        document.add("security.warning_count", tester.warning_count, "count")
+        document.write(args.metrics_out)
 
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
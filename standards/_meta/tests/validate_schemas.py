@@ -1,27 +1,52 @@
 #!/usr/bin/env python3
 import os
 import sys
-import yaml
+import argparse
+import hashlib
 from datetime import datetime
-from typing import Dict, List, Any
-from validators.base_validator import BaseValidator, ErrorSeverity
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Callable
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+import heapq
+from validators.base_validator import BaseValidator, ErrorSeverity, ResultBatch
+from validators.document_store import DocumentStore
+from validators.result_cache import ResultCache, CACHE_FILENAME
+from validators.result_sink import ResultSink, MemorySink, SINK_TYPES, create_sink, write_report
+from validators.metrics_document import MetricsDocument
 from validators.schema_validator import SchemaValidator
 from validators.context_validator import ContextValidator
+from validators.context_graph import ContextFacts
 from validators.directory_validator import DirectoryValidator
 
+SCHEMA = "schema"
+CONTEXT = "context"
+
 class ValidationManager:
-    def __init__(self, meta_dir: str):
+    def __init__(
+        self,
+        meta_dir: str,
+        cache: Optional[ResultCache] = None,
+        jobs: int = 1,
+        fail_fast: bool = False,
+        sink: Optional[ResultSink] = None
+    ):
         self.meta_dir = meta_dir
         self.schemas_dir = os.path.join(meta_dir, "schemas")
         self.contexts_dir = os.path.join(meta_dir, "contexts")
-        self.results: List[Dict[str, Any]] = []
+        self.sink = sink if sink is not None else MemorySink()
         self.error_count = 0
         self.warning_count = 0
+        self.cache = cache
+        self.jobs = jobs
+        self.fail_fast = fail_fast
+        self.worker_store_stats = {"hits": 0, "misses": 0}
+
+        # 全バリデーターで共有するドキュメントストア（各ファイルを1度だけ解析）
+        self.store = DocumentStore()
 
         # 各バリデーターのインスタンス化
-        self.directory_validator = DirectoryValidator(meta_dir)
-        self.schema_validator = SchemaValidator(meta_dir)
-        self.context_validator = ContextValidator(meta_dir)
+        self.directory_validator = DirectoryValidator(meta_dir, self.store)
+        self.schema_validator = SchemaValidator(meta_dir, self.store)
+        self.context_validator = ContextValidator(meta_dir, self.store)
 
     def validate_all(self) -> bool:
         """すべての検証を実行"""
@@ -34,92 +59,294 @@ class ValidationManager:
         self.directory_validator.validate_all_files()
         self._merge_results(self.directory_validator)
 
-        # スキーマファイルの検証
-        schema_files = [f for f in os.listdir(self.schemas_dir) if f.endswith('.yaml')]
-        for schema_file in schema_files:
-            file_path = os.path.join(self.schemas_dir, schema_file)
-            
-            # 基本的な検証
-            if not self.schema_validator.validate_file_encoding(file_path):
-                continue
-            if not self.schema_validator.validate_yaml_syntax(file_path):
-                continue
-
-            # ファイル内容の検証
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                
-            # 基本的な検証
-            self.schema_validator.validate_version(data, file_path)
-            self.schema_validator.validate_required_fields(data, ['version', 'type'], file_path)
-            self.schema_validator.validate_error_codes(data, file_path)
-            self.schema_validator.validate_schema_references(data, file_path)
-
-            # MCPプロトコル関連の検証
-            if data.get('type') in ['context_schema', 'process_schema']:
-                self.schema_validator.validate_transport(data, file_path)
-
-        self._merge_results(self.schema_validator)
-
-        # コンテキストファイルの検証
-        context_files = [f for f in os.listdir(self.contexts_dir) if f.endswith('.yaml')]
-        for context_file in context_files:
-            file_path = os.path.join(self.contexts_dir, context_file)
-            
-            # 基本的な検証
-            if not self.context_validator.validate_file_encoding(file_path):
-                continue
-            if not self.context_validator.validate_yaml_syntax(file_path):
-                continue
-
-            # ファイル内容の検証
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                
-            # 基本的な検証
-            self.context_validator.validate_version(data, file_path)
-            self.context_validator.validate_required_fields(
-                data,
-                ['version', 'type', 'required_fields'],
-                file_path
-            )
-            self.context_validator.validate_metrics(data, file_path)
-            self.context_validator.validate_error_severity(data, file_path)
+        # スキーマ・コンテキストファイルの検証（キャッシュ未ヒット分のみ実行）
+        schema_paths = [
+            os.path.join(self.schemas_dir, f)
+            for f in sorted(os.listdir(self.schemas_dir)) if f.endswith('.yaml')
+        ]
+        context_paths = [
+            os.path.join(self.contexts_dir, f)
+            for f in sorted(os.listdir(self.contexts_dir)) if f.endswith('.yaml')
+        ]
+
+        # 完了したファイルの結果をファイル順で逐次マージ（並列実行時も決定的な順序を保証）
+        merger = _OrderedMerger(schema_paths + context_paths, self._merge_file_results)
+        cached_results: Dict[str, ResultBatch] = {}
+        for file_path in schema_paths + context_paths:
+            cached = self._lookup_cache(file_path)
+            if cached is not None:
+                cached_results[file_path] = cached
+                merger.add(file_path, cached)
+
+        def record(file_path: str, deps: List[str], results: ResultBatch) -> None:
+            self._store_cache(file_path, deps, results)
+            merger.add(file_path, results)
 
-            # コンテキスト間の相互参照と依存関係の検証
-            self.context_validator.validate_context_references(data, file_path)
-            self.context_validator.validate_context_dependencies(data, file_path)
+        with _WorkerPool(self) as pool:
+            pending_schemas = [(SCHEMA, path) for path in schema_paths if path not in cached_results]
+            for file_path, deps, results in self._validate_schemas(pool, pending_schemas):
+                record(file_path, deps, results)
 
-            # MCPプロトコル関連の検証
-            if 'mcp_protocol' in data:
-                self.schema_validator.validate_transport(data, file_path)
-                self.context_validator.validate_sampling(data, file_path)
+            pending_contexts = [path for path in context_paths if path not in cached_results]
+            aborted = self._validate_contexts(pool, pending_contexts, cached_results, record)
 
-        self._merge_results(self.context_validator)
+        # 中断により未検証のファイルを除き、保持している結果をマージ
+        merger.finish()
+
+        if aborted:
+            broken, skipped = aborted
+            results = ResultBatch()
+            results.append(
+                "ERROR",
+                f"依存元コンテキストの検証に失敗したため検証を中断しました: {broken}.yaml "
+                f"(未検証: {skipped}件)",
+                ErrorSeverity.CRITICAL
+            )
+            self._merge_file_results(results)
+
+        if self.cache is not None:
+            self.cache.save()
 
         return self.error_count == 0
 
+    def validate_schema_file(self, file_path: str) -> List[str]:
+        """スキーマファイル1件の検証（依存ファイルの一覧を返す）"""
+        # 基本的な検証
+        if not self.schema_validator.validate_file_encoding(file_path):
+            return []
+        if not self.schema_validator.validate_yaml_syntax(file_path):
+            return []
+
+        # ファイル内容の検証
+        data = self.schema_validator.load_yaml(file_path)
+
+        # 基本的な検証
+        self.schema_validator.validate_version(data, file_path)
+        self.schema_validator.validate_required_fields(data, ['version', 'type'], file_path)
+        self.schema_validator.validate_error_codes(data, file_path)
+        self.schema_validator.validate_schema_references(data, file_path)
+
+        # MCPプロトコル関連の検証
+        if data.get('type') in ['context_schema', 'process_schema']:
+            self.schema_validator.validate_transport(data, file_path)
+
+        return self.schema_validator.dependency_paths(data)
+
+    def validate_context_file(
+        self,
+        file_path: str,
+        provided: Optional[Dict[str, ContextFacts]] = None
+    ) -> List[str]:
+        """コンテキストファイル1件の検証（依存ファイルの一覧を返す）"""
+        # 基本的な検証
+        if not self.context_validator.validate_file_encoding(file_path):
+            return []
+        if not self.context_validator.validate_yaml_syntax(file_path):
+            return []
+
+        # ファイル内容の検証
+        data = self.context_validator.load_yaml(file_path)
+
+        # 基本的な検証
+        self.context_validator.validate_version(data, file_path)
+        self.context_validator.validate_required_fields(
+            data,
+            ['version', 'type', 'required_fields'],
+            file_path
+        )
+        self.context_validator.validate_metrics(data, file_path)
+        self.context_validator.validate_error_severity(data, file_path)
+
+        # コンテキスト間の相互参照と依存関係の検証
+        self.context_validator.validate_context_references(data, file_path)
+        self.context_validator.validate_context_dependencies(data, file_path, provided)
+
+        # MCPプロトコル関連の検証
+        if 'mcp_protocol' in data:
+            self.schema_validator.validate_transport(data, file_path)
+            self.context_validator.validate_sampling(data, file_path)
+
+        return self.context_validator.dependency_paths(data)
+
+    def validate_task(
+        self,
+        kind: str,
+        file_path: str,
+        provided: Optional[Dict[str, ContextFacts]] = None
+    ) -> Tuple[List[str], ResultBatch]:
+        """ファイル1件を検証し、依存ファイルの一覧と検証結果を返す"""
+        if kind == SCHEMA:
+            deps = self.validate_schema_file(file_path)
+        else:
+            deps = self.validate_context_file(file_path, provided)
+        results = self.schema_validator.take_results()
+        results.extend(self.context_validator.take_results())
+        return deps, results
+
+    def validate_tasks(self, tasks: List[Tuple[str, str]]) -> List[Tuple[str, List[str], ResultBatch]]:
+        """複数ファイルの検証（ワーカープロセスでのシャード単位の実行用）"""
+        return [(file_path, *self.validate_task(kind, file_path)) for kind, file_path in tasks]
+
+    def collect_requirements(self, file_paths: List[str]) -> List[Tuple[str, List[str]]]:
+        """コンテキストファイルが依存するコンテキスト名の収集"""
+        requirements = []
+        for file_path in file_paths:
+            name = _context_name(file_path)
+            try:
+                requires = self.context_validator.graph.facts(name).requires
+            except Exception:
+                requires = []
+            requirements.append((name, requires))
+        return requirements
+
+    def validate_context_batch(
+        self,
+        items: List[Tuple[str, Dict[str, ContextFacts]]]
+    ) -> List[Tuple[str, List[str], ResultBatch, Optional[ContextFacts]]]:
+        """依存先の情報を受け取ってコンテキストファイルを検証し、自身の情報を返す"""
+        outcomes = []
+        for file_path, provided in items:
+            deps, results = self.validate_task(CONTEXT, file_path, provided)
+            try:
+                facts = self.context_validator.graph.facts(_context_name(file_path))
+            except Exception:
+                facts = None
+            outcomes.append((file_path, deps, results, facts))
+        return outcomes
+
+    def _validate_schemas(
+        self,
+        pool: '_WorkerPool',
+        tasks: List[Tuple[str, str]]
+    ) -> Iterator[Tuple[str, List[str], ResultBatch]]:
+        """スキーマファイルをシャードに分割して検証（シャードの完了ごとに結果を返す）"""
+        if not tasks:
+            return
+        shard_count = min(len(tasks), pool.jobs * 4)
+        shard_size = -(-len(tasks) // shard_count)
+        shards = [tasks[i:i + shard_size] for i in range(0, len(tasks), shard_size)]
+
+        # シャードの投入順に結果を受け取ることで順序を固定
+        for future in [pool.submit('validate_tasks', shard) for shard in shards]:
+            yield from pool.result(future)
+
+    def _validate_contexts(
+        self,
+        pool: '_WorkerPool',
+        file_paths: List[str],
+        cached_results: Dict[str, ResultBatch],
+        record: Callable[[str, List[str], ResultBatch], None]
+    ) -> Optional[Tuple[str, int]]:
+        """依存関係DAGの順序でコンテキストファイルを検証
+
+        依存先の検証が完了したファイルから順に投入し、独立した枝は並列に検証する。
+        各ファイルの結果は検証の完了時に record へ渡す。
+        fail_fast指定時は、依存されているコンテキストにエラーがあればその時点で中断し、
+        中断の原因となったコンテキスト名と未検証のファイル数を返す。
+        """
+        if not file_paths:
+            return None
+
+        paths = {_context_name(path): path for path in file_paths}
+        names = list(paths)
+        shard_size = -(-len(names) // min(len(names), pool.jobs * 4))
+        requirements: Dict[str, List[str]] = {}
+        for future in [
+            pool.submit('collect_requirements', file_paths[i:i + shard_size])
+            for i in range(0, len(file_paths), shard_size)
+        ]:
+            requirements.update(pool.result(future))
+
+        scheduler = DependencyScheduler(requirements)
+        if self.fail_fast:
+            # キャッシュ済みの依存先にエラーがある場合は検証前に中断
+            for name in sorted(requirements):
+                for dep in requirements[name]:
+                    dep_path = os.path.join(self.contexts_dir, f"{dep}.yaml")
+                    if dep not in paths and dep_path in cached_results and _has_errors(cached_results[dep_path]):
+                        return dep, len(names)
+
+        facts: Dict[str, ContextFacts] = {}
+        completed = 0
+        in_flight: Dict[Future, List[str]] = {}
+        aborted: Optional[str] = None
+        while True:
+            while aborted is None and len(in_flight) < pool.jobs * 2:
+                batch = scheduler.take_ready(max(1, min(32, scheduler.ready_count() // pool.jobs)))
+                if not batch and not in_flight:
+                    # 依存関係が循環している場合は名前順に1件ずつ解放
+                    batch = scheduler.break_cycle()
+                if not batch:
+                    break
+                items = [
+                    (paths[name], {dep: facts[dep] for dep in requirements[name] if dep in facts})
+                    for name in batch
+                ]
+                in_flight[pool.submit('validate_context_batch', items)] = batch
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.pop(future)
+                for file_path, deps, results, node_facts in pool.result(future):
+                    name = _context_name(file_path)
+                    record(file_path, deps, results)
+                    completed += 1
+                    if node_facts is not None:
+                        facts[name] = node_facts
+                    scheduler.complete(name)
+                    if self.fail_fast and aborted is None and _has_errors(results) and scheduler.dependents(name):
+                        aborted = name
+
+        if aborted is not None:
+            return aborted, len(names) - completed
+        return None
+
+    def _lookup_cache(self, file_path: str) -> Optional[ResultBatch]:
+        """キャッシュ済みの検証結果を取得"""
+        if self.cache is None:
+            return None
+        return self.cache.lookup(file_path, self.store.digest(file_path), self.store.digest)
+
+    def _store_cache(self, file_path: str, deps: List[str], results: ResultBatch) -> None:
+        """検証結果をキャッシュに記録"""
+        if self.cache is None:
+            return
+        self.cache.store(
+            file_path,
+            self.store.digest(file_path),
+            {dep: self.store.digest(dep) for dep in deps},
+            results
+        )
+
     def _merge_results(self, validator: BaseValidator):
         """バリデーターの結果をマージ"""
         for result in validator.results:
-            self.results.append(result.to_dict())
+            self.sink.emit(result)
         self.error_count += validator.error_count
         self.warning_count += validator.warning_count
 
-    def generate_report(self) -> str:
-        """検証レポートの生成"""
-        report = []
-        report.append("# スキーマ検証レポート")
-        report.append(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append(f"\n検証結果サマリー:")
-        report.append(f"- エラー数: {self.error_count}")
-        report.append(f"- 警告数: {self.warning_count}")
-        
-        if self.results:
-            report.append("\n## 詳細:")
+    def _merge_file_results(self, results: ResultBatch):
+        """ファイル単位の検証結果をマージ"""
+        for result in results:
+            self.sink.emit(result)
+        self.error_count += results.error_count
+        self.warning_count += results.warning_count
+
+    def iter_report_lines(self) -> Iterator[str]:
+        """検証レポートを1行ずつ生成（結果は出力先から読み戻す）"""
+        yield "# スキーマ検証レポート"
+        yield f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"\n検証結果サマリー:"
+        yield f"- エラー数: {self.error_count}"
+        yield f"- 警告数: {self.warning_count}"
+
+        if len(self.sink):
+            yield "\n## 詳細:"
             # 重要度でソート（criticalを先に）
-            sorted_results = sorted(
-                self.results,
+            sorted_results = self.sink.iter_sorted(
                 key=lambda x: (
                     0 if x.get('severity') == 'critical' else 1,
                     x.get('level', ''),
@@ -128,28 +355,209 @@ class ValidationManager:
             )
             for result in sorted_results:
                 severity = f"[{result['severity']}]" if 'severity' in result else ""
-                report.append(f"- [{result['level']}]{severity} {result['message']}")
+                yield f"- [{result['level']}]{severity} {result['message']}"
         else:
-            report.append("\n問題は検出されませんでした。")
+            yield "\n問題は検出されませんでした。"
+
+    def generate_report(self) -> str:
+        """検証レポートの生成"""
+        return "\n".join(self.iter_report_lines())
+
+class _OrderedMerger:
+    """ファイル単位の検証結果を所定のファイル順でマージ
+
+    検証が完了したファイルは、それより前のファイルがすべてマージ済みであれば直ちにマージし、
+    そうでなければ前のファイルの完了まで保持する。
+    """
+    def __init__(self, order: List[str], merge: Callable[[ResultBatch], None]):
+        self._order = order
+        self._merge = merge
+        self._next = 0
+        self._pending: Dict[str, ResultBatch] = {}
+
+    def add(self, file_path: str, results: ResultBatch) -> None:
+        """ファイルの結果を追加し、順番の来たファイルの結果をマージ"""
+        self._pending[file_path] = results
+        while self._next < len(self._order) and self._order[self._next] in self._pending:
+            self._merge(self._pending.pop(self._order[self._next]))
+            self._next += 1
+
+    def finish(self) -> None:
+        """結果の届かなかったファイルを飛ばし、保持している結果をファイル順にマージ"""
+        for file_path in self._order[self._next:]:
+            if file_path in self._pending:
+                self._merge(self._pending.pop(file_path))
+        self._next = len(self._order)
+
+class DependencyScheduler:
+    """コンテキスト依存関係DAGに基づく検証順序の管理"""
+    def __init__(self, requirements: Dict[str, List[str]]):
+        self._waiting: Dict[str, set] = {}
+        self._dependents: Dict[str, List[str]] = {name: [] for name in requirements}
+        for name, requires in requirements.items():
+            waiting = {dep for dep in requires if dep in requirements and dep != name}
+            self._waiting[name] = waiting
+            for dep in sorted(waiting):
+                self._dependents[dep].append(name)
+        self._ready = [name for name, waiting in self._waiting.items() if not waiting]
+        heapq.heapify(self._ready)
+        self._released = set(self._ready)
+        self._completed = set()
+
+    def ready_count(self) -> int:
+        """検証可能なファイル数"""
+        return len(self._ready)
+
+    def take_ready(self, limit: int) -> List[str]:
+        """依存先の検証が完了したファイルを名前順に取り出す"""
+        batch = []
+        while self._ready and len(batch) < limit:
+            batch.append(heapq.heappop(self._ready))
+        return batch
+
+    def break_cycle(self) -> List[str]:
+        """循環依存で停止した場合に未解放のファイルを1件解放"""
+        remaining = sorted(name for name in self._waiting if name not in self._released)
+        if not remaining:
+            return []
+        self._released.add(remaining[0])
+        return [remaining[0]]
 
-        return "\n".join(report)
+    def complete(self, name: str) -> None:
+        """検証完了を記録し、待機中の依存元を解放"""
+        self._completed.add(name)
+        for dependent in self._dependents.get(name, []):
+            waiting = self._waiting[dependent]
+            waiting.discard(name)
+            if not waiting and dependent not in self._released:
+                self._released.add(dependent)
+                heapq.heappush(self._ready, dependent)
+
+    def dependents(self, name: str) -> List[str]:
+        """nameに依存しているファイル"""
+        return self._dependents.get(name, [])
+
+class _WorkerPool:
+    """ValidationManagerのメソッドをワーカープロセス（jobs=1ではインライン）で実行"""
+    def __init__(self, manager: 'ValidationManager'):
+        self.manager = manager
+        self.jobs = max(1, manager.jobs)
+        self._executor = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+
+    def submit(self, method: str, arg: Any) -> Future:
+        """メソッド呼び出しを投入"""
+        if self._executor is not None:
+            return self._executor.submit(_run_in_worker, self.manager.meta_dir, method, arg)
+        future: Future = Future()
+        try:
+            future.set_result((getattr(self.manager, method)(arg), None))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def result(self, future: Future) -> Any:
+        """結果を取得し、ワーカーのドキュメントストア統計を集計"""
+        value, stats = future.result()
+        if stats is not None:
+            self.manager.worker_store_stats['hits'] += stats['hits']
+            self.manager.worker_store_stats['misses'] += stats['misses']
+        return value
+
+    def __enter__(self) -> '_WorkerPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+_worker_managers: Dict[str, ValidationManager] = {}
+
+def _run_in_worker(meta_dir: str, method: str, arg: Any) -> Tuple[Any, Dict[str, int]]:
+    """ワーカープロセスでの実行（プロセス内でドキュメントストアを再利用）"""
+    manager = _worker_managers.get(meta_dir)
+    if manager is None:
+        manager = _worker_managers[meta_dir] = ValidationManager(meta_dir)
+    before = manager.store.stats()
+    value = getattr(manager, method)(arg)
+    after = manager.store.stats()
+    return value, {key: after[key] - before[key] for key in ('hits', 'misses')}
+
+def _context_name(file_path: str) -> str:
+    """コンテキストファイルのパスからコンテキスト名を取得"""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def _has_errors(results: ResultBatch) -> bool:
+    """検証結果にエラーが含まれるかを判定"""
+    return results.error_count > 0
+
+def validator_fingerprint() -> str:
+    """検証ロジックのフィンガープリント（コード変更時にキャッシュを無効化）"""
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    validators_dir = os.path.join(tests_dir, "validators")
+    sources = [os.path.abspath(__file__)] + sorted(
+        os.path.join(validators_dir, f) for f in os.listdir(validators_dir) if f.endswith('.py')
+    )
+    digest = hashlib.sha256()
+    for source in sources:
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(
+        description="スキーマ・コンテキスト定義の検証",
+        usage="python validate_schemas.py <path_to_meta_dir> [options]"
+    )
+    parser.add_argument("meta_dir", help="メタディレクトリのパス")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="検証キャッシュを使用せずにすべてのファイルを再検証する")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"検証キャッシュ（{CACHE_FILENAME}）の保存先（既定: メタディレクトリ）")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="並列実行するワーカープロセス数（0でCPU数）")
+    parser.add_argument("--sink", choices=SINK_TYPES, default="memory",
+                        help="検証結果の出力先（memory / ndjson / stdout）")
+    parser.add_argument("--sink-path", default=None,
+                        help="ndjson出力先のファイルパス（既定: メタディレクトリの validation_results.ndjson）")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="依存されているコンテキストの検証に失敗した時点で中断する")
+    parser.add_argument("--metrics-out", default=None,
+                        help="機械可読のメトリクス文書（JSON）の出力先")
+    return parser.parse_args(argv)
 
 def main():
-    if len(sys.argv) != 2:
-        print("使用方法: python validate_schemas.py <path_to_meta_dir>")
-        sys.exit(1)
+    args = parse_args(sys.argv[1:])
 
-    meta_dir = sys.argv[1]
-    validator = ValidationManager(meta_dir)
+    meta_dir = args.meta_dir
+    cache = None
+    if not args.no_cache:
+        cache_path = os.path.join(args.cache_dir or meta_dir, CACHE_FILENAME)
+        cache = ResultCache(cache_path, validator_fingerprint())
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    sink = create_sink(args.sink, args.sink_path or os.path.join(meta_dir, "validation_results.ndjson"))
+    validator = ValidationManager(meta_dir, cache, jobs, args.fail_fast, sink)
     success = validator.validate_all()
-    
-    report = validator.generate_report()
-    print(report)
-    
-    # レポートをファイルに保存
+
+    # レポートを出力先から読み戻してファイルに保存
     report_path = os.path.join(meta_dir, "validation_report.md")
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    write_report(validator.iter_report_lines(), report_path)
+    sink.close()
+
+    stats = validator.store.stats()
+    hits = stats['hits'] + validator.worker_store_stats['hits']
+    misses = stats['misses'] + validator.worker_store_stats['misses']
+    print(f"\nドキュメントキャッシュ: ヒット {hits} / ミス {misses}")
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"検証キャッシュ: 再利用 {cache_stats['reused']} / 再検証 {cache_stats['revalidated']}")
+
+    if args.metrics_out:
+        document = MetricsDocument("validate_schemas.py")
+        document.add("validation.error_count", validator.error_count, "count")
+        document.add("validation.warning_count", validator.warning_count, "count")
+        document.write(args.metrics_out)
 
     sys.exit(0 if success else 1)
 
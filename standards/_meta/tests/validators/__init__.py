@@ -22,20 +22,70 @@ MCPフレームワーク標準v1.2.0準拠のバリデーターモジュール
    - メトリクスの検証
    - サンプリング機能の検証
 
+4. ドキュメントストア
+   - 各ファイルを実行単位で1度だけ読み込み・解析
+   - パス・mtime・サイズ・ハッシュによるキャッシュ
+   - ヒット・ミス数の集計
+
+5. コンテキスト参照グラフ
+   - context_references による参照グラフを1度だけ構築
+   - Tarjan法による強連結成分・循環参照の検出（O(V+E)）
+   - 参照元・推移閉包・位相順序の問い合わせ
+
+6. 結果の出力先
+   - メモリ・NDJSONファイル・標準出力への逐次書き込み
+   - 外部マージソートによる整列済みの読み戻し
+
+7. 脆弱性スキャナー
+   - 事前コンパイル済みの脆弱性パターン
+   - リテラルによる事前フィルター（1回の走査で適用パターンを絞り込み）
+   - 改行位置の索引と二分探索による行番号の算出
+
+8. メトリクス文書
+   - report_formatに従った機械可読のメトリクス（名前・値・単位・ラベル・統計値）
+   - バージョン付きのJSON文書の出力と読み込み
+
+9. 閾値判定
+   - unified_metrics.yaml の base_metrics を判定器に変換（gauge・histogram・rate）
+   - critical・non_critical・warning の各レベルの判定と単位の換算
+   - メトリクスごとの判定結果（threshold_level）
+
 各バリデーターは、MCPフレームワーク標準v1.2.0に準拠した検証を実施し、
 重要度に応じたエラーと警告を生成します。
 """
 
-from .base_validator import BaseValidator, ErrorSeverity, ValidationResult
+from .base_validator import BaseValidator, ErrorSeverity, ValidationResult, ResultBatch
+from .document_store import Document, DocumentStore
+from .context_graph import ContextGraph, ContextFacts
 from .schema_validator import SchemaValidator
 from .context_validator import ContextValidator
 from .directory_validator import DirectoryValidator
+from .result_sink import ResultSink, MemorySink, NDJSONFileSink, StdoutSink, create_sink
+from .vulnerability_scanner import VulnerabilityScanner, Finding
+from .metrics_document import MetricsDocument, MetricsDocumentError
+from .thresholds import ThresholdEngine, MetricThreshold
 
 __all__ = [
     'BaseValidator',
     'ErrorSeverity',
     'ValidationResult',
+    'ResultBatch',
+    'Document',
+    'DocumentStore',
+    'ContextGraph',
+    'ContextFacts',
     'SchemaValidator',
     'ContextValidator',
-    'DirectoryValidator'
+    'DirectoryValidator',
+    'ResultSink',
+    'MemorySink',
+    'NDJSONFileSink',
+    'StdoutSink',
+    'create_sink',
+    'VulnerabilityScanner',
+    'Finding',
+    'MetricsDocument',
+    'MetricsDocumentError',
+    'ThresholdEngine',
+    'MetricThreshold'
 ]
\ No newline at end of file
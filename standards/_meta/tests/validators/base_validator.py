@@ -1,19 +1,59 @@
 #!/usr/bin/env python3
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+from array import array
 from enum import Enum
 import os
-import yaml
+import sys
+from .document_store import DocumentStore
 
 class ErrorSeverity(Enum):
     CRITICAL = "critical"
     NON_CRITICAL = "non-critical"
 
+# 重要度ごとの対応時間（分）
+RESPONSE_TIMES = {
+    ErrorSeverity.CRITICAL: 15,
+    ErrorSeverity.NON_CRITICAL: 60
+}
+
+# 列指向バッチで使用するレベル・重要度の整数コード
+LEVELS = ("ERROR", "WARNING")
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+SEVERITIES = tuple(ErrorSeverity)
+SEVERITY_CODES = {severity: code for code, severity in enumerate(SEVERITIES)}
+
 class ValidationResult:
+    """検証結果（不変・__slots__によりインスタンス辞書を持たない）"""
+    __slots__ = ('level', 'message', 'severity')
+
     def __init__(self, level: str, message: str, severity: ErrorSeverity = ErrorSeverity.NON_CRITICAL):
-        self.level = level
-        self.message = message
-        self.severity = severity
-        self.response_time = 15 if severity == ErrorSeverity.CRITICAL else 60
+        object.__setattr__(self, 'level', sys.intern(level))
+        object.__setattr__(self, 'message', message)
+        object.__setattr__(self, 'severity', severity)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"ValidationResult は変更できません: {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"ValidationResult は変更できません: {name}")
+
+    def __reduce__(self):
+        return (ValidationResult, (self.level, self.message, self.severity))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ValidationResult):
+            return NotImplemented
+        return (self.level, self.message, self.severity) == (other.level, other.message, other.severity)
+
+    def __hash__(self) -> int:
+        return hash((self.level, self.message, self.severity))
+
+    def __repr__(self) -> str:
+        return f"ValidationResult({self.level!r}, {self.message!r}, {self.severity})"
+
+    @property
+    def response_time(self) -> int:
+        return RESPONSE_TIMES[self.severity]
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -23,74 +63,148 @@ class ValidationResult:
             "response_time": self.response_time
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ValidationResult':
+        """辞書形式からの復元"""
+        return cls(data['level'], data['message'], ErrorSeverity(data['severity']))
+
+class ResultBatch:
+    """列指向の検証結果バッチ
+
+    レベル・重要度は小さな整数の配列、メッセージは文字列表への索引として保持し、
+    結果1件ごとのオブジェクト生成を避ける。ValidationResult・辞書への変換は
+    読み出し時にのみ行う。
+    """
+    __slots__ = ('_levels', '_severities', '_messages', '_strings', '_string_index')
+
+    def __init__(self, results: Iterable[ValidationResult] = ()):
+        self._levels = array('B')
+        self._severities = array('B')
+        self._messages = array('I')
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        for result in results:
+            self.append(result.level, result.message, result.severity)
+
+    def _intern_message(self, message: str) -> int:
+        index = self._string_index.get(message)
+        if index is None:
+            index = len(self._strings)
+            self._strings.append(message)
+            self._string_index[message] = index
+        return index
+
+    def append(self, level: str, message: str, severity: ErrorSeverity = ErrorSeverity.NON_CRITICAL) -> None:
+        """結果を1件追加"""
+        self._levels.append(LEVEL_CODES[level])
+        self._severities.append(SEVERITY_CODES[severity])
+        self._messages.append(self._intern_message(message))
+
+    def extend(self, other: 'ResultBatch') -> None:
+        """別のバッチの結果を末尾に追加"""
+        self._levels.extend(other._levels)
+        self._severities.extend(other._severities)
+        self._messages.extend(self._intern_message(other._strings[i]) for i in other._messages)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def __iter__(self) -> Iterator[ValidationResult]:
+        for level, severity, message in zip(self._levels, self._severities, self._messages):
+            yield ValidationResult(LEVELS[level], self._strings[message], SEVERITIES[severity])
+
+    def __reduce__(self):
+        return (_restore_batch, (self._levels, self._severities, self._messages, self._strings))
+
+    @property
+    def error_count(self) -> int:
+        return self._levels.count(LEVEL_CODES["ERROR"])
+
+    @property
+    def warning_count(self) -> int:
+        return self._levels.count(LEVEL_CODES["WARNING"])
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """辞書形式のリストへ変換（レポート・キャッシュ出力時のみ使用）"""
+        return [result.to_dict() for result in self]
+
+    @classmethod
+    def from_dicts(cls, data: Iterable[Dict[str, Any]]) -> 'ResultBatch':
+        """辞書形式のリストから復元"""
+        batch = cls()
+        for result in data:
+            batch.append(result['level'], result['message'], ErrorSeverity(result['severity']))
+        return batch
+
+def _restore_batch(levels: array, severities: array, messages: array, strings: List[str]) -> ResultBatch:
+    """pickleからのバッチ復元"""
+    batch = ResultBatch()
+    batch._levels = levels
+    batch._severities = severities
+    batch._messages = messages
+    batch._strings = strings
+    batch._string_index = {message: i for i, message in enumerate(strings)}
+    return batch
+
 class BaseValidator:
-    def __init__(self, meta_dir: str):
+    def __init__(self, meta_dir: str, store: Optional[DocumentStore] = None):
         self.meta_dir = meta_dir
-        self.results: List[ValidationResult] = []
+        self.store = store if store is not None else DocumentStore()
+        self.results = ResultBatch()
         self.error_count = 0
         self.warning_count = 0
 
     def add_error(self, message: str, severity: ErrorSeverity = ErrorSeverity.NON_CRITICAL):
         """エラーの追加（MCPフレームワーク標準v1.2.0準拠）"""
-        result = ValidationResult("ERROR", message, severity)
-        self.results.append(result)
+        self.results.append("ERROR", message, severity)
         self.error_count += 1
 
     def add_warning(self, message: str):
         """警告の追加"""
-        result = ValidationResult("WARNING", message)
-        self.results.append(result)
+        self.results.append("WARNING", message)
         self.warning_count += 1
 
+    def take_results(self) -> ResultBatch:
+        """蓄積した結果を取り出してリセット"""
+        results = self.results
+        self.results = ResultBatch()
+        self.error_count = 0
+        self.warning_count = 0
+        return results
+
     def validate_file_encoding(self, file_path: str) -> bool:
         """ファイルエンコーディングの検証"""
-        try:
-            # まずUTF-8で試す
-            with open(file_path, 'r', encoding='utf-8') as f:
-                f.read()
-            return True
-        except UnicodeDecodeError:
-            try:
-                # UTF-8-SIGで試す
-                with open(file_path, 'r', encoding='utf-8-sig') as f:
-                    content = f.read()
-                # UTF-8に変換して書き直す
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                return True
-            except UnicodeDecodeError:
-                self.add_error(
-                    f"ファイルエンコーディングエラー in {os.path.basename(file_path)}: "
-                    "UTF-8またはUTF-8-SIGである必要があります",
-                    ErrorSeverity.CRITICAL
-                )
-                return False
+        document = self.store.get(file_path)
+        if document.encoding_error is not None:
+            self.add_error(
+                f"ファイルエンコーディングエラー in {os.path.basename(file_path)}: "
+                "UTF-8またはUTF-8-SIGである必要があります",
+                ErrorSeverity.CRITICAL
+            )
+            return False
+        return True
 
     def validate_yaml_syntax(self, file_path: str) -> bool:
         """YAML構文の検証"""
-        try:
-            # まずUTF-8で試す
-            with open(file_path, 'r', encoding='utf-8') as f:
-                yaml.safe_load(f)
-            return True
-        except yaml.YAMLError as e:
+        document = self.store.get(file_path)
+        if document.encoding_error is not None:
             self.add_error(
-                f"YAML構文エラー in {os.path.basename(file_path)}: {str(e)}",
+                f"YAML構文またはエンコーディングエラー in {os.path.basename(file_path)}: "
+                f"{str(document.encoding_error)}",
                 ErrorSeverity.CRITICAL
             )
             return False
-        except UnicodeDecodeError:
-            try:
-                # UTF-8-SIGで試す
-                with open(file_path, 'r', encoding='utf-8-sig') as f:
-                    yaml.safe_load(f)
-                return True
-            except (yaml.YAMLError, UnicodeDecodeError) as e:
-                self.add_error(
-                    f"YAML構文またはエンコーディングエラー in {os.path.basename(file_path)}: {str(e)}",
-                    ErrorSeverity.CRITICAL
-                )
-                return False
+        if document.yaml_error is not None:
+            self.add_error(
+                f"YAML構文エラー in {os.path.basename(file_path)}: {str(document.yaml_error)}",
+                ErrorSeverity.CRITICAL
+            )
+            return False
+        return True
+
+    def load_yaml(self, file_path: str) -> Any:
+        """ドキュメントストア経由で解析済みデータを取得"""
+        return self.store.get(file_path).load()
 
     def validate_required_fields(self, data: Dict[str, Any], required_fields: List[str], file_path: str) -> bool:
         """必須フィールドの検証"""
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Set, NamedTuple
+from collections import deque
+import os
+from .document_store import DocumentStore
+
+class ContextFacts(NamedTuple):
+    """依存先として参照されるコンテキストの情報（ワーカー間で受け渡し可能）"""
+    version: Optional[str]
+    features: List[str]
+    requires: List[str]
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'ContextFacts':
+        """解析済みデータから依存関係の情報を抽出（マッピング以外の文書は空の情報）"""
+        if not isinstance(data, dict):
+            return cls(version=None, features=[], requires=[])
+        deps = data.get('dependencies', {})
+        requires: List[str] = []
+        for key in ('required_versions', 'required_features'):
+            for ctx in deps.get(key, {}):
+                if ctx not in requires:
+                    requires.append(ctx)
+        return cls(
+            version=data.get('version'),
+            features=list(data.get('features', {})),
+            requires=requires
+        )
+
+class ContextGraph:
+    """contexts/ 配下のコンテキスト参照グラフ
+
+    ノードはコンテキスト名（拡張子なしのファイル名）、エッジは
+    context_references による参照。各ノードは1度だけ展開され、強連結成分は
+    Tarjan法によりO(V+E)で求める。検証対象から到達可能な部分のみを
+    必要に応じて展開し、全体を対象とするクエリでは全ノードを展開する。
+    """
+    def __init__(self, contexts_dir: str, store: DocumentStore):
+        self.contexts_dir = contexts_dir
+        self.store = store
+        self._references: Dict[str, List[str]] = {}
+        self._exists: Dict[str, bool] = {}
+        self._reverse: Optional[Dict[str, List[str]]] = None
+        self.load_errors: Dict[str, Exception] = {}
+        self._component_of: Dict[str, int] = {}
+        self._components: List[List[str]] = []
+        self._complete = False
+
+    def path_of(self, name: str) -> str:
+        """コンテキスト名からファイルパスを取得"""
+        return os.path.join(self.contexts_dir, f"{name}.yaml")
+
+    def exists(self, name: str) -> bool:
+        """コンテキストファイルの存在確認"""
+        if name not in self._exists:
+            self._exists[name] = os.path.isfile(self.path_of(name))
+        return self._exists[name]
+
+    def references(self, name: str) -> List[str]:
+        """直接参照しているコンテキスト名（存在しない参照を含む）"""
+        if name not in self._references:
+            refs: List[str] = []
+            if self.exists(name):
+                document = self.store.get(self.path_of(name))
+                if document.error is not None:
+                    self.load_errors[name] = document.error
+                elif isinstance(document.data, dict):
+                    for ref in document.data.get('context_references', []) or []:
+                        if ref not in refs:
+                            refs.append(ref)
+            self._references[name] = refs
+        return self._references[name]
+
+    def facts(self, name: str) -> ContextFacts:
+        """依存先としての情報（読み込みエラー時は例外を送出）"""
+        return ContextFacts.from_data(self.store.get(self.path_of(name)).load())
+
+    def _successors(self, name: str) -> List[str]:
+        """グラフ上の後続ノード（存在するコンテキストのみ）"""
+        return [ref for ref in self.references(name) if self.exists(ref)]
+
+    def _assign_components(self, root: str) -> None:
+        """rootから到達可能な未処理ノードの強連結成分を求める（反復版Tarjan法）"""
+        if root in self._component_of or not self.exists(root):
+            return
+
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        work = [(root, iter(self._successors(root)))]
+        index[root] = lowlink[root] = 0
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for succ in successors:
+                if succ in self._component_of:
+                    continue
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(self._successors(succ))))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    self._component_of[member] = len(self._components)
+                    component.append(member)
+                    if member == node:
+                        break
+                self._components.append(sorted(component))
+
+    def _ensure_complete(self) -> None:
+        """contexts/ 配下の全ノードを展開"""
+        if self._complete:
+            return
+        if os.path.isdir(self.contexts_dir):
+            for file_name in sorted(os.listdir(self.contexts_dir)):
+                if file_name.endswith('.yaml'):
+                    self._assign_components(file_name[:-len('.yaml')])
+        self._complete = True
+
+    def nodes(self) -> List[str]:
+        """全コンテキスト名"""
+        self._ensure_complete()
+        return sorted(self._component_of)
+
+    def component(self, name: str) -> List[str]:
+        """nameを含む強連結成分"""
+        self._assign_components(name)
+        if name not in self._component_of:
+            return []
+        return self._components[self._component_of[name]]
+
+    def is_cyclic(self, name: str) -> bool:
+        """nameが循環参照に含まれるかを判定"""
+        component = self.component(name)
+        return len(component) > 1 or name in self._successors(name)
+
+    def cycle_at(self, name: str) -> Optional[List[str]]:
+        """nameを代表（成分内の最小名）とする循環参照の経路
+
+        同じ循環を成分の全ノードから重複報告しないよう、代表ノードに対してのみ
+        最短の閉路（始点と終点が同じノード列）を返す。
+        """
+        if not self.is_cyclic(name) or self.component(name)[0] != name:
+            return None
+
+        members = set(self.component(name))
+        parents: Dict[str, str] = {}
+        queue = deque([name])
+        while queue:
+            node = queue.popleft()
+            for succ in self._successors(node):
+                if succ == name:
+                    path = [node]
+                    while path[-1] != name:
+                        path.append(parents[path[-1]])
+                    return path[::-1] + [name]
+                if succ in members and succ not in parents:
+                    parents[succ] = node
+                    queue.append(succ)
+        return None
+
+    def cycles(self) -> List[List[str]]:
+        """グラフ全体の循環参照の経路（成分ごとに1件）"""
+        self._ensure_complete()
+        cycles = []
+        for component in self._components:
+            cycle = self.cycle_at(component[0])
+            if cycle:
+                cycles.append(cycle)
+        return sorted(cycles)
+
+    def missing_references(self, name: str) -> List[str]:
+        """存在しないコンテキストへの参照"""
+        return [ref for ref in self.references(name) if not self.exists(ref)]
+
+    def transitive_closure(self, name: str) -> List[str]:
+        """nameから推移的に参照されるコンテキスト名（存在しない参照を含む）"""
+        seen: Set[str] = set()
+        queue = deque(self.references(name))
+        while queue:
+            ref = queue.popleft()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            if self.exists(ref):
+                queue.extend(self.references(ref))
+        return sorted(seen)
+
+    def _reverse_index(self) -> Dict[str, List[str]]:
+        """参照先から参照元への逆引きインデックス"""
+        if self._reverse is None:
+            reverse: Dict[str, List[str]] = {}
+            for node in self.nodes():
+                for ref in self.references(node):
+                    reverse.setdefault(ref, []).append(node)
+            self._reverse = reverse
+        return self._reverse
+
+    def dependents(self, name: str) -> List[str]:
+        """nameを直接参照しているコンテキスト名"""
+        return list(self._reverse_index().get(name, []))
+
+    def transitive_dependents(self, name: str) -> List[str]:
+        """nameを推移的に参照しているコンテキスト名"""
+        reverse = self._reverse_index()
+        seen: Set[str] = set()
+        queue = deque(reverse.get(name, []))
+        while queue:
+            node = queue.popleft()
+            if node in seen:
+                continue
+            seen.add(node)
+            queue.extend(reverse.get(node, []))
+        return sorted(seen)
+
+    def topological_order(self) -> List[str]:
+        """参照先が参照元より先に並ぶ順序（循環部分は成分単位で名前順）"""
+        self._ensure_complete()
+        # Tarjan法は参照先の成分を先に確定させるため、成分の確定順がそのまま位相順となる
+        return [node for component in self._components for node in component]
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import os
+import re
 from .base_validator import BaseValidator, ErrorSeverity
+from .document_store import DocumentStore
+from .context_graph import ContextGraph, ContextFacts
 
 class ContextValidator(BaseValidator):
-    def __init__(self, meta_dir: str):
-        super().__init__(meta_dir)
+    def __init__(self, meta_dir: str, store: Optional[DocumentStore] = None):
+        super().__init__(meta_dir, store)
         self.contexts_dir = os.path.join(meta_dir, "contexts")
+        self._graph: Optional[ContextGraph] = None
 
     def validate_error_severity(self, data: Dict[str, Any], file_path: str) -> bool:
         """エラー重要度の検証（MCPフレームワーク標準v1.2.0準拠）"""
@@ -45,55 +49,69 @@ class ContextValidator(BaseValidator):
 
         return valid
 
-    def validate_context_references(self, data: Dict[str, Any], file_path: str, visited: set = None) -> bool:
-        """コンテキスト間の相互参照を検証"""
-        if visited is None:
-            visited = set()
+    @property
+    def graph(self) -> ContextGraph:
+        """コンテキスト参照グラフ（初回参照時に構築）"""
+        if self._graph is None:
+            self._graph = ContextGraph(self.contexts_dir, self.store)
+        return self._graph
 
+    def validate_context_references(self, data: Dict[str, Any], file_path: str) -> bool:
+        """コンテキスト間の相互参照を検証（参照グラフのインデックスを使用）"""
         valid = True
         current_file = os.path.basename(file_path)
-        visited.add(current_file)
+        name = os.path.splitext(current_file)[0]
 
-        if 'context_references' in data:
-            for ref in data['context_references']:
-                ref_file = f"{ref}.yaml"
-                ref_path = os.path.join(self.contexts_dir, ref_file)
+        if not isinstance(data, dict):
+            self.add_error(
+                f"コンテキストの形式エラー in {current_file}: トップレベルはマッピングである必要があります",
+                ErrorSeverity.CRITICAL
+            )
+            return False
 
-                # 参照先の存在確認
-                if not os.path.exists(ref_path):
-                    self.add_error(
-                        f"無効なコンテキスト参照 in {current_file}: {ref}",
-                        ErrorSeverity.CRITICAL
-                    )
-                    valid = False
-                    continue
+        for ref in data.get('context_references', []) or []:
+            # 参照先の存在確認
+            if not self.graph.exists(ref):
+                self.add_error(
+                    f"無効なコンテキスト参照 in {current_file}: {ref}",
+                    ErrorSeverity.CRITICAL
+                )
+                valid = False
+                continue
 
-                # 循環参照の検出
-                if ref_file in visited:
-                    self.add_error(
-                        f"循環参照が検出されました: {' -> '.join(visited)} -> {ref_file}",
-                        ErrorSeverity.CRITICAL
-                    )
-                    valid = False
-                    continue
+            # 参照先の読み込み確認
+            self.graph.references(ref)
+            if ref in self.graph.load_errors:
+                self.add_error(
+                    f"参照先コンテキストの読み込みエラー {ref}.yaml: {str(self.graph.load_errors[ref])}",
+                    ErrorSeverity.CRITICAL
+                )
+                valid = False
 
-                # 参照先のコンテキストを読み込んで再帰的に検証
-                try:
-                    with open(ref_path, 'r', encoding='utf-8') as f:
-                        ref_data = yaml.safe_load(f)
-                        if not self.validate_context_references(ref_data, ref_path, visited.copy()):
-                            valid = False
-                except Exception as e:
-                    self.add_error(
-                        f"参照先コンテキストの読み込みエラー {ref_file}: {str(e)}",
-                        ErrorSeverity.CRITICAL
-                    )
-                    valid = False
+        # 循環参照の検出（同一の循環は代表ファイルでのみ報告）
+        cycle = self.graph.cycle_at(name)
+        if cycle:
+            self.add_error(
+                f"循環参照が検出されました: {' -> '.join(f'{node}.yaml' for node in cycle)}",
+                ErrorSeverity.CRITICAL
+            )
+            valid = False
+        elif self.graph.is_cyclic(name):
+            valid = False
 
         return valid
 
-    def validate_context_dependencies(self, data: Dict[str, Any], file_path: str) -> bool:
-        """コンテキスト間の依存関係の整合性を検証"""
+    def validate_context_dependencies(
+        self,
+        data: Dict[str, Any],
+        file_path: str,
+        provided: Optional[Dict[str, ContextFacts]] = None
+    ) -> bool:
+        """コンテキスト間の依存関係の整合性を検証
+
+        providedには検証済みの依存先コンテキストの情報を渡す。含まれない依存先は
+        ドキュメントストアから読み込む。
+        """
         valid = True
         current_file = os.path.basename(file_path)
 
@@ -103,8 +121,7 @@ class ContextValidator(BaseValidator):
             # バージョン依存関係の検証
             if 'required_versions' in deps:
                 for ctx, version in deps['required_versions'].items():
-                    ctx_path = os.path.join(self.contexts_dir, f"{ctx}.yaml")
-                    if not os.path.exists(ctx_path):
+                    if not self.graph.exists(ctx):
                         self.add_error(
                             f"依存コンテキストが見つかりません in {current_file}: {ctx}",
                             ErrorSeverity.CRITICAL
@@ -113,22 +130,20 @@ class ContextValidator(BaseValidator):
                         continue
 
                     try:
-                        with open(ctx_path, 'r', encoding='utf-8') as f:
-                            ctx_data = yaml.safe_load(f)
-                            ctx_version = ctx_data.get('version')
-                            if not ctx_version:
-                                self.add_error(
-                                    f"依存コンテキストにバージョンが定義されていません: {ctx}",
-                                    ErrorSeverity.CRITICAL
-                                )
-                                valid = False
-                            elif not self.validate_version_compatibility(version, ctx_version):
-                                self.add_error(
-                                    f"バージョン互換性エラー in {current_file}: "
-                                    f"{ctx} requires {version}, but found {ctx_version}",
-                                    ErrorSeverity.CRITICAL
-                                )
-                                valid = False
+                        ctx_version = self._dependency_facts(ctx, provided).version
+                        if not ctx_version:
+                            self.add_error(
+                                f"依存コンテキストにバージョンが定義されていません: {ctx}",
+                                ErrorSeverity.CRITICAL
+                            )
+                            valid = False
+                        elif not self.validate_version_compatibility(version, ctx_version):
+                            self.add_error(
+                                f"バージョン互換性エラー in {current_file}: "
+                                f"{ctx} requires {version}, but found {ctx_version}",
+                                ErrorSeverity.CRITICAL
+                            )
+                            valid = False
                     except Exception as e:
                         self.add_error(
                             f"依存コンテキストの読み込みエラー {ctx}: {str(e)}",
@@ -139,8 +154,7 @@ class ContextValidator(BaseValidator):
             # 機能依存関係の検証
             if 'required_features' in deps:
                 for ctx, features in deps['required_features'].items():
-                    ctx_path = os.path.join(self.contexts_dir, f"{ctx}.yaml")
-                    if not os.path.exists(ctx_path):
+                    if not self.graph.exists(ctx):
                         self.add_error(
                             f"依存コンテキストが見つかりません in {current_file}: {ctx}",
                             ErrorSeverity.CRITICAL
@@ -149,17 +163,15 @@ class ContextValidator(BaseValidator):
                         continue
 
                     try:
-                        with open(ctx_path, 'r', encoding='utf-8') as f:
-                            ctx_data = yaml.safe_load(f)
-                            available_features = ctx_data.get('features', {})
-                            for feature in features:
-                                if feature not in available_features:
-                                    self.add_error(
-                                        f"必要な機能が見つかりません in {current_file}: "
-                                        f"{ctx} does not provide {feature}",
-                                        ErrorSeverity.CRITICAL
-                                    )
-                                    valid = False
+                        available_features = self._dependency_facts(ctx, provided).features
+                        for feature in features:
+                            if feature not in available_features:
+                                self.add_error(
+                                    f"必要な機能が見つかりません in {current_file}: "
+                                    f"{ctx} does not provide {feature}",
+                                    ErrorSeverity.CRITICAL
+                                )
+                                valid = False
                     except Exception as e:
                         self.add_error(
                             f"依存コンテキストの読み込みエラー {ctx}: {str(e)}",
@@ -169,6 +181,78 @@ class ContextValidator(BaseValidator):
 
         return valid
 
+    def _dependency_facts(self, ctx: str, provided: Optional[Dict[str, ContextFacts]]) -> ContextFacts:
+        """依存先コンテキストの情報（検証済みであれば再読み込みしない）"""
+        if provided is not None and ctx in provided:
+            return provided[ctx]
+        return self.graph.facts(ctx)
+
+    def validate_version_compatibility(self, required: Any, found: Any) -> bool:
+        """要求バージョン指定と実際のバージョンの互換性を判定
+
+        対応形式: 完全一致（1.2.0）、前方一致（1.2 / 1.2.x / *）、
+        比較演算子（>=1.2.0 など、カンマ区切りで複数指定可）、^（メジャー一致）、~（マイナー一致）
+        """
+        found_parts = self._parse_version(str(found))
+        if found_parts is None:
+            return False
+
+        for spec in str(required).split(','):
+            spec = spec.strip()
+            if not spec or spec == '*':
+                continue
+
+            operator = next((op for op in ('>=', '<=', '==', '>', '<', '=', '^', '~') if spec.startswith(op)), '')
+            target = spec[len(operator):].strip()
+            target_parts = [part for part in target.split('.') if part not in ('x', 'X', '*')]
+            if not all(part.isdigit() for part in target_parts) or len(target_parts) > 3:
+                return False
+            target_parts = [int(part) for part in target_parts]
+            padded = tuple(target_parts + [0] * (3 - len(target_parts)))
+
+            if operator in ('', '=', '=='):
+                if list(found_parts[:len(target_parts)]) != target_parts:
+                    return False
+            elif operator == '^':
+                if found_parts[0] != padded[0] or found_parts < padded:
+                    return False
+            elif operator == '~':
+                if found_parts[:2] != padded[:2] or found_parts < padded:
+                    return False
+            elif operator == '>=' and not found_parts >= padded:
+                return False
+            elif operator == '<=' and not found_parts <= padded:
+                return False
+            elif operator == '>' and not found_parts > padded:
+                return False
+            elif operator == '<' and not found_parts < padded:
+                return False
+
+        return True
+
+    @staticmethod
+    def _parse_version(version: str) -> Optional[Tuple[int, int, int]]:
+        """MAJOR.MINOR.PATCH形式のバージョンを解析"""
+        match = re.match(r'^(\d+)\.(\d+)\.(\d+)$', version.strip())
+        if not match:
+            return None
+        return tuple(int(part) for part in match.groups())
+
+    def dependency_paths(self, data: Dict[str, Any]) -> List[str]:
+        """検証結果が依存するコンテキストファイルの一覧（参照は推移的に展開）"""
+        if not isinstance(data, dict):
+            return []
+        paths = set()
+        for ref in data.get('context_references', []):
+            paths.add(self.graph.path_of(ref))
+            paths.update(self.graph.path_of(node) for node in self.graph.transitive_closure(ref))
+
+        deps = data.get('dependencies', {})
+        for key in ('required_versions', 'required_features'):
+            for ctx in deps.get(key, {}):
+                paths.add(os.path.join(self.contexts_dir, f"{ctx}.yaml"))
+        return sorted(paths)
+
     def validate_metrics(self, data: Dict[str, Any], file_path: str) -> bool:
         """メトリクスの検証"""
         if 'metrics' not in data:
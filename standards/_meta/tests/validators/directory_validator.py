@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
 import re
 from .base_validator import BaseValidator, ErrorSeverity
+from .document_store import DocumentStore
 
 class DirectoryValidator(BaseValidator):
-    def __init__(self, meta_dir: str):
-        super().__init__(meta_dir)
+    def __init__(self, meta_dir: str, store: Optional[DocumentStore] = None):
+        super().__init__(meta_dir, store)
         # 必須ディレクトリ構造の定義
         self.required_directories = {
             'schemas': {
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import io
+import os
+import yaml
+
+class Document:
+    """1回の読み込み・解析結果を保持するドキュメント"""
+    def __init__(self, path: str, raw: bytes, mtime_ns: int, size: int):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = hashlib.sha256(raw).hexdigest()
+        self._encoding_error: Optional[UnicodeDecodeError] = None
+        self._yaml_error: Optional[yaml.YAMLError] = None
+        self._text: Optional[str] = None
+        self._raw: Optional[bytes] = raw
+        self._data: Any = None
+        self._parsed = False
+
+    @property
+    def key(self) -> Tuple[str, int, int, str]:
+        """キャッシュキー（パス・mtime・サイズ・ハッシュ）"""
+        return (self.path, self.mtime_ns, self.size, self.digest)
+
+    def _parse(self) -> None:
+        """デコードとYAML解析を1度だけ実行"""
+        if self._parsed:
+            return
+        self._parsed = True
+        try:
+            # UTF-8・UTF-8-SIG（BOM付き）のどちらも受け付け、BOMは取り除く
+            self._text = self._raw.decode('utf-8-sig')
+        except UnicodeDecodeError as e:
+            self._encoding_error = e
+            return
+        finally:
+            self._raw = None
+        try:
+            # 構文エラーの位置にファイルパスが表示されるよう名前付きのストリームで解析
+            stream = io.StringIO(self._text)
+            stream.name = self.path
+            self._data = yaml.safe_load(stream)
+        except yaml.YAMLError as e:
+            self._yaml_error = e
+
+    @property
+    def text(self) -> Optional[str]:
+        """デコード済みテキスト（エンコーディングエラー時はNone）"""
+        self._parse()
+        return self._text
+
+    @property
+    def encoding_error(self) -> Optional[UnicodeDecodeError]:
+        """エンコーディングエラー"""
+        self._parse()
+        return self._encoding_error
+
+    @property
+    def yaml_error(self) -> Optional[yaml.YAMLError]:
+        """YAML構文エラー"""
+        self._parse()
+        return self._yaml_error
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """読み込み時のエラー（エンコーディングまたはYAML構文）"""
+        return self.encoding_error or self.yaml_error
+
+    @property
+    def data(self) -> Any:
+        """解析済みデータ（エラー時はNone）"""
+        self._parse()
+        return self._data
+
+    def load(self) -> Any:
+        """解析済みデータを返す（エラー時は例外を送出）"""
+        error = self.error
+        if error is not None:
+            raise error
+        return self._data
+
+class DocumentStore:
+    """実行単位で各ファイルを1度だけ読み込み・解析するドキュメントストア"""
+    def __init__(self):
+        self._documents: Dict[str, Document] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str) -> Document:
+        """ドキュメントの取得（変更がなければキャッシュから返却）"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        cached = self._documents.get(path)
+        if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+            self.hits += 1
+            return cached
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        document = Document(path, raw, stat.st_mtime_ns, stat.st_size)
+        if cached is not None and cached.digest == document.digest:
+            # 内容が同一であればタイムスタンプのみ更新して解析結果を再利用
+            cached.mtime_ns = document.mtime_ns
+            self.hits += 1
+            return cached
+
+        self._documents[path] = document
+        self.misses += 1
+        return document
+
+    def digest(self, file_path: str) -> Optional[str]:
+        """ファイル内容のハッシュ（存在しない場合はNone）"""
+        if not os.path.isfile(file_path):
+            return None
+        return self.get(file_path).digest
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュのヒット・ミス数"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "documents": len(self._documents)
+        }
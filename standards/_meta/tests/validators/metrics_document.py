@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Iterator, Optional
+from datetime import datetime
+import json
+import os
+
+# メトリクス文書の形式のバージョン（互換性のない変更で更新）
+METRICS_DOCUMENT_VERSION = 1
+
+class MetricsDocumentError(Exception):
+    """メトリクス文書の読み込みエラー（未作成・形式不正・バージョン不一致）"""
+
+class MetricsDocument:
+    """テストスクリプトが出力する機械可読のメトリクス文書
+
+    各メトリクスは unified_metrics.yaml の report_format.metrics に従い、
+    metric_name・value・unit・labels を持つ。分布を持つメトリクスは stats に
+    分位点などの統計値を含め、value には代表値（P99）を設定する。
+    """
+    def __init__(self, source: str, metrics: Optional[List[Dict[str, Any]]] = None,
+                 timestamp: Optional[str] = None):
+        self.source = source
+        self.metrics = metrics if metrics is not None else []
+        self.timestamp = timestamp or datetime.now().isoformat(timespec='seconds')
+
+    def add(self, metric_name: str, value: float, unit: str,
+            labels: Optional[Dict[str, str]] = None, stats: Optional[Dict[str, Any]] = None) -> None:
+        """メトリクスを1件追加"""
+        metric = {
+            "timestamp": self.timestamp,
+            "metric_name": metric_name,
+            "value": value,
+            "unit": unit,
+            "labels": labels or {}
+        }
+        if stats is not None:
+            metric["stats"] = stats
+        self.metrics.append(metric)
+
+    def add_distribution(self, metric_name: str, stats: Optional[Dict[str, Any]], unit: str,
+                         labels: Optional[Dict[str, str]] = None) -> None:
+        """分布を持つメトリクスを追加（記録がない場合は追加しない）"""
+        if stats:
+            self.add(metric_name, stats['p99'], unit, labels, stats)
+
+    def find(self, metric_name: str, **labels: str) -> Iterator[Dict[str, Any]]:
+        """名前とラベル（指定したもののみ）が一致するメトリクス"""
+        for metric in self.metrics:
+            if metric["metric_name"] == metric_name and all(
+                    metric["labels"].get(key) == value for key, value in labels.items()):
+                yield metric
+
+    def get(self, metric_name: str, **labels: str) -> Optional[Dict[str, Any]]:
+        """名前とラベルが一致する最初のメトリクス"""
+        return next(self.find(metric_name, **labels), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": METRICS_DOCUMENT_VERSION,
+            "source": self.source,
+            "timestamp": self.timestamp,
+            "metrics": self.metrics
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MetricsDocument':
+        if data.get("version") != METRICS_DOCUMENT_VERSION:
+            raise MetricsDocumentError(f"未対応のメトリクス文書のバージョン: {data.get('version')}")
+        return cls(data.get("source", ""), list(data.get("metrics", [])), data.get("timestamp"))
+
+    def write(self, path: str) -> None:
+        """ファイルへ書き込む（読み込み側が途中の内容を読まないよう置き換えで保存）"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'MetricsDocument':
+        """ファイルから読み込む"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise MetricsDocumentError(f"メトリクス文書を読み込めません: {str(e)}") from e
+        return cls.from_dict(data)
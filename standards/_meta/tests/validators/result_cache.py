@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, Callable
+import json
+import os
+from .base_validator import ResultBatch
+
+CACHE_FILENAME = ".validation_cache"
+
+class ResultCache:
+    """コンテンツハッシュをキーとした永続的な検証結果キャッシュ
+
+    各ファイルのハッシュと、そのファイルが依存するファイルのハッシュを記録し、
+    いずれも変化していない場合に限り前回の検証結果を再利用する。
+    """
+    VERSION = 1
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._next_entries: Dict[str, Dict[str, Any]] = {}
+        self.reused = 0
+        self.revalidated = 0
+        self._load()
+
+    def _load(self) -> None:
+        """キャッシュファイルの読み込み（破損・不一致時は空として扱う）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get('version') != self.VERSION or cache.get('fingerprint') != self.fingerprint:
+            return
+        self._entries = cache.get('entries', {})
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(os.path.abspath(file_path), self.base_dir).replace(os.sep, '/')
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.base_dir, *key.split('/'))
+
+    def lookup(
+        self,
+        file_path: str,
+        digest: str,
+        digest_of: Callable[[str], Optional[str]]
+    ) -> Optional[ResultBatch]:
+        """ファイル自身と依存先のハッシュが一致する場合にキャッシュ済み結果を返す"""
+        key = self._key(file_path)
+        entry = self._entries.get(key)
+        if entry is None or entry.get('digest') != digest:
+            return None
+        for dep_key, dep_digest in entry.get('deps', {}).items():
+            if digest_of(self._path(dep_key)) != dep_digest:
+                return None
+
+        self._next_entries[key] = entry
+        self.reused += 1
+        return ResultBatch.from_dicts(entry.get('results', []))
+
+    def store(
+        self,
+        file_path: str,
+        digest: str,
+        deps: Dict[str, Optional[str]],
+        results: ResultBatch
+    ) -> None:
+        """検証結果と依存先ハッシュを記録"""
+        self._next_entries[self._key(file_path)] = {
+            'digest': digest,
+            'deps': {self._key(dep): dep_digest for dep, dep_digest in sorted(deps.items())},
+            'results': results.to_dicts()
+        }
+        self.revalidated += 1
+
+    def save(self) -> None:
+        """今回の実行で参照されたエントリのみを書き出す"""
+        cache = {
+            'version': self.VERSION,
+            'fingerprint': self.fingerprint,
+            'entries': self._next_entries
+        }
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> Dict[str, int]:
+        """再利用・再検証したファイル数"""
+        return {
+            "reused": self.reused,
+            "revalidated": self.revalidated
+        }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Callable, Iterator, Optional, TextIO
+from abc import ABC, abstractmethod
+import heapq
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+# 既定のndjson出力先のファイル名パターン（メタディレクトリのスキャン対象から除外する）
+RESULT_FILE_PATTERN = "*_results.ndjson"
+
+class ResultSink(ABC):
+    """検証・テスト結果の出力先の基底クラス
+
+    結果は生成された時点で書き込み、レポート生成時に読み戻す。
+    to_dict() を持つオブジェクトは読み戻し時（ファイル出力では書き込み時）に辞書へ変換する。
+    """
+    def __init__(self):
+        self.count = 0
+
+    @abstractmethod
+    def emit(self, result: Any) -> None:
+        """結果を1件書き込む"""
+
+    def flush(self) -> None:
+        """バッファを書き出す"""
+
+    def close(self) -> None:
+        """出力先を閉じる"""
+        self.flush()
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """書き込み順に結果を読み戻す"""
+
+    def __len__(self) -> int:
+        return self.count
+
+    def iter_sorted(
+        self,
+        key: Callable[[Dict[str, Any]], Any],
+        chunk_size: int = 10000
+    ) -> Iterator[Dict[str, Any]]:
+        """キー順に結果を読み戻す（chunk_size件ごとに整列して一時ファイルでマージ）"""
+        runs: List[TextIO] = []
+        try:
+            iterator = iter(self)
+            while True:
+                chunk = list(itertools.islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                chunk.sort(key=key)
+                if not runs and len(chunk) < chunk_size:
+                    yield from chunk
+                    return
+                run = tempfile.TemporaryFile('w+', encoding='utf-8')
+                for result in chunk:
+                    run.write(json.dumps(result, ensure_ascii=False) + "\n")
+                run.seek(0)
+                runs.append(run)
+            yield from heapq.merge(*((json.loads(line) for line in run) for run in runs), key=key)
+        finally:
+            for run in runs:
+                run.close()
+
+    @staticmethod
+    def _as_dict(result: Any) -> Dict[str, Any]:
+        return result.to_dict() if hasattr(result, 'to_dict') else result
+
+class MemorySink(ResultSink):
+    """メモリ上に結果を保持する出力先"""
+    def __init__(self):
+        super().__init__()
+        self._results: List[Any] = []
+
+    def emit(self, result: Any) -> None:
+        self._results.append(result)
+        self.count += 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self._as_dict(result) for result in self._results)
+
+    def iter_sorted(
+        self,
+        key: Callable[[Dict[str, Any]], Any],
+        chunk_size: int = 10000
+    ) -> Iterator[Dict[str, Any]]:
+        return iter(sorted(self, key=key))
+
+class NDJSONFileSink(ResultSink):
+    """結果を1行1件のJSON（NDJSON）としてファイルへ書き込む出力先"""
+    def __init__(self, path: str, batch_size: int = 1000):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file: Optional[TextIO] = open(path, 'w', encoding='utf-8')
+        self._unflushed = 0
+
+    def _write_line(self, line: str) -> None:
+        self._file.write(line)
+        self._unflushed += 1
+        if self._unflushed >= self.batch_size:
+            self.flush()
+
+    def emit(self, result: Any) -> None:
+        self._write_line(json.dumps(self._as_dict(result), ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+        self._unflushed = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+class StdoutSink(NDJSONFileSink):
+    """結果を標準出力へNDJSONで逐次出力する出力先（読み戻し用に一時ファイルへも保存）"""
+    def __init__(self, batch_size: int = 100, stream: Optional[TextIO] = None):
+        fd, path = tempfile.mkstemp(prefix="results-", suffix=".ndjson")
+        os.close(fd)
+        super().__init__(path, batch_size)
+        self.stream = stream if stream is not None else sys.stdout
+
+    def _write_line(self, line: str) -> None:
+        self.stream.write(line)
+        super()._write_line(line)
+
+    def flush(self) -> None:
+        self.stream.flush()
+        super().flush()
+
+    def close(self) -> None:
+        super().close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def write_report(lines: Iterator[str], path: str, echo: bool = True) -> None:
+    """レポートを1行ずつファイルへ書き出す（echo指定時は標準出力にも表示）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, line in enumerate(lines):
+            f.write(line if i == 0 else "\n" + line)
+            if echo:
+                print(line)
+
+SINK_TYPES = ('memory', 'ndjson', 'stdout')
+
+def create_sink(sink_type: str = 'memory', path: Optional[str] = None) -> ResultSink:
+    """出力先の生成（memory / ndjson / stdout）"""
+    if sink_type == 'memory':
+        return MemorySink()
+    if sink_type == 'ndjson':
+        if not path:
+            raise ValueError("ndjson出力先にはファイルパスが必要です")
+        return NDJSONFileSink(path)
+    if sink_type == 'stdout':
+        return StdoutSink()
+    raise ValueError(f"未定義の出力先: {sink_type}")
@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
 from .base_validator import BaseValidator, ErrorSeverity
+from .document_store import DocumentStore
 
 class SchemaValidator(BaseValidator):
-    def __init__(self, meta_dir: str):
-        super().__init__(meta_dir)
+    def __init__(self, meta_dir: str, store: Optional[DocumentStore] = None):
+        super().__init__(meta_dir, store)
         self.schemas_dir = os.path.join(meta_dir, "schemas")
 
     def validate_error_codes(self, data: Dict[str, Any], file_path: str) -> bool:
@@ -78,6 +79,15 @@ class SchemaValidator(BaseValidator):
                     valid = False
         return valid
 
+    def dependency_paths(self, data: Dict[str, Any]) -> List[str]:
+        """検証結果が依存するスキーマファイルの一覧"""
+        if not isinstance(data, dict):
+            return []
+        return sorted(
+            os.path.join(self.schemas_dir, f"{ref}.yaml")
+            for ref in data.get('references', [])
+        )
+
     def validate_transport(self, data: Dict[str, Any], file_path: str) -> bool:
         """トランスポート層の設定を検証（MCPフレームワーク標準v1.2.0準拠）"""
         if 'transport' not in data.get('mcp_protocol', {}):
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Any, Optional, Tuple, Callable
+import operator
+import yaml
+
+# 重要度の高い順の閾値レベル
+THRESHOLD_LEVELS = ('critical', 'non_critical', 'warning')
+METRIC_TYPES = ('gauge', 'histogram', 'rate')
+
+# 単位ごとの次元と基準単位への換算係数（同じ次元の単位の間で換算する）
+UNIT_SCALES = {
+    'nanoseconds': ('time', 1e-9),
+    'microseconds': ('time', 1e-6),
+    'milliseconds': ('time', 1e-3),
+    'seconds': ('time', 1.0),
+    'ratio': ('fraction', 1.0),
+    'percent': ('fraction', 0.01),
+    'requests_per_second': ('throughput', 1.0),
+    'requests_per_minute': ('throughput', 1 / 60)
+}
+# 値が大きいほど良い単位（direction を指定しない場合の判定方向）
+HIGHER_IS_BETTER_UNITS = ('requests_per_second', 'requests_per_minute')
+# 値が大きいほど良いメトリクス名の接尾辞（単位が百分率などで方向を決められないもの）
+HIGHER_IS_BETTER_SUFFIXES = ('success_rate', 'achieved_rate', 'saturation.rate')
+
+def default_direction(metric_name: str, unit: str) -> str:
+    """direction を指定しない場合のメトリクスの良い方向（higher / lower）"""
+    if unit in HIGHER_IS_BETTER_UNITS or metric_name.endswith(HIGHER_IS_BETTER_SUFFIXES):
+        return 'higher'
+    return 'lower'
+
+def convert_unit(value: float, from_unit: str, to_unit: str) -> float:
+    """同じ次元の単位の間で値を換算"""
+    if from_unit == to_unit:
+        return value
+    source = UNIT_SCALES.get(from_unit)
+    target = UNIT_SCALES.get(to_unit)
+    if source is None or target is None or source[0] != target[0]:
+        raise ValueError(f"単位を換算できません: {from_unit} -> {to_unit}")
+    return value * source[1] / target[1]
+
+class MetricThreshold:
+    """1つのメトリクス定義から生成した閾値の判定器
+
+    direction が higher の場合は閾値を下回ると、lower の場合は上回ると超過とする。
+    重要度の高いレベルほど悪い側の閾値でなければならず、矛盾する定義は ValueError とする。
+    各レベルは独立に判定し、超過したうち最も重要度の高いレベルを結果とする。
+    histogram は statistic（既定 p99）の統計値で判定する。
+    """
+    def __init__(
+        self,
+        name: str,
+        metric_type: str,
+        unit: str,
+        thresholds: Dict[str, float],
+        direction: Optional[str] = None,
+        statistic: str = 'p99',
+        description: str = ''
+    ):
+        if metric_type not in METRIC_TYPES:
+            raise ValueError(f"未定義のメトリクスタイプ: {name}: {metric_type}")
+        unknown = set(thresholds) - set(THRESHOLD_LEVELS)
+        if unknown:
+            raise ValueError(f"未定義の閾値レベル: {name}: {', '.join(sorted(unknown))}")
+        direction = direction or default_direction(name, unit)
+        if direction not in ('higher', 'lower'):
+            raise ValueError(f"未定義の判定方向: {name}: {direction}")
+        # 重要度の高いレベルほど悪い側の閾値である必要がある（higher は小さく、lower は大きく）
+        levels = [level for level in THRESHOLD_LEVELS if level in thresholds]
+        for severe, mild in zip(levels, levels[1:]):
+            if (thresholds[severe] > thresholds[mild]) if direction == 'higher' else \
+                    (thresholds[severe] < thresholds[mild]):
+                raise ValueError(
+                    f"閾値の順序が判定方向（{direction}）と矛盾しています: {name}: "
+                    f"{severe}={thresholds[severe]}, {mild}={thresholds[mild]}"
+                )
+        self.name = name
+        self.metric_type = metric_type
+        self.unit = unit
+        self.thresholds = thresholds
+        self.direction = direction
+        self.statistic = statistic
+        self.description = description
+        # 重要度の高い順の (レベル, 閾値, 超過の判定)
+        breached: Callable[[float, float], bool] = operator.lt if direction == 'higher' else operator.gt
+        self._checks: List[Tuple[str, float, Callable[[float, float], bool]]] = [
+            (level, float(thresholds[level]), breached) for level in THRESHOLD_LEVELS if level in thresholds
+        ]
+
+    def observed(self, metric: Dict[str, Any]) -> float:
+        """判定に使う値（メトリクスの単位から定義の単位へ換算）"""
+        value = metric['value']
+        if self.metric_type == 'histogram' and metric.get('stats'):
+            value = metric['stats'][self.statistic]
+        return convert_unit(value, metric['unit'], self.unit)
+
+    def evaluate(self, metric: Dict[str, Any]) -> Dict[str, Any]:
+        """メトリクス1件の判定結果（threshold_level は超過したレベルまたは normal）"""
+        verdict = {
+            "metric_name": metric['metric_name'],
+            "labels": metric.get('labels', {}),
+            "definition": self.name,
+            "unit": self.unit,
+            "direction": self.direction,
+            "value": None,
+            "threshold": None,
+            "threshold_level": "normal"
+        }
+        try:
+            value = self.observed(metric)
+        except (KeyError, ValueError) as e:
+            verdict.update(threshold_level="invalid", reason=str(e))
+            return verdict
+        verdict["value"] = value
+        for level, bound, breached in self._checks:
+            if breached(value, bound):
+                verdict.update(threshold_level=level, threshold=bound)
+                break
+        return verdict
+
+class ThresholdEngine:
+    """unified_metrics.yaml の base_metrics を判定器に変換し、メトリクス文書に適用するクラス
+
+    定義名は「グループ.メトリクス」（例: performance.response_time）で、同じ名前の
+    メトリクスに適用する。applies_to を指定した定義は列挙した名前のメトリクスにも適用する。
+    """
+    def __init__(self, thresholds: List[MetricThreshold], targets: Dict[str, MetricThreshold]):
+        self.thresholds = thresholds
+        self._targets = targets
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ThresholdEngine':
+        thresholds = []
+        targets: Dict[str, MetricThreshold] = {}
+        for group, metrics in (config.get('base_metrics') or {}).items():
+            for metric, definition in (metrics or {}).items():
+                name = f"{group}.{metric}"
+                threshold = MetricThreshold(
+                    name,
+                    definition.get('type', 'gauge'),
+                    definition.get('unit', ''),
+                    definition.get('threshold') or {},
+                    definition.get('direction'),
+                    definition.get('statistic', 'p99'),
+                    definition.get('description', '')
+                )
+                thresholds.append(threshold)
+                for target in [name] + list(definition.get('applies_to', [])):
+                    if target in targets:
+                        raise ValueError(f"メトリクスに複数の閾値定義が適用されます: {target}")
+                    targets[target] = threshold
+        return cls(thresholds, targets)
+
+    @classmethod
+    def load(cls, path: str) -> 'ThresholdEngine':
+        """統一メトリクス定義ファイルから生成"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_config(yaml.safe_load(f) or {})
+
+    def threshold_for(self, metric_name: str) -> Optional[MetricThreshold]:
+        return self._targets.get(metric_name)
+
+    def direction(self, metric_name: str, unit: str) -> str:
+        """メトリクスの良い方向（閾値定義があればその direction、なければ default_direction）"""
+        threshold = self._targets.get(metric_name)
+        return threshold.direction if threshold is not None else default_direction(metric_name, unit)
+
+    def evaluate(self, metrics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """閾値定義のあるメトリクスごとの判定結果（定義のないメトリクスは含めない）"""
+        verdicts = []
+        for metric in metrics:
+            threshold = self._targets.get(metric['metric_name'])
+            if threshold is not None:
+                verdicts.append(threshold.evaluate(metric))
+        return verdicts
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Optional, NamedTuple, Pattern, Set, TextIO, Iterator, Sequence
+from bisect import bisect_left
+from fnmatch import fnmatch
+import os
+import re
+
+# ストリーミングスキャンに切り替えるファイルサイズ（バイト）
+STREAM_THRESHOLD = 32 * 1024 * 1024
+# ストリーミングスキャンの読み込み単位と重なり幅（文字数）
+CHUNK_SIZE = 4 * 1024 * 1024
+OVERLAP = 64 * 1024
+# スキャン対象の既定の拡張子
+SCAN_EXTENSIONS = ('.yaml', '.json')
+
+class Finding(NamedTuple):
+    """脆弱性パターンへの一致"""
+    vuln_type: str
+    line: int
+    text: str
+
+class LineIndex:
+    """改行位置の索引（行番号を二分探索で求める）"""
+    def __init__(self, content: str):
+        self.content = content
+        self._offsets: Optional[List[int]] = None
+
+    def line_of(self, position: int) -> int:
+        """文字位置の行番号（1始まり）"""
+        if self._offsets is None:
+            self._offsets = [m.start() for m in re.finditer('\n', self.content)]
+        return bisect_left(self._offsets, position) + 1
+
+def _fold_case(text: str) -> str:
+    """事前フィルター用の大文字小文字の畳み込み
+
+    re.IGNORECASE でASCII英字に一致するが lower() ではASCII英字にならない
+    文字（ı・ſ・İ）も畳み込み、リテラルの取りこぼしを防ぐ。
+    """
+    folded = text.lower()
+    if not folded.isascii():
+        folded = folded.replace('\u0131', 'i').replace('\u017f', 's').replace('\u0307', '')
+    return folded
+
+class VulnerabilityScanner:
+    """事前コンパイル済みの脆弱性パターンによるスキャナー
+
+    各パターンには、一致する文字列に必ず含まれるリテラル（いずれか1つ）を
+    事前フィルターとして指定できる。大文字小文字を畳み込んだテキストに対する
+    リテラルの部分文字列検索で候補となるパターンを絞り込み、候補のパターンのみを適用する。
+    一致結果はパターンごとに個別に走査した場合と同一となる。
+
+    stream_threshold を超えるファイルは全体を読み込まず、重なり幅付きの
+    行単位のチャンクでスキャンする。チャンクは常に行末で区切り、重なり幅より長い行は
+    行全体を読み込んでから判定するため、行内の一致は全体読み込み時と同一となる
+    （複数行にまたがる一致のみ、重なり幅より長い場合に異なりうる）。
+    """
+    def __init__(
+        self,
+        patterns: Dict[str, str],
+        prefilters: Optional[Dict[str, List[str]]] = None,
+        stream_threshold: int = STREAM_THRESHOLD,
+        chunk_size: int = CHUNK_SIZE,
+        overlap: int = OVERLAP
+    ):
+        if overlap >= chunk_size:
+            raise ValueError("重なり幅は読み込み単位より小さくする必要があります")
+        self.stream_threshold = stream_threshold
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.patterns: Dict[str, Pattern[str]] = {
+            vuln_type: re.compile(pattern) for vuln_type, pattern in patterns.items()
+        }
+        prefilters = prefilters or {}
+        # 事前フィルターを持たないパターンは常に適用
+        self._unfiltered = [vuln_type for vuln_type in patterns if not prefilters.get(vuln_type)]
+        self._rules_by_literal: Dict[str, Set[str]] = {}
+        for vuln_type in patterns:
+            for literal in prefilters.get(vuln_type) or []:
+                if not literal.isascii():
+                    raise ValueError(f"事前フィルターにはASCIIのリテラルを指定してください: {literal}")
+                self._rules_by_literal.setdefault(literal.lower(), set()).add(vuln_type)
+
+    def candidates(self, content: str) -> List[str]:
+        """contentに適用する必要のあるパターン（定義順）"""
+        active = set(self._unfiltered)
+        if len(active) < len(self.patterns):
+            folded = _fold_case(content)
+            for literal, vuln_types in self._rules_by_literal.items():
+                if not vuln_types <= active and literal in folded:
+                    active |= vuln_types
+        return [vuln_type for vuln_type in self.patterns if vuln_type in active]
+
+    def scan_text(self, content: str) -> List[Finding]:
+        """テキスト全体をスキャン（パターンの定義順・出現順に返却）"""
+        findings: List[Finding] = []
+        lines = LineIndex(content)
+        for vuln_type in self.candidates(content):
+            for match in self.patterns[vuln_type].finditer(content):
+                findings.append(Finding(vuln_type, lines.line_of(match.start()), match.group()))
+        return findings
+
+    def scan_stream(self, stream: TextIO) -> List[Finding]:
+        """テキストストリームをチャンク単位でスキャン（scan_textと同じ順序で返却）
+
+        各チャンクは行末で区切り（改行が現れるまで、またはEOFまで読み進める）、
+        末尾の重なり幅に開始する一致と、チャンク末尾に
+        接する一致（後続の入力で変わりうるもの）は次のチャンクで改めて判定する。
+        パターンごとに前回の一致の終了位置から走査を再開するため、重複は生じない。
+        """
+        findings: Dict[str, List[Finding]] = {vuln_type: [] for vuln_type in self.patterns}
+        resume = {vuln_type: 0 for vuln_type in self.patterns}
+        buffer = ""
+        base = 0
+        base_line = 1
+        eof = False
+        while not eof:
+            data = stream.read(self.chunk_size)
+            eof = not data
+            buffer += data
+            if eof:
+                end = len(buffer)
+            else:
+                end = buffer.rfind('\n') + 1
+                if end <= self.overlap:
+                    # 行を途中で区切らない（重なり幅より長い行は改行かEOFまで読み進める）
+                    continue
+
+            window = buffer[:end]
+            limit = end if eof else end - self.overlap
+            next_start = limit
+            lines = LineIndex(window)
+            for vuln_type in self.candidates(window):
+                pos = max(resume[vuln_type] - base, 0)
+                for match in self.patterns[vuln_type].finditer(window, pos):
+                    if match.start() >= limit:
+                        break
+                    if not eof and match.end() >= end - 1:
+                        # チャンク末尾に接する一致は次のチャンクで判定
+                        next_start = min(next_start, match.start())
+                        break
+                    findings[vuln_type].append(Finding(
+                        vuln_type,
+                        base_line + lines.line_of(match.start()) - 1,
+                        match.group()
+                    ))
+                    resume[vuln_type] = base + match.end()
+
+            if next_start <= 0 and not eof:
+                # 進展がない場合は読み込み範囲を広げて再判定
+                continue
+            base_line += buffer.count('\n', 0, next_start)
+            base += next_start
+            buffer = buffer[next_start:]
+
+        return [finding for vuln_type in self.patterns for finding in findings[vuln_type]]
+
+    def scan_file(self, file_path: str) -> List[Finding]:
+        """ファイルをスキャン（閾値を超えるファイルはストリーミングでスキャン）"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if os.path.getsize(file_path) > self.stream_threshold:
+                return self.scan_stream(f)
+            content = f.read()
+        return self.scan_text(content)
+
+def _is_ignored(name: str, rel_path: str, ignore: Sequence[str]) -> bool:
+    return any(fnmatch(name, pattern) or fnmatch(rel_path, pattern) for pattern in ignore)
+
+def iter_scan_targets(
+    root: str,
+    extensions: Sequence[str] = SCAN_EXTENSIONS,
+    ignore: Sequence[str] = ()
+) -> Iterator[str]:
+    """スキャン対象ファイルを安定した順序で列挙（os.scandirによる逐次生成）
+
+    各ディレクトリのファイルを名前順に返した後、サブディレクトリを名前順に辿る。
+    ignore はファイル・ディレクトリ名またはrootからの相対パス（/区切り）に対する
+    fnmatchパターン。シンボリックリンクのディレクトリは辿らない。
+    """
+    extensions = tuple(extensions)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        files: List[str] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                    if _is_ignored(entry.name, rel_path, ignore):
+                        continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1] in extensions:
+                        files.append(entry.path)
+        except OSError:
+            continue
+        yield from sorted(files)
+        stack.extend(sorted(subdirs, reverse=True))